@@ -28,8 +28,17 @@ fileConfig(config.config_file_name)
 # target_metadata = mymodel.Base.metadata
 from app.db.base import Base
 from app.models import *  # 导入所有模型以确保它们在创建表时被注册
+from app.db.fulltext import FTS_TABLE
 target_metadata = Base.metadata
 
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """autogenerate时忽略全文索引（FTS5虚拟表及其影子表由迁移手工维护）"""
+    if type_ == "table" and name.startswith(FTS_TABLE):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -53,6 +62,7 @@ def run_migrations_offline():
         url=url,
         target_metadata=target_metadata,
         literal_binds=True,
+        include_object=include_object,
         dialect_opts={"paramstyle": "named"},
     )
 
@@ -75,7 +85,8 @@ def run_migrations_online():
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,38 @@
+"""添加简历全文索引
+
+Revision ID: 8d2e5f41c3a7
+Revises: 3c1f8a2b7d90
+Create Date: 2026-10-18 14:05:47.218903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.db.fulltext import FULLTEXT_INDEX, MYSQL_CREATE, SQLITE_CREATE, SQLITE_DROP
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e5f41c3a7'
+down_revision = '3c1f8a2b7d90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite: FTS5外部内容表 + 同步触发器，并用rebuild回填已有简历
+    # MySQL: FULLTEXT索引（ngram解析器），由InnoDB随写入自动维护
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_CREATE:
+            op.execute(statement)
+    elif dialect == 'mysql':
+        for statement in MYSQL_CREATE:
+            op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DROP:
+            op.execute(statement)
+    elif dialect == 'mysql':
+        op.drop_index(FULLTEXT_INDEX, table_name='resumes')
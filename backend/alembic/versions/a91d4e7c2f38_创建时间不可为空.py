@@ -0,0 +1,46 @@
+"""创建时间不可为空
+
+Revision ID: a91d4e7c2f38
+Revises: f2a6c9d83b51
+Create Date: 2026-10-18 19:12:44.508231
+
+简历、招聘需求、招聘方案的created_at是列表键集分页的排序键，需为NOT NULL才能按索引顺序分页：
+回填为空的创建时间（优先取更新时间），并设置服务端默认值
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a91d4e7c2f38'
+down_revision = 'f2a6c9d83b51'
+branch_labels = None
+depends_on = None
+
+TABLES = ('resumes', 'job_requirements', 'plans')
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for table_name in TABLES:
+        table = sa.table(table_name, sa.column('created_at', sa.DateTime()), sa.column('updated_at', sa.DateTime()))
+        op.execute(
+            table.update()
+            .where(table.c.created_at.is_(None))
+            .values(created_at=sa.func.coalesce(table.c.updated_at, sa.func.now()))
+        )
+        # SQLite不支持修改列约束，重建表会丢失简历全文索引的同步触发器；应用写入时总会设置创建时间
+        if dialect != 'sqlite':
+            op.alter_column(table_name, 'created_at', existing_type=sa.DateTime(), nullable=False,
+                            server_default=sa.func.now(), existing_comment='创建时间',
+                            comment='创建时间（列表分页排序键，不可为空）')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    for table_name in TABLES:
+        op.alter_column(table_name, 'created_at', existing_type=sa.DateTime(), nullable=True,
+                        server_default=None, existing_comment='创建时间（列表分页排序键，不可为空）',
+                        comment='创建时间')
@@ -0,0 +1,75 @@
+"""添加查询索引
+
+Revision ID: b7e3a9c2d415
+Revises: 8d2e5f41c3a7
+Create Date: 2026-10-18 15:32:08.640215
+
+建立(resume_id, job_id)唯一索引前清理重复的匹配记录：同一简历与职位保留匹配分数最高的一条，
+分数相同时保留ID最大（最新）的一条；删除的记录ID逐组记录在迁移日志中
+
+"""
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3a9c2d415'
+down_revision = '8d2e5f41c3a7'
+branch_labels = None
+depends_on = None
+
+
+# 每条DELETE语句删除的记录数
+_DELETE_BATCH = 500
+
+
+def _dedupe_matches():
+    """删除重复的匹配记录（保留分数最高、分数相同时ID最大的一条），返回删除的记录ID"""
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT m.id, m.resume_id, m.job_id, m.match_score FROM matches AS m "
+        "JOIN (SELECT resume_id, job_id FROM matches GROUP BY resume_id, job_id HAVING COUNT(*) > 1) AS d "
+        "ON m.resume_id = d.resume_id AND m.job_id = d.job_id "
+        "ORDER BY m.resume_id, m.job_id, m.match_score DESC, m.id DESC"
+    )).all()
+    
+    kept = {}
+    deleted = []
+    for row in rows:
+        key = (row.resume_id, row.job_id)
+        if key not in kept:
+            kept[key] = row.id
+            continue
+        deleted.append(row.id)
+        logger.warning(
+            f"删除重复的匹配记录: ID={row.id}, 分数={row.match_score}, "
+            f"简历ID={row.resume_id}, 职位ID={row.job_id}, 保留ID={kept[key]}"
+        )
+    
+    matches = sa.table('matches', sa.column('id', sa.Integer()))
+    for start in range(0, len(deleted), _DELETE_BATCH):
+        bind.execute(matches.delete().where(matches.c.id.in_(deleted[start:start + _DELETE_BATCH])))
+    if deleted:
+        logger.warning(f"共删除重复的匹配记录: {len(deleted)} 条")
+    return deleted
+
+
+def upgrade():
+    # 唯一索引建立前清理重复的匹配记录（策略见模块说明）
+    _dedupe_matches()
+    op.create_index('ix_matches_resume_id_job_id', 'matches', ['resume_id', 'job_id'], unique=True)
+    op.create_index('ix_matches_job_id_match_score', 'matches', ['job_id', sa.text('match_score DESC')], unique=False)
+    op.create_index(op.f('ix_resumes_created_at'), 'resumes', ['created_at'], unique=False)
+    op.create_index(op.f('ix_job_requirements_created_at'), 'job_requirements', ['created_at'], unique=False)
+    op.create_index(op.f('ix_plans_created_at'), 'plans', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_plans_created_at'), table_name='plans')
+    op.drop_index(op.f('ix_job_requirements_created_at'), table_name='job_requirements')
+    op.drop_index(op.f('ix_resumes_created_at'), table_name='resumes')
+    op.drop_index('ix_matches_job_id_match_score', table_name='matches')
+    op.drop_index('ix_matches_resume_id_job_id', table_name='matches')
@@ -0,0 +1,25 @@
+"""添加匹配分数索引
+
+Revision ID: e4c81d07a6b2
+Revises: b7e3a9c2d415
+Create Date: 2026-10-18 16:48:55.113472
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4c81d07a6b2'
+down_revision = 'b7e3a9c2d415'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 匹配列表不筛选时按(匹配分数, ID)键集分页
+    op.create_index('ix_matches_match_score', 'matches', [sa.text('match_score DESC')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_matches_match_score', table_name='matches')
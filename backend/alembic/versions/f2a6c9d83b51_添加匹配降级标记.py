@@ -0,0 +1,34 @@
+"""添加匹配降级标记
+
+Revision ID: f2a6c9d83b51
+Revises: e4c81d07a6b2
+Create Date: 2026-10-18 18:05:37.284610
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a6c9d83b51'
+down_revision = 'e4c81d07a6b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 模型不可用时的估算或评估失败的匹配记录，下次匹配请求时重新评估
+    op.add_column('matches', sa.Column('is_degraded', sa.Boolean(), server_default=sa.false(), nullable=False,
+                                       comment='是否为降级评估结果（模型不可用时的估算或评估失败），下次匹配请求时重新评估'))
+    # 已保存的降级结果按匹配说明识别并标记
+    matches = sa.table('matches', sa.column('is_degraded', sa.Boolean()), sa.column('match_explanation', sa.Text()))
+    op.execute(
+        matches.update()
+        .where(sa.or_(matches.c.match_explanation.like('模型服务暂不可用%'),
+                      matches.c.match_explanation.like('匹配评估失败%')))
+        .values(is_degraded=True)
+    )
+
+
+def downgrade():
+    op.drop_column('matches', 'is_degraded')
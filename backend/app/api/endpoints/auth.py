@@ -2,8 +2,8 @@
 认证API端点
 """
 from datetime import timedelta
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.api.deps import get_current_active_user, get_current_superuser, authenticate_user
@@ -13,6 +13,7 @@ from app.db.session import get_db
 from app.models.user import User
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, UserUpdate, User as UserSchema
+from app.utils.pagination import NEXT_CURSOR_HEADER, paginate
 
 router = APIRouter()
 
@@ -131,15 +132,25 @@ def update_current_user(
 
 @router.get("/users", response_model=List[UserSchema])
 def read_users(
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="上一页响应头X-Next-Cursor返回的游标，指定时忽略skip"),
     current_user: User = Depends(get_current_superuser)
 ) -> Any:
     """
-    获取所有用户列表（仅超级用户可访问）
+    获取所有用户列表（仅超级用户可访问，按ID排序）
     """
-    users = db.query(User).offset(skip).limit(limit).all()
+    try:
+        users, next_cursor = paginate(db.query(User), [(User.id, False)], limit, cursor, skip)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return users
 
 @router.post("/users", response_model=UserSchema)
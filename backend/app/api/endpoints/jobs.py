@@ -1,17 +1,24 @@
 """
 招聘需求API端点
 """
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Body
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, UploadFile, File, Form, Body
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 import json
 from app.db.session import get_db
 from app.models.job_requirement import JobRequirement
-from app.schemas.job import Job, JobCreate, JobUpdate, JobParseResult
-from app.services.service_factory import get_ai_service, get_file_service
-from app.utils.db_utils import safe_commit
+from app.schemas.job import Job, JobCandidate, JobCreate, JobSummary, JobUpdate, JobParseResult
+from app.services.embedding_service import JOB
+from app.services.hybrid_retrieval import retrieve_candidates
+from app.services.service_factory import (
+    get_async_ai_service, get_embedding_service, get_resume_index, get_bm25_index, get_job_index
+)
+from app.utils.db_utils import safe_commit, save_and_refresh
+from app.utils.pagination import NEXT_CURSOR_HEADER, paginate
+from app.utils.projection import VIEW_PATTERN, columns, summary_fields, to_summaries
 
 # 获取日志记录器
 logger = logging.getLogger(__name__)
@@ -21,7 +28,8 @@ router = APIRouter()
 @router.post("/parse", response_model=JobParseResult)
 async def parse_job_requirement_document(
     *,
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    ai_service: Any = Depends(get_async_ai_service)
 ) -> Any:
     """
     解析招聘需求文档（不保存到数据库）
@@ -34,18 +42,8 @@ async def parse_job_requirement_document(
         content = await file.read()
         content_str = content.decode("utf-8", errors="ignore")
         
-        # 初始化AI服务
-        ai_service = get_ai_service()
-        
-        # 解析文档内容
-        parsed_content = ai_service.parse_job_requirement(content_str)
-        
-        # 提取职位标签
-        job_description = f"{parsed_content.get('position_name', '')}\n{parsed_content.get('responsibilities', '')}\n{parsed_content.get('requirements', '')}"
-        tags = ai_service.extract_job_tags(job_description)
-        
-        # 添加标签到解析结果
-        parsed_content["tags"] = tags
+        # 一次调用完成文档解析和职位标签提取
+        parsed_content = await ai_service.analyze_job_requirement(content_str)
         
         # 记录成功解析
         logger.info(f"成功解析招聘需求文档: 职位={parsed_content.get('position_name', '未知')}")
@@ -60,9 +58,12 @@ async def parse_job_requirement_document(
         )
 
 @router.post("", response_model=Job, status_code=status.HTTP_201_CREATED)
-def create_job_requirement(
+async def create_job_requirement(
     *,
     db: Session = Depends(get_db),
+    ai_service: Any = Depends(get_async_ai_service),
+    embedding_service: Any = Depends(get_embedding_service),
+    job_index: Any = Depends(get_job_index),
     job_in: JobCreate
 ) -> Any:
     """
@@ -72,12 +73,9 @@ def create_job_requirement(
         # 记录请求数据
         logger.info(f"创建招聘需求请求: {job_in.dict()}")
         
-        # 初始化AI服务
-        ai_service = get_ai_service()
-        
         # 提取职位标签
         job_description = f"{job_in.position_name}\n{job_in.responsibilities}\n{job_in.requirements}"
-        tags = ai_service.extract_job_tags(job_description)
+        tags = await ai_service.extract_job_tags(job_description)
         
         # 创建招聘需求
         job = JobRequirement(
@@ -90,12 +88,13 @@ def create_job_requirement(
             tags=tags
         )
         
-        # 保存到数据库
-        db.add(job)
-        if not safe_commit(db, "创建招聘需求失败"):
+        # 开启写事务前计算职位向量，保存到数据库时在同一事务中写入（在线程池中执行，避免阻塞事件循环）
+        vector = await run_in_threadpool(embedding_service.prepare_job, db, job)
+        if not await run_in_threadpool(
+            save_and_refresh, db, job, "创建招聘需求失败", lambda job: embedding_service.stage_job(db, job, vector)
+        ):
             raise HTTPException(status_code=500, detail="数据库保存失败")
-        
-        db.refresh(job)
+        await run_in_threadpool(job_index.upsert_job, job)
         
         # 记录成功创建
         logger.info(f"成功创建招聘需求: ID={job.id}, 职位={job.position_name}")
@@ -117,21 +116,30 @@ def create_job_requirement(
             detail=f"创建招聘需求失败: {str(e)}"
         )
 
-@router.get("", response_model=List[Job])
+@router.get("", response_model=Union[List[Job], List[JobSummary]], response_model_exclude_unset=True)
 def read_job_requirements(
     *,
     db: Session = Depends(get_db),
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="上一页响应头X-Next-Cursor返回的游标，指定时忽略skip"),
     position_name: Optional[str] = None,
-    department: Optional[str] = None
+    department: Optional[str] = None,
+    view: str = Query("full", pattern=VIEW_PATTERN, description="列表视图: full/summary，summary不返回大文本字段"),
+    fields: Optional[str] = Query(None, description="逗号分隔的摘要字段，只返回这些字段（隐含summary视图）")
 ) -> Any:
     """
     获取招聘需求列表
+    
+    按创建时间倒序；view=summary或指定fields时只查询摘要字段对应的列
     """
     try:
         # 构建查询
+        names = summary_fields(JobSummary, view, fields)
         query = db.query(JobRequirement)
+        if names is not None:
+            query = query.options(load_only(*columns(JobRequirement, names)))
         
         # 应用过滤条件
         if position_name:
@@ -139,11 +147,18 @@ def read_job_requirements(
         if department:
             query = query.filter(JobRequirement.department == department)
         
-        # 应用分页
-        jobs = query.order_by(JobRequirement.created_at.desc()).offset(skip).limit(limit).all()
+        # 应用分页：指定cursor时按键集分页，否则按偏移分页；下一页游标通过响应头返回
+        jobs, next_cursor = paginate(query, [(JobRequirement.created_at, True), (JobRequirement.id, True)], limit, cursor, skip)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         
-        return jobs
+        return jobs if names is None else to_summaries(JobSummary, jobs, names)
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except SQLAlchemyError as e:
         logger.error(f"数据库错误: {str(e)}")
         raise HTTPException(
@@ -192,10 +207,52 @@ def read_job_requirement(
             detail=f"获取招聘需求详情失败: {str(e)}"
         )
 
+@router.get("/{job_id}/candidates", response_model=List[JobCandidate])
+def read_job_candidates(
+    *,
+    db: Session = Depends(get_db),
+    job_id: int,
+    k: int = Query(20, gt=0, le=1000, description="返回的候选简历数"),
+    resume_index: Any = Depends(get_resume_index),
+    bm25_index: Any = Depends(get_bm25_index)
+) -> Any:
+    """
+    混合召回职位的候选简历（BM25词法召回与向量召回按倒数排名融合，不调用大模型），
+    可以只把返回的简历ID交给 /matches/batch 评分
+    """
+    try:
+        # 查询招聘需求
+        job = db.query(JobRequirement).filter(JobRequirement.id == job_id).first()
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"招聘需求不存在: ID={job_id}"
+            )
+        
+        return retrieve_candidates(db, job, k, resume_index, bm25_index)
+        
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        logger.error(f"数据库错误: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"数据库操作失败: {str(e)}"
+        )
+    except Exception as e:
+        logger.error(f"混合召回候选简历失败: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"混合召回候选简历失败: {str(e)}"
+        )
+
 @router.put("/{job_id}", response_model=Job)
-def update_job_requirement(
+async def update_job_requirement(
     *,
     db: Session = Depends(get_db),
+    ai_service: Any = Depends(get_async_ai_service),
+    embedding_service: Any = Depends(get_embedding_service),
+    job_index: Any = Depends(get_job_index),
     job_id: int,
     job_in: JobUpdate
 ) -> Any:
@@ -204,7 +261,7 @@ def update_job_requirement(
     """
     try:
         # 查询招聘需求
-        job = db.query(JobRequirement).filter(JobRequirement.id == job_id).first()
+        job = await run_in_threadpool(db.get, JobRequirement, job_id)
         if not job:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -216,15 +273,12 @@ def update_job_requirement(
         
         # 如果更新了职位描述相关字段，重新提取标签
         if any(field in update_data for field in ["position_name", "responsibilities", "requirements"]):
-            # 初始化AI服务
-            ai_service = get_ai_service()
-            
             # 提取职位标签
             position_name = update_data.get("position_name", job.position_name)
             responsibilities = update_data.get("responsibilities", job.responsibilities)
             requirements = update_data.get("requirements", job.requirements)
             job_description = f"{position_name}\n{responsibilities}\n{requirements}"
-            tags = ai_service.extract_job_tags(job_description)
+            tags = await ai_service.extract_job_tags(job_description)
             
             # 更新标签
             update_data["tags"] = tags
@@ -233,11 +287,14 @@ def update_job_requirement(
         for field, value in update_data.items():
             setattr(job, field, value)
         
-        # 保存到数据库
-        if not safe_commit(db, f"更新招聘需求失败: ID={job_id}"):
+        # 保存到数据库并同步职位向量（文本未变化时不会重新计算；计算在开启写事务之前）
+        vector = await run_in_threadpool(embedding_service.prepare_job, db, job)
+        if not await run_in_threadpool(
+            save_and_refresh, db, job, f"更新招聘需求失败: ID={job_id}",
+            lambda job: embedding_service.stage_job(db, job, vector)
+        ):
             raise HTTPException(status_code=500, detail="数据库保存失败")
-        
-        db.refresh(job)
+        await run_in_threadpool(job_index.upsert_job, job)
         
         # 记录成功更新
         logger.info(f"成功更新招聘需求: ID={job.id}, 职位={job.position_name}")
@@ -263,6 +320,8 @@ def update_job_requirement(
 def delete_job_requirement(
     *,
     db: Session = Depends(get_db),
+    embedding_service: Any = Depends(get_embedding_service),
+    job_index: Any = Depends(get_job_index),
     job_id: int
 ):
     """
@@ -277,10 +336,12 @@ def delete_job_requirement(
                 detail=f"招聘需求不存在: ID={job_id}"
             )
         
-        # 删除招聘需求
+        # 删除招聘需求及其向量
         db.delete(job)
+        embedding_service.delete(db, JOB, job_id)
         if not safe_commit(db, f"删除招聘需求失败: ID={job_id}"):
             raise HTTPException(status_code=500, detail="数据库操作失败")
+        job_index.remove_job(job_id)
         
         # 记录成功删除
         logger.info(f"成功删除招聘需求: ID={job_id}")
@@ -304,6 +365,9 @@ def delete_job_requirement(
 async def upload_job_requirement(
     *,
     db: Session = Depends(get_db),
+    ai_service: Any = Depends(get_async_ai_service),
+    embedding_service: Any = Depends(get_embedding_service),
+    job_index: Any = Depends(get_job_index),
     file: UploadFile = File(...),
     position_name: Optional[str] = Form(None),
     department: Optional[str] = Form(None)
@@ -319,15 +383,9 @@ async def upload_job_requirement(
         content = await file.read()
         content_str = content.decode("utf-8", errors="ignore")
         
-        # 初始化AI服务
-        ai_service = get_ai_service()
-        
-        # 解析文档内容
-        parsed_content = ai_service.parse_job_requirement(content_str)
-        
-        # 提取职位标签
-        job_description = f"{parsed_content.get('position_name', '')}\n{parsed_content.get('responsibilities', '')}\n{parsed_content.get('requirements', '')}"
-        tags = ai_service.extract_job_tags(job_description)
+        # 一次调用完成文档解析和职位标签提取
+        parsed_content = await ai_service.analyze_job_requirement(content_str)
+        tags = parsed_content.get("tags", [])
         
         # 使用解析结果或表单提供的值
         job_position_name = position_name or parsed_content.get("position_name", "未命名职位")
@@ -344,12 +402,13 @@ async def upload_job_requirement(
             tags=tags
         )
         
-        # 保存到数据库
-        db.add(job)
-        if not safe_commit(db, "创建招聘需求失败"):
+        # 开启写事务前计算职位向量，保存到数据库时在同一事务中写入（在线程池中执行，避免阻塞事件循环）
+        vector = await run_in_threadpool(embedding_service.prepare_job, db, job)
+        if not await run_in_threadpool(
+            save_and_refresh, db, job, "创建招聘需求失败", lambda job: embedding_service.stage_job(db, job, vector)
+        ):
             raise HTTPException(status_code=500, detail="数据库保存失败")
-        
-        db.refresh(job)
+        await run_in_threadpool(job_index.upsert_job, job)
         
         # 记录成功创建
         logger.info(f"成功创建招聘需求: ID={job.id}, 职位={job.position_name}")
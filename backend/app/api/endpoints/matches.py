@@ -1,39 +1,136 @@
 """
 匹配API端点
 """
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Body, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 from app.db.session import get_db
 from app.models.match import Match
 from app.models.resume import Resume
 from app.models.job_requirement import JobRequirement
-from app.schemas.match import Match as MatchSchema, MatchCreate
-from app.services.service_factory import get_ai_service
+from app.schemas.job import JobSummary
+from app.schemas.match import Match as MatchSchema, MatchCreate, MatchSummary
+from app.schemas.resume import ResumeSummary
+from app.core.config import settings
+from app.services.service_factory import get_async_ai_service, get_resume_index, get_bm25_index
 from app.utils.db_utils import safe_commit
+from app.utils.pagination import NEXT_CURSOR_HEADER, paginate
+from app.utils.projection import VIEW_PATTERN, columns, summary_fields, to_summaries
 
 # 获取日志记录器
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# 评分模式：llm 全部由大模型评估；local 只用本地BM25评估；hybrid 本地评估后只把边界分数交给大模型
+SCORING_PATTERN = "^(llm|local|hybrid)$"
+
+def _needs_llm(scoring: str, local_result: Optional[Dict[str, Any]]) -> bool:
+    """判断本地评估结果是否需要交给大模型复评"""
+    if scoring == "llm" or local_result is None:
+        return True
+    if scoring == "local":
+        return False
+    return settings.MATCH_HYBRID_LOW_SCORE <= local_result["score"] < settings.MATCH_HYBRID_HIGH_SCORE
+
+def _apply_match_result(match: Match, match_result: Dict[str, Any]) -> None:
+    """写入评估结果；降级结果（模型不可用时的估算或评估失败）标记后在下次匹配请求时重新评估"""
+    match.match_score = match_result.get("score", 0)
+    match.match_explanation = match_result.get("explanation", "")
+    match.is_degraded = bool(match_result.get("degraded", False))
+
+def _match_query(db: Session):
+    """
+    匹配查询（预加载响应中嵌套的简历、简历标签和职位）
+    
+    简历和职位是多对一关系，随匹配记录JOIN加载；简历标签是多对多关系，
+    按本页全部简历ID一次IN查询加载，语句数不随返回条数增长
+    """
+    return db.query(Match).options(
+        joinedload(Match.resume).selectinload(Resume.tags),
+        joinedload(Match.job)
+    )
+
+def _match_summary_query(db: Session, names: List[str]):
+    """匹配摘要查询：匹配记录只查询所选列，所选的简历和职位只预加载摘要列"""
+    options = [load_only(*columns(Match, names))]
+    if "resume" in names:
+        options.append(
+            joinedload(Match.resume).load_only(*columns(Resume, ResumeSummary.model_fields)).selectinload(Resume.tags)
+        )
+    if "job" in names:
+        options.append(joinedload(Match.job).load_only(*columns(JobRequirement, JobSummary.model_fields)))
+    return db.query(Match).options(*options)
+
+def _find_match(db: Session, resume_id: int, job_id: int) -> Optional[Match]:
+    """查询简历与职位已存在的匹配记录"""
+    return db.query(Match).filter(
+        Match.resume_id == resume_id,
+        Match.job_id == job_id
+    ).first()
+
+def _load_batch_candidates(db: Session, job_id: int, resume_ids: List[int]) -> List[Any]:
+    """
+    加载批量匹配的候选简历及已存在的匹配记录
+    
+    简历和已存在的匹配记录各一次IN查询，语句数不随简历数增长
+    
+    Returns:
+        List: (简历ID, 简历, 已存在的匹配记录) 列表，顺序与resume_ids一致（重复的ID只保留一次）
+    """
+    resume_ids = list(dict.fromkeys(resume_ids))
+    resumes = {}
+    if resume_ids:
+        resumes = {resume.id: resume for resume in db.query(Resume).filter(Resume.id.in_(resume_ids))}
+    existing_matches = {}
+    if resumes:
+        existing_matches = {
+            match.resume_id: match
+            for match in db.query(Match).filter(Match.job_id == job_id, Match.resume_id.in_(list(resumes)))
+        }
+    return [(resume_id, resumes.get(resume_id), existing_matches.get(resume_id)) for resume_id in resume_ids]
+
+def _load_matches(db: Session, match_ids: List[int]) -> List[Match]:
+    """按ID重新查询匹配记录并预加载响应中嵌套的对象（顺序与match_ids一致），序列化时不再懒加载"""
+    if not match_ids:
+        return []
+    matches = {match.id: match for match in _match_query(db).filter(Match.id.in_(match_ids))}
+    return [matches[match_id] for match_id in match_ids if match_id in matches]
+
+def _save_matches(db: Session, matches: List[Match]) -> Optional[List[Match]]:
+    """在同一事务中保存多条匹配记录，返回预加载后的记录（已持久化的记录原样包含），失败时返回None"""
+    db.add_all(matches)
+    # 提交前取得ID，提交后对象已过期，逐个访问ID会逐条刷新
+    db.flush()
+    match_ids = [match.id for match in matches]
+    if not safe_commit(db, "批量创建匹配记录失败"):
+        return None
+    return _load_matches(db, match_ids)
+
 @router.post("", response_model=MatchSchema, status_code=status.HTTP_201_CREATED)
-def create_match(
+async def create_match(
     *,
     db: Session = Depends(get_db),
-    match_in: MatchCreate
+    ai_service: Any = Depends(get_async_ai_service),
+    bm25_index: Any = Depends(get_bm25_index),
+    match_in: MatchCreate,
+    scoring: str = Query("llm", pattern=SCORING_PATTERN, description="评分模式: llm/local/hybrid")
 ) -> Any:
     """
     创建简历与职位匹配
+    
+    scoring=local时只用本地BM25评估，不调用大模型；scoring=hybrid时本地分数处于边界区间才调用大模型；
+    已存在的降级匹配记录（模型不可用时的估算或评估失败）重新评估并更新
     """
     try:
         # 记录请求数据
         logger.info(f"创建匹配请求: 简历ID={match_in.resume_id}, 职位ID={match_in.job_id}")
         
         # 检查简历是否存在
-        resume = db.query(Resume).filter(Resume.id == match_in.resume_id).first()
+        resume = await run_in_threadpool(db.get, Resume, match_in.resume_id)
         if not resume:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -41,7 +138,7 @@ def create_match(
             )
         
         # 检查职位是否存在
-        job = db.query(JobRequirement).filter(JobRequirement.id == match_in.job_id).first()
+        job = await run_in_threadpool(db.get, JobRequirement, match_in.job_id)
         if not job:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -49,40 +146,37 @@ def create_match(
             )
         
         # 检查是否已存在匹配记录
-        existing_match = db.query(Match).filter(
-            Match.resume_id == match_in.resume_id,
-            Match.job_id == match_in.job_id
-        ).first()
+        existing_match = await run_in_threadpool(_find_match, db, match_in.resume_id, match_in.job_id)
         
-        if existing_match:
+        if existing_match and not existing_match.is_degraded:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"已存在匹配记录: ID={existing_match.id}"
             )
-        
-        # 初始化AI服务
-        ai_service = get_ai_service()
+        if existing_match:
+            logger.info(f"重新评估降级的匹配记录: ID={existing_match.id}")
         
         # 匹配简历与职位
-        match_result = ai_service.match_resume_to_job(
-            resume_content=resume.ocr_content,
-            job_requirements=f"{job.position_name}\n{job.responsibilities}\n{job.requirements}"
-        )
+        job_requirements = f"{job.position_name}\n{job.responsibilities}\n{job.requirements}"
+        match_result = None
+        if scoring != "llm":
+            local_results = await run_in_threadpool(bm25_index.match_resumes, db, job_requirements, [resume.id])
+            match_result = local_results.get(resume.id)
+        if _needs_llm(scoring, match_result):
+            match_result = await ai_service.match_resume_to_job(
+                resume_content=resume.ocr_content,
+                job_requirements=job_requirements
+            )
         
-        # 创建匹配记录
-        match = Match(
-            resume_id=match_in.resume_id,
-            job_id=match_in.job_id,
-            match_score=match_result.get("score", 0),
-            match_explanation=match_result.get("explanation", "")
-        )
+        # 创建匹配记录（降级的已有记录原地更新）
+        match = existing_match or Match(resume_id=match_in.resume_id, job_id=match_in.job_id)
+        _apply_match_result(match, match_result)
         
-        # 保存到数据库
-        db.add(match)
-        if not safe_commit(db, "创建匹配记录失败"):
+        # 保存到数据库，并预加载响应中嵌套的简历和职位（在线程池中执行，序列化时不在事件循环中懒加载）
+        saved = await run_in_threadpool(_save_matches, db, [match])
+        if not saved:
             raise HTTPException(status_code=500, detail="数据库保存失败")
-        
-        db.refresh(match)
+        match = saved[0]
         
         # 记录成功创建
         logger.info(f"成功创建匹配记录: ID={match.id}, 分数={match.match_score}")
@@ -104,22 +198,29 @@ def create_match(
             detail=f"创建匹配记录失败: {str(e)}"
         )
 
-@router.get("", response_model=List[MatchSchema])
+@router.get("", response_model=Union[List[MatchSchema], List[MatchSummary]], response_model_exclude_unset=True)
 def read_matches(
     *,
     db: Session = Depends(get_db),
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="上一页响应头X-Next-Cursor返回的游标，指定时忽略skip"),
     resume_id: Optional[int] = None,
     job_id: Optional[int] = None,
-    min_score: Optional[float] = None
+    min_score: Optional[float] = None,
+    view: str = Query("full", pattern=VIEW_PATTERN, description="列表视图: full/summary，summary不返回大文本字段"),
+    fields: Optional[str] = Query(None, description="逗号分隔的摘要字段，只返回这些字段（隐含summary视图）")
 ) -> Any:
     """
     获取匹配列表
+    
+    按匹配分数倒序（同分按ID）；view=summary或指定fields时只查询摘要字段对应的列，嵌套的简历和职位也只返回摘要
     """
     try:
         # 构建查询
-        query = db.query(Match)
+        names = summary_fields(MatchSummary, view, fields)
+        query = _match_query(db) if names is None else _match_summary_query(db, names)
         
         # 应用过滤条件
         if resume_id:
@@ -129,11 +230,18 @@ def read_matches(
         if min_score:
             query = query.filter(Match.match_score >= min_score)
         
-        # 应用分页
-        matches = query.order_by(Match.match_score.desc()).offset(skip).limit(limit).all()
+        # 应用分页：指定cursor时按键集分页，否则按偏移分页；下一页游标通过响应头返回
+        matches, next_cursor = paginate(query, [(Match.match_score, True), (Match.id, False)], limit, cursor, skip)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         
-        return matches
+        return matches if names is None else to_summaries(MatchSummary, matches, names)
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except SQLAlchemyError as e:
         logger.error(f"数据库错误: {str(e)}")
         raise HTTPException(
@@ -158,7 +266,7 @@ def read_match(
     """
     try:
         # 查询匹配
-        match = db.query(Match).filter(Match.id == match_id).first()
+        match = _match_query(db).filter(Match.id == match_id).first()
         if not match:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -224,75 +332,100 @@ def delete_match(
         )
 
 @router.post("/batch", response_model=List[MatchSchema])
-def create_batch_matches(
+async def create_batch_matches(
     *,
     db: Session = Depends(get_db),
+    ai_service: Any = Depends(get_async_ai_service),
+    resume_index: Any = Depends(get_resume_index),
+    bm25_index: Any = Depends(get_bm25_index),
     job_id: int = Body(..., embed=True),
-    resume_ids: List[int] = Body(..., embed=True)
+    resume_ids: Optional[List[int]] = Body(None, embed=True),
+    top_k: Optional[int] = Body(None, embed=True, gt=0),
+    scoring: str = Query("llm", pattern=SCORING_PATTERN, description="评分模式: llm/local/hybrid")
 ) -> Any:
     """
     批量创建匹配
+    
+    未指定resume_ids时先按简历向量索引在全部简历中召回top_k份（默认MATCH_RETRIEVAL_TOP_K）再交给大模型评分；
+    同时指定resume_ids和top_k时，只评分指定范围内最相近的top_k份；
+    scoring=local时只用本地BM25评估，scoring=hybrid时只把本地分数处于边界区间的简历交给大模型；
+    已存在的降级匹配记录重新评估，未获得评估结果的简历不保存
     """
     try:
         # 记录请求数据
         logger.info(f"批量创建匹配请求: 职位ID={job_id}, 简历IDs={resume_ids}")
         
         # 检查职位是否存在
-        job = db.query(JobRequirement).filter(JobRequirement.id == job_id).first()
+        job = await run_in_threadpool(db.get, JobRequirement, job_id)
         if not job:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"职位不存在: ID={job_id}"
             )
         
-        # 初始化AI服务
-        ai_service = get_ai_service()
-        
         # 职位需求文本
         job_requirements = f"{job.position_name}\n{job.responsibilities}\n{job.requirements}"
         
+        # 向量召回候选简历（内存索引，无需扫描简历表）
+        if resume_ids is None or top_k:
+            retrieved = await run_in_threadpool(
+                resume_index.search_job, db, job, top_k or settings.MATCH_RETRIEVAL_TOP_K, resume_ids
+            )
+            resume_ids = [resume_id for resume_id, _ in retrieved]
+            logger.info(f"向量召回候选简历: 数量={len(resume_ids)}")
+        
+        # 加载候选简历及已存在的匹配记录
+        candidates = await run_in_threadpool(_load_batch_candidates, db, job_id, resume_ids)
+        
+        # 收集需要评估的简历（含降级的已有记录），批量匹配
+        to_score = {
+            resume_id: resume.ocr_content
+            for resume_id, resume, existing_match in candidates
+            if resume and (not existing_match or existing_match.is_degraded)
+        }
+        match_results = {}
+        if scoring != "llm" and to_score:
+            match_results = await run_in_threadpool(bm25_index.match_resumes, db, job_requirements, list(to_score))
+        to_llm = {
+            resume_id: content
+            for resume_id, content in to_score.items()
+            if _needs_llm(scoring, match_results.get(resume_id))
+        }
+        if to_llm:
+            logger.info(f"交给大模型评估的简历: 数量={len(to_llm)}/{len(to_score)}, 评分模式={scoring}")
+            match_results.update(await ai_service.match_resumes_to_job(job_requirements, to_llm))
+        
         # 创建匹配记录
         matches = []
-        for resume_id in resume_ids:
+        for resume_id, resume, existing_match in candidates:
             # 检查简历是否存在
-            resume = db.query(Resume).filter(Resume.id == resume_id).first()
             if not resume:
                 logger.warning(f"简历不存在: ID={resume_id}")
                 continue
             
             # 检查是否已存在匹配记录
-            existing_match = db.query(Match).filter(
-                Match.resume_id == resume_id,
-                Match.job_id == job_id
-            ).first()
-            
-            if existing_match:
+            if existing_match and not existing_match.is_degraded:
                 logger.warning(f"已存在匹配记录: ID={existing_match.id}")
                 matches.append(existing_match)
                 continue
             
-            # 匹配简历与职位
-            match_result = ai_service.match_resume_to_job(
-                resume_content=resume.ocr_content,
-                job_requirements=job_requirements
-            )
-            
-            # 创建匹配记录
-            match = Match(
-                resume_id=resume_id,
-                job_id=job_id,
-                match_score=match_result.get("score", 0),
-                match_explanation=match_result.get("explanation", "")
-            )
+            # 未获得评估结果的简历不保存分数
+            match_result = match_results.get(resume_id)
+            if match_result is None:
+                logger.warning(f"未获得评估结果，跳过: 简历ID={resume_id}")
+                if existing_match:
+                    matches.append(existing_match)
+                continue
             
-            # 添加到数据库
-            db.add(match)
-            db.flush()
+            # 创建匹配记录（降级的已有记录原地更新）
+            match = existing_match or Match(resume_id=resume_id, job_id=job_id)
+            _apply_match_result(match, match_result)
             
             matches.append(match)
         
-        # 提交事务
-        if not safe_commit(db, "批量创建匹配记录失败"):
+        # 在同一事务中提交所有新匹配记录
+        matches = await run_in_threadpool(_save_matches, db, matches)
+        if matches is None:
             raise HTTPException(status_code=500, detail="数据库保存失败")
         
         # 记录成功创建
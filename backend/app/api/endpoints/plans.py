@@ -1,25 +1,46 @@
 """
 招聘方案API端点
 """
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, Body
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 from app.db.session import get_db
 from app.models.plan import Plan
 from app.models.job_requirement import JobRequirement
 from app.models.match import Match
-from app.models.resume import Resume
 from app.schemas.plan import Plan as PlanSchema, PlanCreate, PlanUpdate
-from app.services.service_factory import get_ai_service
-from app.utils.db_utils import safe_commit
+from app.services.service_factory import get_async_ai_service
+from app.utils.db_utils import safe_commit, save_and_refresh
+from app.utils.pagination import NEXT_CURSOR_HEADER, paginate
 
 # 获取日志记录器
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def _load_matched_resumes(db: Session, job_id: int, min_score: float) -> List[Dict[str, Any]]:
+    """查询职位下匹配分数不低于min_score的简历（按匹配度排序）"""
+    matches = db.query(Match).options(joinedload(Match.resume)).filter(
+        Match.job_id == job_id,
+        Match.match_score >= min_score
+    ).order_by(Match.match_score.desc()).all()
+    
+    matched_resumes = []
+    for match in matches:
+        resume = match.resume
+        if resume:
+            matched_resumes.append({
+                "resume_id": resume.id,
+                "candidate_name": resume.candidate_name,
+                "talent_portrait": resume.talent_portrait,
+                "match_score": match.match_score,
+                "match_explanation": match.match_explanation
+            })
+    return matched_resumes
+
 @router.post("", response_model=PlanSchema, status_code=status.HTTP_201_CREATED)
 def create_plan(
     *,
@@ -81,26 +102,35 @@ def create_plan(
 def read_plans(
     *,
     db: Session = Depends(get_db),
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="上一页响应头X-Next-Cursor返回的游标，指定时忽略skip"),
     job_id: Optional[int] = None
 ) -> Any:
     """
-    获取招聘方案列表
+    获取招聘方案列表（按创建时间倒序）
     """
     try:
-        # 构建查询
-        query = db.query(Plan)
+        # 构建查询（职位和创建人随方案JOIN加载）
+        query = db.query(Plan).options(joinedload(Plan.job), joinedload(Plan.creator))
         
         # 应用过滤条件
         if job_id:
             query = query.filter(Plan.job_id == job_id)
         
-        # 应用分页
-        plans = query.order_by(Plan.created_at.desc()).offset(skip).limit(limit).all()
+        # 应用分页：指定cursor时按键集分页，否则按偏移分页；下一页游标通过响应头返回
+        plans, next_cursor = paginate(query, [(Plan.created_at, True), (Plan.id, True)], limit, cursor, skip)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         
         return plans
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except SQLAlchemyError as e:
         logger.error(f"数据库错误: {str(e)}")
         raise HTTPException(
@@ -125,7 +155,7 @@ def read_plan(
     """
     try:
         # 查询招聘方案
-        plan = db.query(Plan).filter(Plan.id == plan_id).first()
+        plan = db.query(Plan).options(joinedload(Plan.job), joinedload(Plan.creator)).filter(Plan.id == plan_id).first()
         if not plan:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -243,9 +273,10 @@ def delete_plan(
         )
 
 @router.post("/generate", response_model=PlanSchema)
-def generate_plan(
+async def generate_plan(
     *,
     db: Session = Depends(get_db),
+    ai_service: Any = Depends(get_async_ai_service),
     job_id: int = Body(..., embed=True),
     min_score: float = Body(70.0, embed=True),
     title: str = Body(..., embed=True)
@@ -258,7 +289,7 @@ def generate_plan(
         logger.info(f"自动生成招聘方案请求: 职位ID={job_id}, 最低分数={min_score}")
         
         # 检查职位是否存在
-        job = db.query(JobRequirement).filter(JobRequirement.id == job_id).first()
+        job = await run_in_threadpool(db.get, JobRequirement, job_id)
         if not job:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -266,35 +297,16 @@ def generate_plan(
             )
         
         # 查询匹配的简历
-        matches = db.query(Match).filter(
-            Match.job_id == job_id,
-            Match.match_score >= min_score
-        ).order_by(Match.match_score.desc()).all()
+        matched_resumes = await run_in_threadpool(_load_matched_resumes, db, job_id, min_score)
         
-        if not matches:
+        if not matched_resumes:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"没有找到匹配分数大于{min_score}的简历"
             )
         
-        # 初始化AI服务
-        ai_service = get_ai_service()
-        
-        # 准备匹配简历数据
-        matched_resumes = []
-        for match in matches:
-            resume = db.query(Resume).filter(Resume.id == match.resume_id).first()
-            if resume:
-                matched_resumes.append({
-                    "resume_id": resume.id,
-                    "candidate_name": resume.candidate_name,
-                    "talent_portrait": resume.talent_portrait,
-                    "match_score": match.match_score,
-                    "match_explanation": match.match_explanation
-                })
-        
         # 生成招聘方案
-        plan_data = ai_service.generate_recruitment_plan(
+        plan_data = await ai_service.generate_recruitment_plan(
             job_requirement=job.to_dict(),
             matched_resumes=matched_resumes
         )
@@ -309,12 +321,9 @@ def generate_plan(
         )
         
         # 保存到数据库
-        db.add(plan)
-        if not safe_commit(db, "创建招聘方案失败"):
+        if not await run_in_threadpool(save_and_refresh, db, plan, "创建招聘方案失败"):
             raise HTTPException(status_code=500, detail="数据库保存失败")
         
-        db.refresh(plan)
-        
         # 记录成功创建
         logger.info(f"成功自动生成招聘方案: ID={plan.id}, 标题={plan.title}")
         
@@ -1,27 +1,74 @@
 """
 简历API端点
 """
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+import asyncio
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, load_only, selectinload
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 from app.db.session import get_db
+from app.models.job_requirement import JobRequirement
 from app.models.resume import Resume
 from app.models.tag import Tag
-from app.schemas.resume import Resume as ResumeSchema, ResumeCreate, ResumeUpdate
-from app.services.service_factory import get_ai_service, get_file_service
+from app.schemas.job import RecommendedJob
+from app.schemas.resume import Resume as ResumeSchema, ResumeCreate, ResumeSearchPage, ResumeSummary, ResumeUpdate
+from app.services.embedding_service import RESUME
+from app.services.hybrid_retrieval import recommend_jobs
+from app.services.resume_search import search_resumes
+from app.services.tag_service import add_resume_tags
+from app.services.service_factory import (
+    get_async_ai_service, get_file_service, get_embedding_service, get_resume_indexes, get_job_index
+)
 from app.utils.db_utils import safe_commit
+from app.utils.pagination import NEXT_CURSOR_HEADER, paginate
+from app.utils.projection import VIEW_PATTERN, columns, summary_fields, to_summaries
 
 # 获取日志记录器
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def _save_uploaded_resume(db: Session, resume: Resume, tag_names: List[str], embedding_service: Any,
+                          resume_indexes: List[Any]) -> Resume:
+    """
+    保存上传的简历及其标签，提交后更新简历检索索引
+    
+    简历、标签及关联、简历向量在同一事务中写入；包含阻塞的数据库往返和索引更新，由async端点通过run_in_threadpool调用
+    """
+    # 开启写事务前计算简历向量
+    vector = embedding_service.prepare_resume(db, resume)
+    
+    # 保存到数据库（flush获得ID）
+    db.add(resume)
+    db.flush()
+    
+    # 批量查找或创建标签并写入关联
+    add_resume_tags(db, resume.id, tag_names)
+    
+    # 在同一事务中写入简历向量
+    embedding_service.stage_resume(db, resume, vector)
+    
+    if not safe_commit(db, "创建简历记录失败"):
+        raise HTTPException(status_code=500, detail="数据库保存失败")
+    
+    db.refresh(resume)
+    # 预加载标签，避免序列化时在事件循环中触发懒加载
+    resume.tags
+    
+    for index in resume_indexes:
+        index.upsert_resume(resume)
+    return resume
+
 @router.post("/upload", response_model=ResumeSchema, status_code=status.HTTP_201_CREATED)
 async def upload_resume(
     *,
     db: Session = Depends(get_db),
+    file_service: Any = Depends(get_file_service),
+    ai_service: Any = Depends(get_async_ai_service),
+    embedding_service: Any = Depends(get_embedding_service),
+    resume_indexes: List[Any] = Depends(get_resume_indexes),
     file: UploadFile = File(...),
     candidate_name: Optional[str] = Form(None)
 ) -> Any:
@@ -32,27 +79,18 @@ async def upload_resume(
         # 记录请求数据
         logger.info(f"上传简历请求: 文件名={file.filename}, 候选人={candidate_name}")
         
-        # 获取文件服务
-        file_service = get_file_service()
-        
         # 上传文件
         file_info = await file_service.upload_file(file, folder="resumes")
         
-        # 获取文件内容
-        file_content = file_service.get_file_content(file_info["file_path"])
+        # 获取文件内容（阻塞读取放入线程池）
+        file_content = await run_in_threadpool(file_service.get_file_content, file_info["file_path"])
         content_str = file_content.decode("utf-8", errors="ignore")
         
-        # 初始化AI服务
-        ai_service = get_ai_service()
-        
-        # 解析简历内容
-        parsed_content = ai_service.parse_resume(content_str)
-        
-        # 生成人才画像
-        talent_portrait = ai_service.generate_talent_portrait(parsed_content)
-        
-        # 提取标签
-        resume_tags = ai_service.generate_resume_tags(content_str)
+        # 一次调用完成简历解析、人才画像生成和标签提取
+        analysis = await ai_service.analyze_resume(content_str)
+        parsed_content = analysis["parsed_content"]
+        talent_portrait = analysis["talent_portrait"]
+        resume_tags = analysis["tags"]
         
         # 如果没有提供候选人姓名，使用解析结果
         if not candidate_name and parsed_content.get("name"):
@@ -68,27 +106,9 @@ async def upload_resume(
             talent_portrait=talent_portrait
         )
         
-        # 保存到数据库
-        db.add(resume)
-        if not safe_commit(db, "创建简历记录失败"):
-            raise HTTPException(status_code=500, detail="数据库保存失败")
-        
-        # 添加标签
-        for tag_name in resume_tags:
-            # 查找或创建标签
-            tag = db.query(Tag).filter(Tag.name == tag_name).first()
-            if not tag:
-                tag = Tag(name=tag_name, category="skill")
-                db.add(tag)
-                db.flush()
-            
-            # 添加标签关联
-            resume.tags.append(tag)
-        
-        if not safe_commit(db, "添加简历标签失败"):
-            raise HTTPException(status_code=500, detail="数据库保存失败")
-        
-        db.refresh(resume)
+        # 保存简历及标签并更新检索索引（数据库操作和索引更新放入线程池）
+        resume = await run_in_threadpool(_save_uploaded_resume, db, resume, resume_tags, embedding_service,
+                                         resume_indexes)
         
         # 记录成功创建
         logger.info(f"成功创建简历记录: ID={resume.id}, 候选人={resume.candidate_name}")
@@ -114,6 +134,8 @@ async def upload_resume(
 def create_resume(
     *,
     db: Session = Depends(get_db),
+    embedding_service: Any = Depends(get_embedding_service),
+    resume_indexes: List[Any] = Depends(get_resume_indexes),
     resume_in: ResumeCreate
 ) -> Any:
     """
@@ -133,12 +155,17 @@ def create_resume(
             talent_portrait=resume_in.talent_portrait
         )
         
-        # 保存到数据库
+        # 开启写事务前计算简历向量，保存到数据库时在同一事务中写入
+        vector = embedding_service.prepare_resume(db, resume)
         db.add(resume)
+        db.flush()
+        embedding_service.stage_resume(db, resume, vector)
         if not safe_commit(db, "创建简历记录失败"):
             raise HTTPException(status_code=500, detail="数据库保存失败")
         
         db.refresh(resume)
+        for index in resume_indexes:
+            index.upsert_resume(resume)
         
         # 记录成功创建
         logger.info(f"成功创建简历记录: ID={resume.id}, 候选人={resume.candidate_name}")
@@ -160,21 +187,32 @@ def create_resume(
             detail=f"创建简历失败: {str(e)}"
         )
 
-@router.get("", response_model=List[ResumeSchema])
+@router.get("", response_model=Union[List[ResumeSchema], List[ResumeSummary]], response_model_exclude_unset=True)
 def read_resumes(
     *,
     db: Session = Depends(get_db),
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="上一页响应头X-Next-Cursor返回的游标，指定时忽略skip"),
     candidate_name: Optional[str] = None,
-    tag: Optional[str] = None
+    tag: Optional[str] = None,
+    view: str = Query("full", pattern=VIEW_PATTERN, description="列表视图: full/summary，summary不返回大文本字段"),
+    fields: Optional[str] = Query(None, description="逗号分隔的摘要字段，只返回这些字段（隐含summary视图）")
 ) -> Any:
     """
     获取简历列表
+    
+    按创建时间倒序；view=summary或指定fields时只查询摘要字段对应的列
     """
     try:
-        # 构建查询
+        # 构建查询（标签按本页简历ID一次IN查询预加载）
+        names = summary_fields(ResumeSummary, view, fields)
         query = db.query(Resume)
+        if names is not None:
+            query = query.options(load_only(*columns(Resume, names)))
+        if names is None or "tags" in names:
+            query = query.options(selectinload(Resume.tags))
         
         # 应用过滤条件
         if candidate_name:
@@ -184,11 +222,18 @@ def read_resumes(
         if tag:
             query = query.join(Resume.tags).filter(Tag.name == tag)
         
-        # 应用分页
-        resumes = query.order_by(Resume.created_at.desc()).offset(skip).limit(limit).all()
+        # 应用分页：指定cursor时按键集分页，否则按偏移分页；下一页游标通过响应头返回
+        resumes, next_cursor = paginate(query, [(Resume.created_at, True), (Resume.id, True)], limit, cursor, skip)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         
-        return resumes
+        return resumes if names is None else to_summaries(ResumeSummary, resumes, names)
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except SQLAlchemyError as e:
         logger.error(f"数据库错误: {str(e)}")
         raise HTTPException(
@@ -202,6 +247,39 @@ def read_resumes(
             detail=f"获取简历列表失败: {str(e)}"
         )
 
+@router.get("/search", response_model=ResumeSearchPage)
+def search_resume_content(
+    q: str = Query(..., min_length=1, description="检索词，多个词以空格分隔，全部命中才返回"),
+    limit: int = Query(20, gt=0, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="上一页返回的next_cursor"),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    全文检索简历
+    
+    在OCR内容、人才画像和解析内容中检索，按相关度排序并返回命中片段，使用游标分页
+    """
+    try:
+        return search_resumes(db, q, limit, cursor)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except SQLAlchemyError as e:
+        logger.error(f"数据库错误: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"数据库操作失败: {str(e)}"
+        )
+    except Exception as e:
+        logger.error(f"简历全文检索失败: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"简历全文检索失败: {str(e)}"
+        )
+
 @router.get("/{resume_id}", response_model=ResumeSchema)
 def read_resume(
     *,
@@ -237,10 +315,86 @@ def read_resume(
             detail=f"获取简历详情失败: {str(e)}"
         )
 
+def _recommend_jobs(db: Session, resume: Resume, k: int, job_index: Any) -> List[dict]:
+    """计算职位推荐并补充职位名称（阻塞的数据库和矩阵运算，由async端点通过run_in_threadpool调用）"""
+    recommendations = recommend_jobs(db, resume, k, job_index)
+    jobs = db.query(JobRequirement).filter(
+        JobRequirement.id.in_([item["job_id"] for item in recommendations])
+    ).all()
+    jobs_by_id = {job.id: job for job in jobs}
+    for item in recommendations:
+        job = jobs_by_id.get(item["job_id"])
+        item["job"] = job
+        item["position_name"] = job.position_name if job else None
+    return [item for item in recommendations if item["job"] is not None]
+
+@router.get("/{resume_id}/recommended-jobs", response_model=List[RecommendedJob])
+async def read_recommended_jobs(
+    *,
+    db: Session = Depends(get_db),
+    resume_id: int,
+    k: int = Query(10, gt=0, le=100, description="推荐的职位数"),
+    rescore: int = Query(0, ge=0, le=10, description="交给大模型重新评分的前几个职位数，0表示不调用大模型"),
+    job_index: Any = Depends(get_job_index),
+    ai_service: Any = Depends(get_async_ai_service)
+) -> Any:
+    """
+    为简历推荐职位
+    
+    基于职位的预计算表示（向量、标签、BM25）一次性对全部职位打分并按倒数排名融合；
+    rescore大于0时只把排名最前的几个职位交给大模型重新评分，并按大模型分数重新排列这几个职位
+    """
+    try:
+        # 查询简历
+        resume = await run_in_threadpool(db.get, Resume, resume_id)
+        if not resume:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"简历不存在: ID={resume_id}"
+            )
+        
+        recommendations = await run_in_threadpool(_recommend_jobs, db, resume, k, job_index)
+        
+        # 大模型重新评分前几个职位
+        top = recommendations[:rescore]
+        if top:
+            results = await asyncio.gather(*(
+                ai_service.match_resume_to_job(
+                    resume_content=resume.ocr_content,
+                    job_requirements=f"{item['job'].position_name}\n{item['job'].responsibilities}\n{item['job'].requirements}"
+                )
+                for item in top
+            ))
+            for item, result in zip(top, results):
+                item["match_score"] = result.get("score", 0)
+                item["match_explanation"] = result.get("explanation", "")
+            top.sort(key=lambda item: item["match_score"], reverse=True)
+            recommendations[:rescore] = top
+        
+        logger.info(f"职位推荐完成: 简历ID={resume_id}, 数量={len(recommendations)}, 大模型评分={len(top)}")
+        return recommendations
+        
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        logger.error(f"数据库错误: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"数据库操作失败: {str(e)}"
+        )
+    except Exception as e:
+        logger.error(f"推荐职位失败: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"推荐职位失败: {str(e)}"
+        )
+
 @router.put("/{resume_id}", response_model=ResumeSchema)
 def update_resume(
     *,
     db: Session = Depends(get_db),
+    embedding_service: Any = Depends(get_embedding_service),
+    resume_indexes: List[Any] = Depends(get_resume_indexes),
     resume_id: int,
     resume_in: ResumeUpdate
 ) -> Any:
@@ -263,11 +417,16 @@ def update_resume(
         for field, value in update_data.items():
             setattr(resume, field, value)
         
+        # 同步简历向量（文本未变化时不会重新计算；计算在flush之前，不持有写锁）
+        embedding_service.stage_resume(db, resume, embedding_service.prepare_resume(db, resume))
+        
         # 保存到数据库
         if not safe_commit(db, f"更新简历失败: ID={resume_id}"):
             raise HTTPException(status_code=500, detail="数据库保存失败")
         
         db.refresh(resume)
+        for index in resume_indexes:
+            index.upsert_resume(resume)
         
         # 记录成功更新
         logger.info(f"成功更新简历: ID={resume.id}, 候选人={resume.candidate_name}")
@@ -293,6 +452,8 @@ def update_resume(
 def delete_resume(
     *,
     db: Session = Depends(get_db),
+    embedding_service: Any = Depends(get_embedding_service),
+    resume_indexes: List[Any] = Depends(get_resume_indexes),
     resume_id: int
 ):
     """
@@ -307,10 +468,13 @@ def delete_resume(
                 detail=f"简历不存在: ID={resume_id}"
             )
         
-        # 删除简历
+        # 删除简历及其向量
         db.delete(resume)
+        embedding_service.delete(db, RESUME, resume_id)
         if not safe_commit(db, f"删除简历失败: ID={resume_id}"):
             raise HTTPException(status_code=500, detail="数据库操作失败")
+        for index in resume_indexes:
+            index.remove_resume(resume_id)
         
         # 记录成功删除
         logger.info(f"成功删除简历: ID={resume_id}")
@@ -2,7 +2,7 @@
 应用配置
 """
 import os
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -37,6 +37,92 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     GPT_MODEL: str = "gpt-4o"
     
+    # LLM响应缓存配置
+    AI_CACHE_ENABLED: bool = os.getenv("AI_CACHE_ENABLED", "True").lower() == "true"
+    AI_CACHE_MAX_ENTRIES: int = 2048  # 内存LRU层最大条目数
+    AI_CACHE_PATH: str = os.getenv("AI_CACHE_PATH", "./ai_cache.db")  # 磁盘层SQLite文件，留空则仅使用内存层
+    AI_CACHE_DEFAULT_TTL: int = 60 * 60 * 24  # 1天
+    AI_CACHE_TTLS: Dict[str, int] = {
+        "parse_resume": 60 * 60 * 24 * 30,
+        "analyze_resume": 60 * 60 * 24 * 30,
+        "generate_talent_portrait": 60 * 60 * 24 * 30,
+        "generate_resume_tags": 60 * 60 * 24 * 30,
+        "extract_job_tags": 60 * 60 * 24 * 30,
+        "parse_job_requirement": 60 * 60 * 24 * 30,
+        "analyze_job_requirement": 60 * 60 * 24 * 30,
+        "match_resume_to_job": 60 * 60 * 24 * 7,
+        "match_resumes_to_job": 60 * 60 * 24 * 7,
+        "generate_recruitment_plan": 60 * 60 * 24,
+    }
+    
+    # 限流与并发配置
+    AI_RATE_LIMIT_RPM: int = int(os.getenv("AI_RATE_LIMIT_RPM", "500"))  # 每分钟请求数上限，0表示不限制
+    AI_RATE_LIMIT_TPM: int = int(os.getenv("AI_RATE_LIMIT_TPM", "30000"))  # 每分钟预估token数上限，0表示不限制
+    AI_MAX_CONCURRENCY: int = int(os.getenv("AI_MAX_CONCURRENCY", "8"))  # 同时进行中的模型调用上限
+    AI_INITIAL_CONCURRENCY: int = int(os.getenv("AI_INITIAL_CONCURRENCY", "4"))  # 自适应并发的初始上限
+    AI_MIN_CONCURRENCY: int = 1  # 过载退避后的最低并发
+    AI_CONCURRENCY_BACKOFF_COOLDOWN: float = 1.0  # 两次并发退避之间的最短间隔（秒）
+    
+    # 模型调用HTTP连接池配置
+    AI_HTTP_MAX_CONNECTIONS: int = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "100"))
+    AI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("AI_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    AI_HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("AI_HTTP_KEEPALIVE_EXPIRY", "60"))  # 空闲长连接保留时间（秒）
+    
+    # 超时、重试与熔断配置
+    AI_REQUEST_TIMEOUT: float = float(os.getenv("AI_REQUEST_TIMEOUT", "30"))  # 单次调用超时（秒）
+    AI_MAX_RETRIES: int = int(os.getenv("AI_MAX_RETRIES", "2"))  # 可重试错误的最大重试次数
+    AI_RETRY_BASE_DELAY: float = 0.5  # 指数退避基础间隔（秒）
+    AI_RETRY_MAX_DELAY: float = 8.0  # 单次退避最大间隔（秒）
+    AI_RETRY_MAX_ELAPSED: float = 60.0  # 累计耗时超过该值后不再重试（秒）
+    AI_BREAKER_FAILURE_THRESHOLD: int = 5  # 连续失败多少次后熔断
+    AI_BREAKER_RECOVERY_TIMEOUT: float = 30.0  # 熔断后多久放行探测请求（秒）
+    
+    # 批量匹配配置
+    AI_MATCH_BATCH_SIZE: int = int(os.getenv("AI_MATCH_BATCH_SIZE", "20"))  # 单次调用最多评估的简历数
+    AI_MATCH_BATCH_TOKEN_BUDGET: int = int(os.getenv("AI_MATCH_BATCH_TOKEN_BUDGET", "12000"))  # 单次调用的输入token预算
+    
+    # 文本向量配置（简历/招聘需求向量，用于职位推荐；非hashing后端时批量匹配和混合召回的简历检索也使用这些向量，
+    # hashing后端时简历检索使用下方的哈希TF-IDF内存索引）
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "hashing")  # hashing: 本地哈希向量；openai: OpenAI向量接口
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")  # text-embedding-3系列支持按EMBEDDING_DIM降维
+    EMBEDDING_DIM: int = int(os.getenv("EMBEDDING_DIM", "256"))  # text-embedding-ada-002不支持降维，须设为1536
+    MATCH_RETRIEVAL_TOP_K: int = int(os.getenv("MATCH_RETRIEVAL_TOP_K", "50"))  # 向量召回后交给大模型评分的简历数
+    
+    # 本地匹配评估配置（BM25）
+    BM25_K1: float = float(os.getenv("BM25_K1", "1.5"))
+    BM25_B: float = float(os.getenv("BM25_B", "0.75"))
+    MATCH_HYBRID_LOW_SCORE: int = int(os.getenv("MATCH_HYBRID_LOW_SCORE", "30"))  # hybrid模式下本地分数低于该值直接判定为不匹配
+    MATCH_HYBRID_HIGH_SCORE: int = int(os.getenv("MATCH_HYBRID_HIGH_SCORE", "85"))  # hybrid模式下本地分数不低于该值直接采用本地结果
+    
+    # 简历内存向量索引配置（hashing后端时为哈希TF-IDF，维度为VECTOR_INDEX_DIM；其他后端存放文本向量，维度为EMBEDDING_DIM）
+    VECTOR_INDEX_DIM: int = int(os.getenv("VECTOR_INDEX_DIM", "256"))
+    VECTOR_INDEX_DTYPE: str = os.getenv("VECTOR_INDEX_DTYPE", "float32")  # float16内存减半，但检索需逐块转换，速度较慢
+    VECTOR_INDEX_COMPACT_RATIO: float = float(os.getenv("VECTOR_INDEX_COMPACT_RATIO", "0.25"))  # 墓碑占比超过该值时压缩
+    VECTOR_INDEX_TYPE: str = os.getenv("VECTOR_INDEX_TYPE", "flat")  # flat: 精确检索；ivf: IVF-flat近似检索；mmap: 内存映射文件（多worker共享）
+    VECTOR_INDEX_NLIST: int = int(os.getenv("VECTOR_INDEX_NLIST", "0"))  # IVF倒排列表数，0表示按sqrt(N)自动选择
+    VECTOR_INDEX_NPROBE: int = int(os.getenv("VECTOR_INDEX_NPROBE", "8"))  # IVF检索扫描的列表数，越大召回率越高
+    VECTOR_INDEX_KMEANS_ITERATIONS: int = int(os.getenv("VECTOR_INDEX_KMEANS_ITERATIONS", "10"))
+    VECTOR_INDEX_TRAIN_SAMPLE: int = int(os.getenv("VECTOR_INDEX_TRAIN_SAMPLE", "100000"))  # k-means训练最大样本数
+    VECTOR_STORE_PATH: str = os.getenv("VECTOR_STORE_PATH", "./resume_vectors.bin")  # mmap索引的存储文件
+    VECTOR_STORE_DTYPE: str = os.getenv("VECTOR_STORE_DTYPE", "float16")  # float16或int8（逐行量化，体积再减半）
+    
+    # 混合召回配置（GET /jobs/{job_id}/candidates）
+    RETRIEVAL_DEPTH: int = int(os.getenv("RETRIEVAL_DEPTH", "200"))  # 词法和向量每一路召回的简历数
+    RETRIEVAL_RRF_K: int = int(os.getenv("RETRIEVAL_RRF_K", "60"))  # 倒数排名融合的平滑常数
+    RETRIEVAL_LEXICAL_TERMS: int = int(os.getenv("RETRIEVAL_LEXICAL_TERMS", "64"))  # 词法召回只使用idf最高的若干个职位关键词
+    # 进程内索引检查数据水位（行数+最大更新时间）的间隔（秒）：多worker部署时据此发现其他进程的写入，0表示每次检索都检查
+    INDEX_SYNC_INTERVAL: float = float(os.getenv("INDEX_SYNC_INTERVAL", "5"))
+    
+    # 分词配置
+    TOKENIZER_MODE: str = os.getenv("TOKENIZER_MODE", "bigram")  # bigram: 中文双字切分；dictionary: 词典最大匹配，未登录部分回退双字
+    TOKENIZER_LEXICON_PATH: str = os.getenv("TOKENIZER_LEXICON_PATH", "")  # 自定义词典文件，为空时使用内置词典
+    
+    # 标签提取配置
+    TAGGER_MODE: str = os.getenv("TAGGER_MODE", "local")  # local: 本地技能词库匹配；hybrid: 本地命中过少时再调用大模型补充；llm: 仅使用大模型
+    TAGGER_SKILLS_PATH: str = os.getenv("TAGGER_SKILLS_PATH", "")  # 自定义技能词库文件，为空时使用内置词库
+    TAGGER_MAX_TAGS: int = int(os.getenv("TAGGER_MAX_TAGS", "10"))  # 最多返回的标签数
+    TAGGER_MIN_LOCAL_TAGS: int = int(os.getenv("TAGGER_MIN_LOCAL_TAGS", "3"))  # hybrid模式下本地标签少于该数时调用大模型
+    
     # 环境配置
     ENV: str = os.getenv("ENV", "development")
     
@@ -0,0 +1,50 @@
+"""
+简历全文索引
+SQLite使用FTS5（trigram分词，外部内容表 + 触发器同步），MySQL使用FULLTEXT索引（ngram解析器），
+索引字段为ocr_content、talent_portrait、parsed_content；
+这里的DDL挂在resumes表的创建/删除事件上，供create_all（开发、测试环境）使用，生产环境由Alembic迁移创建
+"""
+from typing import List
+from sqlalchemy import DDL, Table, event
+
+FTS_TABLE = "resumes_fts"
+FULLTEXT_INDEX = "ft_resumes_content"
+COLUMNS = ("ocr_content", "talent_portrait", "parsed_content")
+
+_columns = ", ".join(COLUMNS)
+_new_values = ", ".join(f"new.{column}" for column in COLUMNS)
+_old_values = ", ".join(f"old.{column}" for column in COLUMNS)
+
+SQLITE_CREATE: List[str] = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{_columns}, content='resumes', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON resumes BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON resumes BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {_columns} ON resumes BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_DROP: List[str] = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+MYSQL_CREATE: List[str] = [
+    f"ALTER TABLE resumes ADD FULLTEXT INDEX {FULLTEXT_INDEX} ({_columns}) WITH PARSER ngram",
+]
+
+
+def register_fulltext_index(table: Table) -> None:
+    """在resumes表创建后建立全文索引、删除前删除全文索引（按数据库方言选择DDL）"""
+    for statement in SQLITE_CREATE:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in SQLITE_DROP:
+        event.listen(table, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in MYSQL_CREATE:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="mysql"))
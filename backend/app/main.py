@@ -1,11 +1,21 @@
 """
 主应用程序模块
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.api import api_router
 from app.core.config import settings
 from app.core.errors import register_exception_handlers
+from app.services.service_factory import init_services, close_services
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动时创建共享服务实例，关闭时释放连接池"""
+    init_services()
+    yield
+    await close_services()
 
 def create_app() -> FastAPI:
     """创建FastAPI应用"""
@@ -14,6 +24,7 @@ def create_app() -> FastAPI:
         description=settings.PROJECT_DESCRIPTION,
         version=settings.PROJECT_VERSION,
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        lifespan=lifespan,
     )
 
     # 设置CORS
@@ -23,6 +34,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
     # 注册路由
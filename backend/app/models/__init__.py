@@ -11,5 +11,6 @@ from .match import Match
 from .plan import Plan
 from .user import User
 from .tag import Tag
+from .embedding import Embedding
 
-__all__ = ['Base', 'JobRequirement', 'Resume', 'Match', 'Plan', 'User', 'Tag']
+__all__ = ['Base', 'JobRequirement', 'Resume', 'Match', 'Plan', 'User', 'Tag', 'Embedding']
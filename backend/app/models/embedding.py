@@ -0,0 +1,35 @@
+"""
+文本向量模型
+"""
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, UniqueConstraint, Index
+from datetime import datetime
+from app.db.base import Base
+
+class Embedding(Base):
+    """文本向量模型类，按(对象类型, 对象ID, 向量模型)保存简历或招聘需求的向量"""
+    __tablename__ = "embeddings"
+    __table_args__ = (
+        UniqueConstraint("owner_type", "owner_id", "model", name="uq_embeddings_owner_model"),
+        Index("ix_embeddings_model_owner_type", "model", "owner_type"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    owner_type = Column(String(20), nullable=False, comment="对象类型: resume/job")
+    owner_id = Column(Integer, nullable=False, comment="对象ID")
+    model = Column(String(100), nullable=False, comment="向量模型")
+    dim = Column(Integer, nullable=False, comment="向量维度")
+    vector = Column(LargeBinary, nullable=False, comment="float32向量字节")
+    content_hash = Column(String(64), nullable=False, comment="源文本哈希")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            "id": self.id,
+            "owner_type": self.owner_type,
+            "owner_id": self.owner_id,
+            "model": self.model,
+            "dim": self.dim,
+            "content_hash": self.content_hash,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -1,7 +1,7 @@
 """
 招聘需求模型
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, func
 from datetime import datetime
 from app.db.base import Base
 
@@ -17,7 +17,8 @@ class JobRequirement(Base):
     salary_range = Column(String(50), comment="薪资范围")
     location = Column(String(100), comment="工作地点")
     tags = Column(JSON, nullable=True, comment="职位标签")
-    created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, server_default=func.now(), index=True,
+                        comment="创建时间（列表分页排序键，不可为空）")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
     
     def to_dict(self):
@@ -1,7 +1,7 @@
 """
 简历与职位匹配模型
 """
-from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, DateTime, Index, false
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -15,6 +15,8 @@ class Match(Base):
     job_id = Column(Integer, ForeignKey("job_requirements.id"), nullable=False, comment="职位ID")
     match_score = Column(Float, nullable=False, comment="匹配分数")
     match_explanation = Column(Text, comment="匹配说明")
+    is_degraded = Column(Boolean, nullable=False, default=False, server_default=false(),
+                         comment="是否为降级评估结果（模型不可用时的估算或评估失败），下次匹配请求时重新评估")
     created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
     
     # 关系
@@ -29,7 +31,15 @@ class Match(Base):
             "job_id": self.job_id,
             "match_score": self.match_score,
             "match_explanation": self.match_explanation,
+            "is_degraded": self.is_degraded,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "resume": self.resume.to_dict() if self.resume else None,
             "job": self.job.to_dict() if self.job else None
         }
+
+# 同一简历与职位只保留一条匹配记录（也用于查重和按简历筛选）
+Index("ix_matches_resume_id_job_id", Match.resume_id, Match.job_id, unique=True)
+# 按职位筛选并按匹配分数排序
+Index("ix_matches_job_id_match_score", Match.job_id, Match.match_score.desc())
+# 不筛选时按匹配分数排序（键集分页按分数、ID定位）
+Index("ix_matches_match_score", Match.match_score.desc())
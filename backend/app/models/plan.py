@@ -1,7 +1,7 @@
 """
 招聘方案模型
 """
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON, func
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -17,7 +17,8 @@ class Plan(Base):
     strategy = Column(Text, comment="招聘策略")
     candidate_ids = Column(JSON, comment="候选人ID列表")
     created_by = Column(Integer, ForeignKey("users.id"), comment="创建人ID")
-    created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, server_default=func.now(), index=True,
+                        comment="创建时间（列表分页排序键，不可为空）")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
     
     # 关系
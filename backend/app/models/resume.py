@@ -1,10 +1,11 @@
 """
 简历模型
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, func
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
+from app.db.fulltext import register_fulltext_index
 from .tag import resume_tag
 
 class Resume(Base):
@@ -18,7 +19,8 @@ class Resume(Base):
     ocr_content = Column(Text, comment="OCR识别内容")
     parsed_content = Column(Text, comment="解析后内容")
     talent_portrait = Column(Text, comment="人才画像")
-    created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, server_default=func.now(), index=True,
+                        comment="创建时间（列表分页排序键，不可为空）")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
     
     # 与标签的多对多关系
@@ -38,3 +40,6 @@ class Resume(Base):
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "tags": [tag.to_dict() for tag in self.tags] if self.tags else []
         }
+
+# 全文索引（SQLite FTS5 / MySQL FULLTEXT）随表创建和删除
+register_fulltext_index(Resume.__table__)
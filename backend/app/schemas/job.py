@@ -42,6 +42,43 @@ class Job(JobInDB):
     """招聘需求响应模型"""
     pass
 
+class JobSummary(BaseModel):
+    """招聘需求摘要模型（列表摘要视图，不含职责描述和职位要求）"""
+    id: int
+    position_name: Optional[str] = Field(None, description="职位名称")
+    department: Optional[str] = Field(None, description="部门")
+    salary_range: Optional[str] = Field(None, description="薪资范围")
+    location: Optional[str] = Field(None, description="工作地点")
+    tags: Optional[List[str]] = Field(None, description="职位标签")
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        orm_mode = True
+
+class JobCandidate(BaseModel):
+    """职位候选简历（词法与向量混合召回结果）"""
+    resume_id: int = Field(..., description="简历ID")
+    score: float = Field(..., description="倒数排名融合分数")
+    lexical_rank: Optional[int] = Field(None, description="BM25词法召回排名（未召回时为空）")
+    lexical_score: Optional[float] = Field(None, description="BM25分数")
+    vector_rank: Optional[int] = Field(None, description="向量召回排名（未召回时为空）")
+    vector_score: Optional[float] = Field(None, description="向量余弦相似度")
+
+class RecommendedJob(BaseModel):
+    """为简历推荐的职位（向量、标签、词法混合召回结果）"""
+    job_id: int = Field(..., description="职位ID")
+    position_name: Optional[str] = Field(None, description="职位名称")
+    score: float = Field(..., description="倒数排名融合分数")
+    vector_rank: Optional[int] = Field(None, description="向量召回排名（未召回时为空）")
+    vector_score: Optional[float] = Field(None, description="向量余弦相似度")
+    tag_rank: Optional[int] = Field(None, description="标签召回排名（未召回时为空）")
+    tag_score: Optional[float] = Field(None, description="简历标签覆盖职位标签的比例")
+    lexical_rank: Optional[int] = Field(None, description="BM25词法召回排名（未召回时为空）")
+    lexical_score: Optional[float] = Field(None, description="BM25分数")
+    match_score: Optional[float] = Field(None, description="大模型重新评分的匹配分数（未重新评分时为空）")
+    match_explanation: Optional[str] = Field(None, description="大模型匹配说明")
+
 class JobParseResult(BaseModel):
     """招聘需求解析结果模型"""
     position_name: Optional[str] = Field(None, description="职位名称")
@@ -4,8 +4,8 @@
 from typing import Optional, Dict, Any
 from pydantic import BaseModel, Field
 from datetime import datetime
-from .job import Job
-from .resume import Resume
+from .job import Job, JobSummary
+from .resume import Resume, ResumeSummary
 
 class MatchBase(BaseModel):
     """匹配基础模型"""
@@ -21,6 +21,7 @@ class MatchCreate(MatchBase):
 class MatchInDB(MatchBase):
     """数据库中的匹配模型"""
     id: int
+    is_degraded: bool = Field(False, description="是否为降级评估结果（模型不可用时的估算或评估失败），下次匹配请求时重新评估")
     created_at: datetime
     
     class Config:
@@ -30,3 +31,18 @@ class Match(MatchInDB):
     """匹配响应模型"""
     resume: Optional[Resume] = None
     job: Optional[Job] = None
+
+class MatchSummary(BaseModel):
+    """匹配摘要模型（列表摘要视图，嵌套简历和职位的摘要）"""
+    id: int
+    resume_id: Optional[int] = Field(None, description="简历ID")
+    job_id: Optional[int] = Field(None, description="职位ID")
+    match_score: Optional[float] = Field(None, description="匹配分数")
+    match_explanation: Optional[str] = Field(None, description="匹配说明")
+    is_degraded: Optional[bool] = Field(None, description="是否为降级评估结果")
+    created_at: Optional[datetime] = None
+    resume: Optional[ResumeSummary] = None
+    job: Optional[JobSummary] = None
+    
+    class Config:
+        orm_mode = True
@@ -54,3 +54,28 @@ class ResumeInDB(ResumeBase):
 class Resume(ResumeInDB):
     """简历响应模型"""
     tags: List[Tag] = []
+
+class ResumeSummary(BaseModel):
+    """简历摘要模型（列表摘要视图，不含OCR内容、解析内容和人才画像）"""
+    id: int
+    candidate_name: Optional[str] = Field(None, description="候选人姓名")
+    file_url: Optional[str] = Field(None, description="文件URL")
+    file_type: Optional[str] = Field(None, description="文件类型")
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    tags: Optional[List[Tag]] = None
+    
+    class Config:
+        orm_mode = True
+
+class ResumeSearchHit(BaseModel):
+    """简历全文检索命中"""
+    id: int = Field(..., description="简历ID")
+    candidate_name: str = Field(..., description="候选人姓名")
+    score: float = Field(..., description="相关度分数（越大越相关）")
+    snippet: Optional[str] = Field(None, description="命中片段（HTML：原文已转义），命中词以<mark>标记")
+
+class ResumeSearchPage(BaseModel):
+    """简历全文检索结果页"""
+    items: List[ResumeSearchHit] = []
+    next_cursor: Optional[str] = Field(None, description="下一页游标，没有更多结果时为空")
@@ -0,0 +1,226 @@
+"""
+LLM响应缓存模块
+以请求内容哈希为键缓存GPT响应：进程内LRU内存层 + SQLite持久化磁盘层
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from app.core.config import settings
+
+# 获取日志记录器
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """
+    LLM响应缓存
+
+    - 键: (method, model, prompt, temperature, max_tokens) 的SHA-256哈希
+    - 内存层: 有界LRU，命中时为微秒级
+    - 磁盘层: SQLite文件，进程重启后仍可命中
+    - 过期: 按方法配置TTL（秒），TTL<=0表示该方法不缓存
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        db_path: Optional[str] = None,
+        ttls: Optional[Dict[str, int]] = None,
+        default_ttl: int = 86400
+    ):
+        """初始化缓存"""
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+        # 统计计数
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if db_path:
+            self._open_disk_tier(db_path)
+
+    def _open_disk_tier(self, db_path: str) -> None:
+        """打开SQLite磁盘层"""
+        try:
+            db_dir = os.path.dirname(os.path.abspath(db_path))
+            os.makedirs(db_dir, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, method TEXT NOT NULL, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+            logger.info(f"LLM缓存磁盘层已启用: {db_path}")
+        except sqlite3.Error as e:
+            logger.error(f"LLM缓存磁盘层初始化失败，仅使用内存缓存: {str(e)}")
+            self._conn = None
+
+    @staticmethod
+    def make_key(method: str, model: str, prompt: str, temperature: float, max_tokens: int) -> str:
+        """根据请求内容计算缓存键"""
+        payload = json.dumps(
+            [method, model, prompt, temperature, max_tokens],
+            ensure_ascii=False,
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, method: str) -> int:
+        """获取方法对应的TTL（秒）"""
+        return self.ttls.get(method, self.default_ttl)
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存，未命中或已过期返回None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+                self.expirations += 1
+
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.error(f"读取LLM缓存失败: {str(e)}")
+                    row = None
+                if row is not None:
+                    value, expires_at = row
+                    if expires_at > now:
+                        self._put_memory(key, value, expires_at)
+                        self.disk_hits += 1
+                        return value
+                    self._delete_disk(key)
+                    self.expirations += 1
+
+            self.misses += 1
+            return None
+
+    def set(self, method: str, key: str, value: str) -> None:
+        """写入缓存"""
+        ttl = self.ttl_for(method)
+        if ttl <= 0:
+            return
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._put_memory(key, value, expires_at)
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, method, value, expires_at, created_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, method, value, expires_at, now)
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"写入LLM缓存失败: {str(e)}")
+
+    def _put_memory(self, key: str, value: str, expires_at: float) -> None:
+        """写入内存层并按LRU淘汰（调用方需持有锁）"""
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _delete_disk(self, key: str) -> None:
+        """删除磁盘层条目（调用方需持有锁）"""
+        try:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"删除LLM缓存失败: {str(e)}")
+
+    def purge_expired(self) -> int:
+        """清理磁盘层所有过期条目，返回清理数量"""
+        if self._conn is None:
+            return 0
+        with self._lock:
+            try:
+                cursor = self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+                self._conn.commit()
+                return cursor.rowcount
+            except sqlite3.Error as e:
+                logger.error(f"清理LLM缓存失败: {str(e)}")
+                return 0
+
+    def clear(self) -> None:
+        """清空缓存（内存层和磁盘层）"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM llm_cache")
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"清空LLM缓存失败: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "hits": hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": hits / total if total else 0.0
+            }
+
+    def close(self) -> None:
+        """关闭磁盘层连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_llm_cache: Optional[LLMCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """获取进程内共享的LLM缓存实例，未启用缓存时返回None"""
+    global _llm_cache
+    if not settings.AI_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMCache(
+                    max_entries=settings.AI_CACHE_MAX_ENTRIES,
+                    db_path=settings.AI_CACHE_PATH or None,
+                    ttls=settings.AI_CACHE_TTLS,
+                    default_ttl=settings.AI_CACHE_DEFAULT_TTL
+                )
+    return _llm_cache
@@ -0,0 +1,211 @@
+"""
+AI调用容错模块
+可重试错误识别、带抖动的指数退避重试策略，以及熔断器
+"""
+import time
+import random
+import logging
+import threading
+from typing import Any, Callable, Optional
+from app.core.config import settings
+from app.services.ai_throttle import is_overload_error
+
+# 获取日志记录器
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态，调用被直接拒绝"""
+    pass
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """判断异常是否值得重试（429、5xx、超时、连接错误、408/409）"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    return is_overload_error(error) or getattr(error, "status_code", None) in (408, 409)
+
+
+def is_unavailable_error(error: BaseException) -> bool:
+    """判断异常是否表示模型服务暂不可用（熔断或可重试错误耗尽重试）"""
+    return isinstance(error, CircuitOpenError) or is_retryable_error(error)
+
+
+class RetryPolicy:
+    """
+    重试策略
+
+    - 仅对可重试错误重试，最多max_retries次
+    - 退避时间为 [0, min(max_delay, base_delay * 2^attempt)] 内的随机值（full jitter）
+    - 累计耗时超过max_elapsed后不再重试，保证尾延迟有界
+    """
+
+    def __init__(self, max_retries: int = 2, base_delay: float = 0.5, max_delay: float = 8.0,
+                 max_elapsed: float = 60.0):
+        """初始化重试策略"""
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+
+    def next_delay(self, error: BaseException, attempt: int, elapsed: float) -> Optional[float]:
+        """
+        计算下一次重试前的等待秒数
+
+        Args:
+            error: 本次调用的异常
+            attempt: 已失败的重试次数（首次调用为0）
+            elapsed: 首次调用至今的耗时（秒）
+
+        Returns:
+            float: 等待秒数；不再重试时返回None
+        """
+        if attempt >= self.max_retries or not is_retryable_error(error):
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if elapsed + delay >= self.max_elapsed:
+            return None
+        return delay
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    - closed: 正常放行，连续失败达到failure_threshold后打开
+    - open: 直接拒绝调用，recovery_timeout秒后进入half_open
+    - half_open: 只放行一个探测请求，成功则关闭，失败则重新打开
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """初始化熔断器"""
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """当前状态"""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """调用前检查，熔断时抛出CircuitOpenError"""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.OPEN:
+                if now - self._opened_at < self.recovery_timeout:
+                    raise CircuitOpenError("模型服务熔断中，请稍后重试")
+                self._state = self.HALF_OPEN
+                self._probe_started_at = None
+            # half_open：只放行一个探测请求，探测长时间无结果时允许新的探测
+            if self._probe_started_at is not None and now - self._probe_started_at < self.recovery_timeout:
+                raise CircuitOpenError("模型服务熔断探测中，请稍后重试")
+            self._probe_started_at = now
+
+    def record_success(self) -> None:
+        """记录调用成功"""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("模型服务探测成功，熔断器关闭")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_started_at = None
+
+    def record_failure(self, error: BaseException) -> None:
+        """记录调用失败，仅可重试错误计入熔断统计"""
+        if not is_retryable_error(error):
+            # 非可重试错误（如400）说明服务可达，按成功处理
+            self.record_success()
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.error(f"模型服务连续失败{self._failures}次，熔断器打开")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_started_at = None
+
+
+def call_with_retry(method: str, call: Callable[[], Any], tokens: int, rate_limiter: Any, concurrency: Any,
+                    breaker: "CircuitBreaker", retry_policy: RetryPolicy) -> Any:
+    """
+    经熔断、限流和并发控制同步调用模型接口，可重试错误按抖动指数退避重试
+
+    Args:
+        method: 调用名称（用于日志）
+        call: 发起一次请求的函数
+        tokens: 预估token数（用于TPM限流）
+        rate_limiter: RPM/TPM限流器
+        concurrency: 自适应并发控制器
+        breaker: 熔断器
+        retry_policy: 重试策略
+    """
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        breaker.before_call()
+        rate_limiter.acquire(tokens)
+        concurrency.acquire()
+        try:
+            response = call()
+        except Exception as e:
+            concurrency.release(success=False, overloaded=is_overload_error(e))
+            breaker.record_failure(e)
+            delay = retry_policy.next_delay(e, attempt, time.monotonic() - started)
+            if delay is None:
+                raise
+            attempt += 1
+            logger.warning(f"{method}调用失败，{delay:.2f}秒后第{attempt}次重试: {str(e)}")
+            time.sleep(delay)
+            continue
+        concurrency.release()
+        breaker.record_success()
+        return response
+
+
+_retry_policy: Optional[RetryPolicy] = None
+_circuit_breaker: Optional[CircuitBreaker] = None
+_resilience_lock = threading.Lock()
+
+
+def get_retry_policy() -> RetryPolicy:
+    """获取进程内共享的重试策略"""
+    global _retry_policy
+    if _retry_policy is None:
+        with _resilience_lock:
+            if _retry_policy is None:
+                _retry_policy = RetryPolicy(
+                    max_retries=settings.AI_MAX_RETRIES,
+                    base_delay=settings.AI_RETRY_BASE_DELAY,
+                    max_delay=settings.AI_RETRY_MAX_DELAY,
+                    max_elapsed=settings.AI_RETRY_MAX_ELAPSED
+                )
+    return _retry_policy
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """获取进程内共享的熔断器"""
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        with _resilience_lock:
+            if _circuit_breaker is None:
+                _circuit_breaker = CircuitBreaker(
+                    failure_threshold=settings.AI_BREAKER_FAILURE_THRESHOLD,
+                    recovery_timeout=settings.AI_BREAKER_RECOVERY_TIMEOUT
+                )
+    return _circuit_breaker
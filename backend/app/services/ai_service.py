@@ -1,17 +1,447 @@
 """
 AI服务模块
 提供基于GPT-4O的智能分析功能
+
+AIService 使用同步 OpenAI 客户端，AsyncAIService 使用 AsyncOpenAI 客户端，
+两者共用同一套提示词，异步版本供 async 端点直接 await，避免占用线程池。
 """
 import os
 import json
+import time
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
-from openai import OpenAI
+import httpx
+from typing import Dict, Any, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from openai import OpenAI, AsyncOpenAI
 from app.core.config import settings
+from app.utils.tokenizer import tokenize
+from app.utils.skill_tagger import get_skill_tagger
+from app.services.ai_cache import LLMCache, get_llm_cache
+from app.services.ai_throttle import get_rate_limiter, get_concurrency_limiter, is_overload_error
+from app.services.ai_resilience import call_with_retry, get_retry_policy, get_circuit_breaker, is_unavailable_error
 
 # 获取日志记录器
 logger = logging.getLogger(__name__)
 
+
+def _parse_resume_request(ocr_content: str) -> Dict[str, Any]:
+    """构建简历解析请求"""
+    prompt = f"""
+            请解析以下简历内容，提取关键信息，并以JSON格式返回。
+            需要提取的字段包括：
+            - name: 姓名
+            - education: 学历
+            - skills: 技能列表
+            - experience: 工作经验
+            - contact: 联系方式
+            
+            简历内容：
+            {ocr_content}
+            """
+    return {
+        "system_prompt": "你是一位专业的HR招聘助手，擅长解析简历内容。",
+        "prompt": prompt,
+        "temperature": 0.3,
+        "max_tokens": 1000,
+        "json_mode": True
+    }
+
+
+def _talent_portrait_request(parsed_content: Dict[str, Any]) -> Dict[str, Any]:
+    """构建人才画像生成请求"""
+    prompt = f"""
+            请根据以下候选人信息，生成一段专业的人才画像，不超过200字。
+            
+            候选人信息：
+            {json.dumps(parsed_content, ensure_ascii=False, indent=2)}
+            """
+    return {
+        "system_prompt": "你是一位专业的HR招聘助手，擅长撰写人才画像。",
+        "prompt": prompt,
+        "temperature": 0.5,
+        "max_tokens": 300,
+        "json_mode": False
+    }
+
+
+def _resume_tags_request(resume_content: str) -> Dict[str, Any]:
+    """构建简历标签提取请求"""
+    prompt = f"""
+            请从以下简历内容中提取关键技能标签，返回一个JSON数组。
+            标签应该包括技术技能、行业经验、教育背景等关键词。
+            最多返回10个标签。
+            
+            简历内容：
+            {resume_content}
+            """
+    return {
+        "system_prompt": "你是一位专业的HR招聘助手，擅长从简历中提取关键技能标签。",
+        "prompt": prompt,
+        "temperature": 0.3,
+        "max_tokens": 200,
+        "json_mode": True
+    }
+
+
+def _job_tags_request(job_description: str) -> Dict[str, Any]:
+    """构建职位标签提取请求"""
+    prompt = f"""
+            请从以下职位描述中提取关键技能标签，返回一个JSON数组。
+            标签应该包括技术要求、行业经验、教育背景等关键词。
+            最多返回10个标签。
+            
+            职位描述：
+            {job_description}
+            """
+    return {
+        "system_prompt": "你是一位专业的HR招聘助手，擅长从职位描述中提取关键技能标签。",
+        "prompt": prompt,
+        "temperature": 0.3,
+        "max_tokens": 200,
+        "json_mode": True
+    }
+
+
+def _match_request(resume_content: str, job_requirements: str) -> Dict[str, Any]:
+    """构建简历与职位匹配请求"""
+    prompt = f"""
+            请根据以下职位要求和候选人简历，评估候选人与职位的匹配度。
+            要求：
+            1. 返回0-100的匹配分数
+            2. 提供匹配理由，不超过100字
+            3. 以JSON格式返回，如{{"score": 85, "explanation": "匹配理由"}}
+            
+            职位要求：
+            {job_requirements}
+            
+            候选人简历：
+            {resume_content}
+            """
+    return {
+        "system_prompt": "你是一位专业的HR招聘助手，擅长评估候选人与职位的匹配度。",
+        "prompt": prompt,
+        "temperature": 0.3,
+        "max_tokens": 200,
+        "json_mode": True
+    }
+
+
+def _parse_job_requirement_request(document_content: str) -> Dict[str, Any]:
+    """构建招聘需求文档解析请求"""
+    prompt = f"""
+            请解析以下招聘需求文档，提取关键信息，并以JSON格式返回。
+            需要提取的字段包括：
+            - position_name: 职位名称
+            - department: 部门
+            - responsibilities: 工作职责（详细描述）
+            - requirements: 任职要求（详细描述）
+            - salary_range: 薪资范围
+            - location: 工作地点
+            
+            招聘需求文档内容：
+            {document_content}
+            """
+    return {
+        "system_prompt": "你是一位专业的HR招聘助手，擅长解析招聘需求文档。",
+        "prompt": prompt,
+        "temperature": 0.3,
+        "max_tokens": 1000,
+        "json_mode": True
+    }
+
+
+def _recruitment_plan_request(job_requirement: Dict[str, Any], matched_resumes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """构建招聘方案生成请求"""
+    prompt = f"""
+            请根据以下职位需求和候选人匹配结果，生成一份招聘方案。
+            方案应包括：
+            1. 招聘策略
+            2. 候选人推荐理由
+            3. 面试建议
+            
+            职位需求：
+            {json.dumps(job_requirement, ensure_ascii=False, indent=2)}
+            
+            候选人匹配结果（按匹配度排序）：
+            {json.dumps(matched_resumes, ensure_ascii=False, indent=2)}
+            """
+    return {
+        "system_prompt": "你是一位专业的HR招聘助手，擅长制定招聘方案。",
+        "prompt": prompt,
+        "temperature": 0.5,
+        "max_tokens": 1000,
+        "json_mode": True
+    }
+
+
+def _analyze_resume_request(ocr_content: str, with_tags: bool = True) -> Dict[str, Any]:
+    """构建简历综合分析请求（解析、人才画像一次完成，with_tags时同时提取标签）"""
+    tags_field = """
+            3. tags: 关键技能标签数组，包括技术技能、行业经验、教育背景等关键词，最多10个""" if with_tags else ""
+    tags_example = ', "tags": ["Python"]' if with_tags else ""
+    prompt = f"""
+            请分析以下简历内容，并以JSON格式一次性返回以下{"三" if with_tags else "两"}部分：
+            1. parsed_content: 简历关键信息，包含字段
+               - name: 姓名
+               - education: 学历
+               - skills: 技能列表
+               - experience: 工作经验
+               - contact: 联系方式
+            2. talent_portrait: 一段专业的人才画像，不超过200字{tags_field}
+            
+            返回格式如：{{"parsed_content": {{"name": "张三", "skills": ["Python"]}}, "talent_portrait": "人才画像"{tags_example}}}
+            
+            简历内容：
+            {ocr_content}
+            """
+    return {
+        "system_prompt": "你是一位专业的HR招聘助手，擅长解析简历、撰写人才画像和提取技能标签。",
+        "prompt": prompt,
+        "temperature": 0.3,
+        "max_tokens": 1500,
+        "json_mode": True
+    }
+
+
+def _split_resume_analysis(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    拆分简历综合分析结果
+    
+    缺失或类型不正确的部分置为None，由调用方回退到单独的方法补齐
+    """
+    parsed_content = result.get("parsed_content")
+    talent_portrait = result.get("talent_portrait")
+    tags = result.get("tags")
+    return {
+        "parsed_content": parsed_content if isinstance(parsed_content, dict) and parsed_content else None,
+        "talent_portrait": talent_portrait.strip() if isinstance(talent_portrait, str) and talent_portrait.strip() else None,
+        "tags": tags if isinstance(tags, list) else None
+    }
+
+
+def _analyze_job_requirement_request(document_content: str, with_tags: bool = True) -> Dict[str, Any]:
+    """构建招聘需求综合分析请求（解析字段一次完成，with_tags时同时提取标签）"""
+    tags_field = """
+            - tags: 关键技能标签数组，包括技术要求、行业经验、教育背景等关键词，最多10个""" if with_tags else ""
+    prompt = f"""
+            请解析以下招聘需求文档，提取关键信息，并以JSON格式返回。
+            需要提取的字段包括：
+            - position_name: 职位名称
+            - department: 部门
+            - responsibilities: 工作职责（详细描述）
+            - requirements: 任职要求（详细描述）
+            - salary_range: 薪资范围
+            - location: 工作地点{tags_field}
+            
+            招聘需求文档内容：
+            {document_content}
+            """
+    return {
+        "system_prompt": "你是一位专业的HR招聘助手，擅长解析招聘需求文档和提取关键技能标签。",
+        "prompt": prompt,
+        "temperature": 0.3,
+        "max_tokens": 1200,
+        "json_mode": True
+    }
+
+
+def _job_description(parsed_content: Dict[str, Any]) -> str:
+    """拼接用于标签提取的职位描述"""
+    return f"{parsed_content.get('position_name', '')}\n{parsed_content.get('responsibilities', '')}\n{parsed_content.get('requirements', '')}"
+
+
+def _local_tags(content: str) -> List[str]:
+    """本地技能词库提取标准标签（llm模式下不提取）"""
+    if settings.TAGGER_MODE == "llm":
+        return []
+    return get_skill_tagger().tag(content)
+
+
+def _needs_llm_tags(local_tags: List[str]) -> bool:
+    """是否需要调用大模型提取标签：llm模式，或hybrid模式下本地标签过少"""
+    if settings.TAGGER_MODE == "llm":
+        return True
+    return settings.TAGGER_MODE == "hybrid" and len(local_tags) < settings.TAGGER_MIN_LOCAL_TAGS
+
+
+def _merge_tags(local_tags: List[str], llm_tags: Any) -> List[str]:
+    """合并本地标签与大模型标签：本地标签在前，大模型标签能归一时换成标准标签，去重后截断"""
+    tagger = get_skill_tagger()
+    tags = list(local_tags)
+    for tag in llm_tags if isinstance(llm_tags, list) else []:
+        if not isinstance(tag, str) or not tag.strip():
+            continue
+        tag = tagger.canonical(tag) or tag.strip()
+        if tag not in tags:
+            tags.append(tag)
+    return tags[:settings.TAGGER_MAX_TAGS]
+
+
+def _fused_tags(local_tags: List[str], with_tags: bool, llm_tags: Optional[List[Any]]) -> Optional[List[str]]:
+    """
+    综合分析结果的标签：未向大模型请求标签时直接采用本地标签，否则合并大模型返回的标签
+    
+    请求了标签但大模型未返回时为None，由调用方回退到单独的标签提取
+    """
+    if not with_tags:
+        return local_tags
+    return _merge_tags(local_tags, llm_tags) if isinstance(llm_tags, list) else None
+
+
+def _estimate_tokens(text: str) -> int:
+    """粗略估算文本token数（中文约1字1token，英文约3-4字节1token）"""
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def _match_batch_request(job_requirements: str, resumes: List[Tuple[int, str]]) -> Dict[str, Any]:
+    """构建多份简历与同一职位的批量匹配请求"""
+    resume_sections = "\n\n".join(
+        f"[候选人 resume_id={resume_id}]\n{resume_content}" for resume_id, resume_content in resumes
+    )
+    prompt = f"""
+            请根据以下职位要求，分别评估每位候选人与职位的匹配度。
+            要求：
+            1. 为每位候选人返回0-100的匹配分数
+            2. 为每位候选人提供匹配理由，不超过100字
+            3. 各候选人独立评估，互不比较
+            4. 以JSON格式返回，如{{"results": [{{"resume_id": 1, "score": 85, "explanation": "匹配理由"}}]}}
+            
+            职位要求：
+            {job_requirements}
+            
+            候选人简历：
+            {resume_sections}
+            """
+    return {
+        "system_prompt": "你是一位专业的HR招聘助手，擅长评估候选人与职位的匹配度。",
+        "prompt": prompt,
+        "temperature": 0.3,
+        "max_tokens": 150 * len(resumes) + 100,
+        "json_mode": True
+    }
+
+
+def _plan_match_batches(job_requirements: str, resumes: List[Tuple[int, str]],
+                        batch_size: int, token_budget: int) -> List[List[Tuple[int, str]]]:
+    """
+    按批量大小和token预算对简历分批，保持原有顺序
+    
+    单份简历超出预算时独占一批，保证每份简历都会被评估
+    """
+    batches = []
+    current: List[Tuple[int, str]] = []
+    base_tokens = _estimate_tokens(job_requirements)
+    current_tokens = base_tokens
+    for resume_id, resume_content in resumes:
+        resume_tokens = _estimate_tokens(resume_content)
+        if current and (len(current) >= batch_size or current_tokens + resume_tokens > token_budget):
+            batches.append(current)
+            current = []
+            current_tokens = base_tokens
+        current.append((resume_id, resume_content))
+        current_tokens += resume_tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _parse_match_batch_result(content: str, resume_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    解析批量匹配响应，仅保留属于本批次且分数合法的条目
+    
+    Returns:
+        Dict: 简历ID -> {"score", "explanation"}；缺失或无法解析的简历不在结果中
+    """
+    results: Dict[int, Dict[str, Any]] = {}
+    try:
+        items = json.loads(content).get("results", [])
+    except (TypeError, ValueError, AttributeError) as e:
+        logger.error(f"批量匹配结果解析失败: {str(e)}")
+        return results
+    
+    expected = set(resume_ids)
+    for item in items if isinstance(items, list) else []:
+        try:
+            resume_id = int(item["resume_id"])
+            score = float(item["score"])
+        except (TypeError, ValueError, KeyError):
+            continue
+        if resume_id not in expected or not 0 <= score <= 100:
+            continue
+        results[resume_id] = {
+            "score": score,
+            "explanation": item.get("explanation") or "无匹配理由"
+        }
+    return results
+
+
+def _heuristic_match(resume_content: str, job_requirements: str) -> Dict[str, Any]:
+    """
+    模型服务不可用时的本地启发式匹配：按职位关键词在简历中的覆盖率估算分数
+    
+    结果带degraded标记，保存的匹配记录在下次匹配请求时重新评估
+    """
+    job_keywords = set(tokenize(job_requirements))
+    if not job_keywords:
+        return {"score": 0, "explanation": "模型服务暂不可用，且职位要求中无可用关键词", "degraded": True}
+    covered = job_keywords & set(tokenize(resume_content))
+    score = round(100 * len(covered) / len(job_keywords))
+    return {
+        "score": score,
+        "explanation": f"模型服务暂不可用，基于关键词覆盖率估算（{len(covered)}/{len(job_keywords)}），仅供参考",
+        "degraded": True
+    }
+
+
+def _http_limits() -> httpx.Limits:
+    """模型调用HTTP连接池配置（长连接复用，避免每次请求重新握手）"""
+    return httpx.Limits(
+        max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY
+    )
+
+
+def _build_completion_kwargs(model: str, system_prompt: str, prompt: str, temperature: float,
+                             max_tokens: int, json_mode: bool) -> Dict[str, Any]:
+    """构建Chat Completions调用参数"""
+    kwargs = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }
+    if json_mode:
+        kwargs["response_format"] = {"type": "json_object"}
+    return kwargs
+
+
+def _cache_key(method: str, model: str, system_prompt: str, prompt: str, temperature: float, max_tokens: int) -> str:
+    """计算LLM响应缓存键"""
+    return LLMCache.make_key(method, model, f"{system_prompt}\n{prompt}", temperature, max_tokens)
+
+
+def _request_tokens(system_prompt: str, prompt: str, max_tokens: int) -> int:
+    """预估单次调用消耗的token数（输入 + 输出上限），用于TPM限流"""
+    return _estimate_tokens(system_prompt) + _estimate_tokens(prompt) + max_tokens
+
+
+def _is_cacheable(content: Optional[str], json_mode: bool) -> bool:
+    """判断响应是否可缓存（JSON模式下仅缓存可解析的响应）"""
+    if not content:
+        return False
+    if json_mode:
+        try:
+            json.loads(content)
+        except ValueError:
+            return False
+    return True
+
+
 class AIService:
     """AI服务类，提供基于GPT-4O的智能分析功能"""
     
@@ -22,11 +452,65 @@ class AIService:
         
         # 初始化OpenAI客户端
         try:
-            self.client = OpenAI(api_key=self.api_key)
+            # 重试由本服务的重试策略统一处理，关闭SDK自带重试避免叠加
+            self.client = OpenAI(
+                api_key=self.api_key,
+                timeout=settings.AI_REQUEST_TIMEOUT,
+                max_retries=0,
+                http_client=httpx.Client(limits=_http_limits(), timeout=settings.AI_REQUEST_TIMEOUT)
+            )
             logger.info(f"AI服务初始化成功，使用模型: {self.model}")
         except Exception as e:
             logger.error(f"AI服务初始化失败: {str(e)}")
             self.client = None
+        
+        # LLM响应缓存（未启用时为None）
+        self.cache = get_llm_cache()
+        
+        # 共享的RPM/TPM限流器和自适应并发控制器
+        self.rate_limiter = get_rate_limiter()
+        self.concurrency = get_concurrency_limiter()
+        
+        # 共享的重试策略和熔断器
+        self.timeout = settings.AI_REQUEST_TIMEOUT
+        self.retry_policy = get_retry_policy()
+        self.breaker = get_circuit_breaker()
+    
+    def _complete(self, method: str, system_prompt: str, prompt: str, temperature: float,
+                  max_tokens: int, json_mode: bool = False) -> str:
+        """调用GPT-4O API并返回响应文本，相同请求优先命中缓存"""
+        cache_key = None
+        if self.cache is not None:
+            cache_key = _cache_key(method, self.model, system_prompt, prompt, temperature, max_tokens)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"LLM缓存命中: {method}")
+                return cached
+        
+        response = self._create_with_retry(
+            method,
+            _build_completion_kwargs(self.model, system_prompt, prompt, temperature, max_tokens, json_mode),
+            _request_tokens(system_prompt, prompt, max_tokens)
+        )
+        content = response.choices[0].message.content
+        
+        if cache_key is not None and _is_cacheable(content, json_mode):
+            self.cache.set(method, cache_key, content)
+        return content
+    
+    def close(self) -> None:
+        """关闭OpenAI客户端及其HTTP连接池"""
+        if self.client is not None and hasattr(self.client, "close"):
+            self.client.close()
+        logger.info("AI服务已关闭")
+    
+    def _create_with_retry(self, method: str, kwargs: Dict[str, Any], tokens: int) -> Any:
+        """经熔断、限流和并发控制调用模型，可重试错误按抖动指数退避重试"""
+        return call_with_retry(
+            method,
+            lambda: self.client.chat.completions.create(timeout=self.timeout, **kwargs),
+            tokens, self.rate_limiter, self.concurrency, self.breaker, self.retry_policy
+        )
     
     def parse_resume(self, ocr_content: str) -> Dict[str, Any]:
         """解析简历内容"""
@@ -38,39 +522,15 @@ class AIService:
             return {}
         
         try:
-            # 构建提示词
-            prompt = f"""
-            请解析以下简历内容，提取关键信息，并以JSON格式返回。
-            需要提取的字段包括：
-            - name: 姓名
-            - education: 学历
-            - skills: 技能列表
-            - experience: 工作经验
-            - contact: 联系方式
-            
-            简历内容：
-            {ocr_content}
-            """
-            
             # 调用GPT-4O API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一位专业的HR招聘助手，擅长解析简历内容。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=1000,
-                response_format={"type": "json_object"}
-            )
+            content = self._complete("parse_resume", **_parse_resume_request(ocr_content))
             
             # 解析JSON响应
-            content = response.choices[0].message.content
             parsed_content = json.loads(content)
             
             logger.info(f"简历解析成功: {parsed_content.get('name', '未知')}")
             return parsed_content
-            
+
         except Exception as e:
             logger.error(f"简历解析失败: {str(e)}")
             return {}
@@ -85,31 +545,15 @@ class AIService:
             return ""
         
         try:
-            # 构建提示词
-            prompt = f"""
-            请根据以下候选人信息，生成一段专业的人才画像，不超过200字。
-            
-            候选人信息：
-            {json.dumps(parsed_content, ensure_ascii=False, indent=2)}
-            """
-            
             # 调用GPT-4O API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一位专业的HR招聘助手，擅长撰写人才画像。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                max_tokens=300
-            )
+            content = self._complete("generate_talent_portrait", **_talent_portrait_request(parsed_content))
             
             # 获取响应内容
-            talent_portrait = response.choices[0].message.content.strip()
+            talent_portrait = content.strip()
             
             logger.info(f"人才画像生成成功: {talent_portrait[:50]}...")
             return talent_portrait
-            
+
         except Exception as e:
             logger.error(f"人才画像生成失败: {str(e)}")
             return ""
@@ -123,40 +567,26 @@ class AIService:
             logger.warning("简历内容为空，无法提取标签")
             return []
         
+        # 默认由本地技能词库提取，llm模式或hybrid模式下本地命中过少时才调用大模型
+        local_tags = _local_tags(resume_content)
+        if not _needs_llm_tags(local_tags):
+            logger.info(f"本地标签提取成功: {local_tags}")
+            return local_tags
+        
         try:
-            # 构建提示词
-            prompt = f"""
-            请从以下简历内容中提取关键技能标签，返回一个JSON数组。
-            标签应该包括技术技能、行业经验、教育背景等关键词。
-            最多返回10个标签。
-            
-            简历内容：
-            {resume_content}
-            """
-            
             # 调用GPT-4O API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一位专业的HR招聘助手，擅长从简历中提取关键技能标签。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=200,
-                response_format={"type": "json_object"}
-            )
+            content = self._complete("generate_resume_tags", **_resume_tags_request(resume_content))
             
             # 解析JSON响应
-            content = response.choices[0].message.content
             result = json.loads(content)
-            tags = result.get("tags", [])
+            tags = _merge_tags(local_tags, result.get("tags", []))
             
             logger.info(f"标签提取成功: {tags}")
             return tags
-            
+
         except Exception as e:
             logger.error(f"标签提取失败: {str(e)}")
-            return []
+            return local_tags
     
     def extract_job_tags(self, job_description: str) -> List[str]:
         """从职位描述中提取标签"""
@@ -167,43 +597,34 @@ class AIService:
             logger.warning("职位描述为空，无法提取标签")
             return []
         
+        # 默认由本地技能词库提取，llm模式或hybrid模式下本地命中过少时才调用大模型
+        local_tags = _local_tags(job_description)
+        if not _needs_llm_tags(local_tags):
+            logger.info(f"本地标签提取成功: {local_tags}")
+            return local_tags
+        
         try:
-            # 构建提示词
-            prompt = f"""
-            请从以下职位描述中提取关键技能标签，返回一个JSON数组。
-            标签应该包括技术要求、行业经验、教育背景等关键词。
-            最多返回10个标签。
-            
-            职位描述：
-            {job_description}
-            """
-            
             # 调用GPT-4O API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一位专业的HR招聘助手，擅长从职位描述中提取关键技能标签。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=200,
-                response_format={"type": "json_object"}
-            )
+            content = self._complete("extract_job_tags", **_job_tags_request(job_description))
             
             # 解析JSON响应
-            content = response.choices[0].message.content
             result = json.loads(content)
-            tags = result.get("tags", [])
+            tags = _merge_tags(local_tags, result.get("tags", []))
             
             logger.info(f"标签提取成功: {tags}")
             return tags
-            
+
         except Exception as e:
             logger.error(f"标签提取失败: {str(e)}")
-            return []
+            return local_tags
     
     def match_resume_to_job(self, resume_content: str, job_requirements: str) -> Dict[str, Any]:
-        """匹配简历与职位需求"""
+        """
+        匹配简历与职位需求
+        
+        Returns:
+            Dict: {"score", "explanation"}；模型不可用时的启发式估算和评估失败的结果另带"degraded": True
+        """
         logger.info("开始匹配简历与职位需求")
         
         # 如果简历内容或职位需求为空，返回空结果
@@ -215,35 +636,10 @@ class AIService:
             }
         
         try:
-            # 构建提示词
-            prompt = f"""
-            请根据以下职位要求和候选人简历，评估候选人与职位的匹配度。
-            要求：
-            1. 返回0-100的匹配分数
-            2. 提供匹配理由，不超过100字
-            3. 以JSON格式返回，如{{"score": 85, "explanation": "匹配理由"}}
-            
-            职位要求：
-            {job_requirements}
-            
-            候选人简历：
-            {resume_content}
-            """
-            
             # 调用GPT-4O API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一位专业的HR招聘助手，擅长评估候选人与职位的匹配度。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=200,
-                response_format={"type": "json_object"}
-            )
+            content = self._complete("match_resume_to_job", **_match_request(resume_content, job_requirements))
             
             # 解析JSON响应
-            content = response.choices[0].message.content
             result = json.loads(content)
             
             logger.info(f"匹配评估成功: 分数={result.get('score', 0)}")
@@ -251,14 +647,99 @@ class AIService:
                 "score": result.get("score", 0),
                 "explanation": result.get("explanation", "无匹配理由")
             }
-            
+
         except Exception as e:
+            if is_unavailable_error(e):
+                logger.error(f"模型服务不可用，使用本地启发式匹配: {str(e)}")
+                return _heuristic_match(resume_content, job_requirements)
             logger.error(f"匹配评估失败: {str(e)}")
             return {
                 "score": 0,
-                "explanation": f"匹配评估失败: {str(e)}"
+                "explanation": f"匹配评估失败: {str(e)}",
+                "degraded": True
             }
     
+    def match_resumes_to_job(self, job_requirements: str, resumes: Dict[int, str]) -> Dict[int, Dict[str, Any]]:
+        """
+        批量匹配多份简历与同一职位，每批简历只发起一次调用
+        
+        Args:
+            job_requirements: 职位需求文本
+            resumes: 简历ID -> 简历内容
+        
+        Returns:
+            Dict: 简历ID -> {"score", "explanation"}；批次中无法解析的简历回退到match_resume_to_job
+        """
+        logger.info(f"开始批量匹配简历与职位需求: 数量={len(resumes)}")
+        
+        results: Dict[int, Dict[str, Any]] = {}
+        if not job_requirements:
+            for resume_id, resume_content in resumes.items():
+                results[resume_id] = self.match_resume_to_job(resume_content, job_requirements)
+            return results
+        
+        scorable = [(resume_id, content) for resume_id, content in resumes.items() if content]
+        batches = _plan_match_batches(
+            job_requirements, scorable, settings.AI_MATCH_BATCH_SIZE, settings.AI_MATCH_BATCH_TOKEN_BUDGET
+        )
+        for batch in batches:
+            batch_ids = [resume_id for resume_id, _ in batch]
+            try:
+                content = self._complete("match_resumes_to_job", **_match_batch_request(job_requirements, batch))
+                results.update(_parse_match_batch_result(content, batch_ids))
+            except Exception as e:
+                logger.error(f"批量匹配评估失败，回退到逐份匹配: {str(e)}")
+        
+        # 空简历和批次中缺失的简历逐份匹配
+        for resume_id, resume_content in resumes.items():
+            if resume_id not in results:
+                results[resume_id] = self.match_resume_to_job(resume_content, job_requirements)
+        
+        logger.info(f"批量匹配完成: 数量={len(results)}, 批次数={len(batches)}")
+        return {resume_id: results[resume_id] for resume_id in resumes}
+    
+    def analyze_resume(self, ocr_content: str) -> Dict[str, Any]:
+        """
+        简历综合分析：一次调用同时完成解析、人才画像和标签提取
+        
+        Returns:
+            Dict: 包含parsed_content、talent_portrait、tags三部分；
+                  综合调用失败或缺失的部分回退到parse_resume、generate_talent_portrait、generate_resume_tags
+        """
+        logger.info("开始综合分析简历内容")
+        
+        # 如果OCR内容为空，返回空结果
+        if not ocr_content:
+            logger.warning("OCR内容为空，无法分析简历")
+            return {"parsed_content": {}, "talent_portrait": "", "tags": []}
+        
+        # 标签默认由本地技能词库提取，只有需要大模型标签时才在综合分析中请求
+        local_tags = _local_tags(ocr_content)
+        with_tags = _needs_llm_tags(local_tags)
+        
+        try:
+            # 调用GPT-4O API
+            content = self._complete("analyze_resume", **_analyze_resume_request(ocr_content, with_tags))
+            
+            # 解析JSON响应
+            analysis = _split_resume_analysis(json.loads(content))
+
+        except Exception as e:
+            logger.error(f"简历综合分析失败，回退到分步调用: {str(e)}")
+            analysis = {"parsed_content": None, "talent_portrait": None, "tags": None}
+        analysis["tags"] = _fused_tags(local_tags, with_tags, analysis["tags"])
+        
+        # 回退补齐缺失部分
+        if analysis["parsed_content"] is None:
+            analysis["parsed_content"] = self.parse_resume(ocr_content)
+        if analysis["talent_portrait"] is None:
+            analysis["talent_portrait"] = self.generate_talent_portrait(analysis["parsed_content"])
+        if analysis["tags"] is None:
+            analysis["tags"] = self.generate_resume_tags(ocr_content)
+        
+        logger.info(f"简历综合分析完成: {analysis['parsed_content'].get('name', '未知')}")
+        return analysis
+    
     def parse_job_requirement(self, document_content: str) -> Dict[str, Any]:
         """解析招聘需求文档"""
         logger.info("开始解析招聘需求文档")
@@ -269,44 +750,61 @@ class AIService:
             return {}
         
         try:
-            # 构建提示词
-            prompt = f"""
-            请解析以下招聘需求文档，提取关键信息，并以JSON格式返回。
-            需要提取的字段包括：
-            - position_name: 职位名称
-            - department: 部门
-            - responsibilities: 工作职责（详细描述）
-            - requirements: 任职要求（详细描述）
-            - salary_range: 薪资范围
-            - location: 工作地点
-            
-            招聘需求文档内容：
-            {document_content}
-            """
-            
             # 调用GPT-4O API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一位专业的HR招聘助手，擅长解析招聘需求文档。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=1000,
-                response_format={"type": "json_object"}
-            )
+            content = self._complete("parse_job_requirement", **_parse_job_requirement_request(document_content))
             
             # 解析JSON响应
-            content = response.choices[0].message.content
             parsed_content = json.loads(content)
             
             logger.info(f"招聘需求解析成功: {parsed_content.get('position_name', '未知')}")
             return parsed_content
-            
+
         except Exception as e:
             logger.error(f"招聘需求解析失败: {str(e)}")
             return {}
     
+    def analyze_job_requirement(self, document_content: str) -> Dict[str, Any]:
+        """
+        招聘需求综合分析：一次调用同时完成文档解析和标签提取
+        
+        Returns:
+            Dict: 解析字段及tags；综合调用失败时回退到parse_job_requirement，
+                  缺失标签时回退到extract_job_tags
+        """
+        logger.info("开始综合分析招聘需求文档")
+        
+        # 如果文档内容为空，返回空结果
+        if not document_content:
+            logger.warning("文档内容为空，无法分析招聘需求")
+            return {}
+        
+        # 标签默认由本地技能词库提取，只有需要大模型标签时才在综合分析中请求
+        local_tags = _local_tags(document_content)
+        with_tags = _needs_llm_tags(local_tags)
+        
+        try:
+            # 调用GPT-4O API
+            content = self._complete(
+                "analyze_job_requirement", **_analyze_job_requirement_request(document_content, with_tags)
+            )
+            
+            # 解析JSON响应（需为JSON对象）
+            parsed_content = json.loads(content)
+            if not isinstance(parsed_content, dict):
+                raise ValueError(f"综合分析结果不是JSON对象: {type(parsed_content).__name__}")
+
+        except Exception as e:
+            logger.error(f"招聘需求综合分析失败，回退到分步调用: {str(e)}")
+            parsed_content = self.parse_job_requirement(document_content)
+        
+        # 回退补齐标签
+        parsed_content["tags"] = _fused_tags(local_tags, with_tags, parsed_content.get("tags"))
+        if parsed_content["tags"] is None:
+            parsed_content["tags"] = self.extract_job_tags(_job_description(parsed_content))
+        
+        logger.info(f"招聘需求综合分析完成: {parsed_content.get('position_name', '未知')}")
+        return parsed_content
+    
     def generate_recruitment_plan(self, job_requirement: Dict[str, Any], matched_resumes: List[Dict[str, Any]]) -> Dict[str, Any]:
         """生成招聘方案"""
         logger.info("开始生成招聘方案")
@@ -317,40 +815,375 @@ class AIService:
             return {}
         
         try:
-            # 构建提示词
-            prompt = f"""
-            请根据以下职位需求和候选人匹配结果，生成一份招聘方案。
-            方案应包括：
-            1. 招聘策略
-            2. 候选人推荐理由
-            3. 面试建议
-            
-            职位需求：
-            {json.dumps(job_requirement, ensure_ascii=False, indent=2)}
-            
-            候选人匹配结果（按匹配度排序）：
-            {json.dumps(matched_resumes, ensure_ascii=False, indent=2)}
-            """
-            
             # 调用GPT-4O API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一位专业的HR招聘助手，擅长制定招聘方案。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                max_tokens=1000,
-                response_format={"type": "json_object"}
+            content = self._complete(
+                "generate_recruitment_plan",
+                **_recruitment_plan_request(job_requirement, matched_resumes)
             )
             
             # 解析JSON响应
-            content = response.choices[0].message.content
             plan = json.loads(content)
             
             logger.info("招聘方案生成成功")
             return plan
+
+        except Exception as e:
+            logger.error(f"招聘方案生成失败: {str(e)}")
+            return {}
+
+
+class AsyncAIService:
+    """异步AI服务类，基于AsyncOpenAI客户端，接口与AIService一致"""
+    
+    def __init__(self):
+        """初始化异步AI服务"""
+        self.api_key = settings.OPENAI_API_KEY
+        self.model = settings.GPT_MODEL
+        
+        # 初始化AsyncOpenAI客户端
+        try:
+            self.client = AsyncOpenAI(
+                api_key=self.api_key,
+                timeout=settings.AI_REQUEST_TIMEOUT,
+                max_retries=0,
+                http_client=httpx.AsyncClient(limits=_http_limits(), timeout=settings.AI_REQUEST_TIMEOUT)
+            )
+            logger.info(f"异步AI服务初始化成功，使用模型: {self.model}")
+        except Exception as e:
+            logger.error(f"异步AI服务初始化失败: {str(e)}")
+            self.client = None
+        
+        # LLM响应缓存（与同步服务共享同一实例）
+        self.cache = get_llm_cache()
+        
+        # 共享的RPM/TPM限流器和自适应并发控制器（上限为AI_MAX_CONCURRENCY）
+        self.rate_limiter = get_rate_limiter()
+        self.concurrency = get_concurrency_limiter()
+        
+        # 共享的重试策略和熔断器
+        self.timeout = settings.AI_REQUEST_TIMEOUT
+        self.retry_policy = get_retry_policy()
+        self.breaker = get_circuit_breaker()
+    
+    async def _complete(self, method: str, system_prompt: str, prompt: str, temperature: float,
+                        max_tokens: int, json_mode: bool = False) -> str:
+        """异步调用GPT-4O API并返回响应文本，相同请求优先命中缓存"""
+        # 缓存磁盘层为SQLite读写（写入时提交可能fsync），且与线程池中的同步调用共用一把锁，
+        # 放入线程池执行，避免阻塞事件循环
+        cache_key = None
+        if self.cache is not None:
+            cache_key = _cache_key(method, self.model, system_prompt, prompt, temperature, max_tokens)
+            cached = await run_in_threadpool(self.cache.get, cache_key)
+            if cached is not None:
+                logger.info(f"LLM缓存命中: {method}")
+                return cached
+        
+        response = await self._create_with_retry(
+            method,
+            _build_completion_kwargs(self.model, system_prompt, prompt, temperature, max_tokens, json_mode),
+            _request_tokens(system_prompt, prompt, max_tokens)
+        )
+        content = response.choices[0].message.content
+        
+        if cache_key is not None and _is_cacheable(content, json_mode):
+            await run_in_threadpool(self.cache.set, method, cache_key, content)
+        return content
+    
+    async def close(self) -> None:
+        """关闭AsyncOpenAI客户端及其HTTP连接池"""
+        if self.client is not None and hasattr(self.client, "close"):
+            await self.client.close()
+        logger.info("异步AI服务已关闭")
+    
+    async def _create_with_retry(self, method: str, kwargs: Dict[str, Any], tokens: int) -> Any:
+        """经熔断、限流和并发控制调用模型，单次调用受超时限制，可重试错误按抖动指数退避重试"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            await self.rate_limiter.acquire_async(tokens)
+            await self.concurrency.acquire_async()
+            try:
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(timeout=self.timeout, **kwargs),
+                    timeout=self.timeout
+                )
+            except Exception as e:
+                self.concurrency.release(success=False, overloaded=is_overload_error(e))
+                self.breaker.record_failure(e)
+                delay = self.retry_policy.next_delay(e, attempt, time.monotonic() - started)
+                if delay is None:
+                    raise
+                attempt += 1
+                logger.warning(f"{method}调用失败，{delay:.2f}秒后第{attempt}次重试: {str(e)}")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # 任务被取消时归还并发名额，不计入熔断统计
+                self.concurrency.release(success=False)
+                raise
+            self.concurrency.release()
+            self.breaker.record_success()
+            return response
+    
+    async def parse_resume(self, ocr_content: str) -> Dict[str, Any]:
+        """解析简历内容"""
+        logger.info("开始异步解析简历内容")
+        
+        if not ocr_content:
+            logger.warning("OCR内容为空，无法解析简历")
+            return {}
+        
+        try:
+            content = await self._complete("parse_resume", **_parse_resume_request(ocr_content))
+            parsed_content = json.loads(content)
             
+            logger.info(f"简历解析成功: {parsed_content.get('name', '未知')}")
+            return parsed_content
+
+        except Exception as e:
+            logger.error(f"简历解析失败: {str(e)}")
+            return {}
+    
+    async def generate_talent_portrait(self, parsed_content: Dict[str, Any]) -> str:
+        """生成人才画像"""
+        logger.info("开始异步生成人才画像")
+        
+        if not parsed_content:
+            logger.warning("解析内容为空，无法生成人才画像")
+            return ""
+        
+        try:
+            content = await self._complete("generate_talent_portrait", **_talent_portrait_request(parsed_content))
+            talent_portrait = content.strip()
+            
+            logger.info(f"人才画像生成成功: {talent_portrait[:50]}...")
+            return talent_portrait
+
+        except Exception as e:
+            logger.error(f"人才画像生成失败: {str(e)}")
+            return ""
+    
+    async def generate_resume_tags(self, resume_content: str) -> List[str]:
+        """从简历内容中提取标签"""
+        logger.info("开始异步从简历内容中提取标签")
+        
+        if not resume_content:
+            logger.warning("简历内容为空，无法提取标签")
+            return []
+        
+        local_tags = _local_tags(resume_content)
+        if not _needs_llm_tags(local_tags):
+            logger.info(f"本地标签提取成功: {local_tags}")
+            return local_tags
+        
+        try:
+            content = await self._complete("generate_resume_tags", **_resume_tags_request(resume_content))
+            tags = _merge_tags(local_tags, json.loads(content).get("tags", []))
+            
+            logger.info(f"标签提取成功: {tags}")
+            return tags
+
+        except Exception as e:
+            logger.error(f"标签提取失败: {str(e)}")
+            return local_tags
+    
+    async def extract_job_tags(self, job_description: str) -> List[str]:
+        """从职位描述中提取标签"""
+        logger.info("开始异步从职位描述中提取标签")
+        
+        if not job_description:
+            logger.warning("职位描述为空，无法提取标签")
+            return []
+        
+        local_tags = _local_tags(job_description)
+        if not _needs_llm_tags(local_tags):
+            logger.info(f"本地标签提取成功: {local_tags}")
+            return local_tags
+        
+        try:
+            content = await self._complete("extract_job_tags", **_job_tags_request(job_description))
+            tags = _merge_tags(local_tags, json.loads(content).get("tags", []))
+            
+            logger.info(f"标签提取成功: {tags}")
+            return tags
+
+        except Exception as e:
+            logger.error(f"标签提取失败: {str(e)}")
+            return local_tags
+    
+    async def match_resume_to_job(self, resume_content: str, job_requirements: str) -> Dict[str, Any]:
+        """匹配简历与职位需求"""
+        logger.info("开始异步匹配简历与职位需求")
+        
+        if not resume_content or not job_requirements:
+            logger.warning("简历内容或职位需求为空，无法进行匹配")
+            return {
+                "score": 0,
+                "explanation": "无法进行匹配，缺少必要信息"
+            }
+        
+        try:
+            content = await self._complete("match_resume_to_job", **_match_request(resume_content, job_requirements))
+            result = json.loads(content)
+            
+            logger.info(f"匹配评估成功: 分数={result.get('score', 0)}")
+            return {
+                "score": result.get("score", 0),
+                "explanation": result.get("explanation", "无匹配理由")
+            }
+
+        except Exception as e:
+            if is_unavailable_error(e):
+                logger.error(f"模型服务不可用，使用本地启发式匹配: {str(e)}")
+                return _heuristic_match(resume_content, job_requirements)
+            logger.error(f"匹配评估失败: {str(e)}")
+            return {
+                "score": 0,
+                "explanation": f"匹配评估失败: {str(e)}",
+                "degraded": True
+            }
+    
+    async def _match_batch(self, job_requirements: str, batch: List[Tuple[int, str]]) -> Dict[int, Dict[str, Any]]:
+        """评估单个批次，调用失败时返回空结果交由逐份匹配回退"""
+        try:
+            content = await self._complete("match_resumes_to_job", **_match_batch_request(job_requirements, batch))
+            return _parse_match_batch_result(content, [resume_id for resume_id, _ in batch])
+        except Exception as e:
+            logger.error(f"批量匹配评估失败，回退到逐份匹配: {str(e)}")
+            return {}
+    
+    async def match_resumes_to_job(self, job_requirements: str, resumes: Dict[int, str]) -> Dict[int, Dict[str, Any]]:
+        """
+        批量匹配多份简历与同一职位，每批简历只发起一次调用，无法解析的简历回退到逐份匹配
+        
+        各批次及回退调用并发执行，并发数受自适应并发控制器限制（不超过AI_MAX_CONCURRENCY）；结果按简历ID返回，与完成顺序无关
+        """
+        logger.info(f"开始异步批量匹配简历与职位需求: 数量={len(resumes)}")
+        
+        results: Dict[int, Dict[str, Any]] = {}
+        if job_requirements:
+            scorable = [(resume_id, content) for resume_id, content in resumes.items() if content]
+            batches = _plan_match_batches(
+                job_requirements, scorable, settings.AI_MATCH_BATCH_SIZE, settings.AI_MATCH_BATCH_TOKEN_BUDGET
+            )
+            for batch_results in await asyncio.gather(*(self._match_batch(job_requirements, batch) for batch in batches)):
+                results.update(batch_results)
+        
+        missing_ids = [resume_id for resume_id in resumes if resume_id not in results]
+        fallback_results = await asyncio.gather(
+            *(self.match_resume_to_job(resumes[resume_id], job_requirements) for resume_id in missing_ids)
+        )
+        results.update(zip(missing_ids, fallback_results))
+        
+        logger.info(f"批量匹配完成: 数量={len(results)}")
+        return {resume_id: results[resume_id] for resume_id in resumes}
+    
+    async def analyze_resume(self, ocr_content: str) -> Dict[str, Any]:
+        """简历综合分析：一次调用同时完成解析、人才画像和标签提取，缺失部分回退到分步调用"""
+        logger.info("开始异步综合分析简历内容")
+        
+        if not ocr_content:
+            logger.warning("OCR内容为空，无法分析简历")
+            return {"parsed_content": {}, "talent_portrait": "", "tags": []}
+        
+        local_tags = _local_tags(ocr_content)
+        with_tags = _needs_llm_tags(local_tags)
+        
+        try:
+            content = await self._complete("analyze_resume", **_analyze_resume_request(ocr_content, with_tags))
+            analysis = _split_resume_analysis(json.loads(content))
+
+        except Exception as e:
+            logger.error(f"简历综合分析失败，回退到分步调用: {str(e)}")
+            analysis = {"parsed_content": None, "talent_portrait": None, "tags": None}
+        analysis["tags"] = _fused_tags(local_tags, with_tags, analysis["tags"])
+        
+        # 解析与标签提取互不依赖，回退时并发执行
+        if analysis["parsed_content"] is None and analysis["tags"] is None:
+            analysis["parsed_content"], analysis["tags"] = await asyncio.gather(
+                self.parse_resume(ocr_content),
+                self.generate_resume_tags(ocr_content)
+            )
+        elif analysis["parsed_content"] is None:
+            analysis["parsed_content"] = await self.parse_resume(ocr_content)
+        elif analysis["tags"] is None:
+            analysis["tags"] = await self.generate_resume_tags(ocr_content)
+        if analysis["talent_portrait"] is None:
+            analysis["talent_portrait"] = await self.generate_talent_portrait(analysis["parsed_content"])
+        
+        logger.info(f"简历综合分析完成: {analysis['parsed_content'].get('name', '未知')}")
+        return analysis
+    
+    async def parse_job_requirement(self, document_content: str) -> Dict[str, Any]:
+        """解析招聘需求文档"""
+        logger.info("开始异步解析招聘需求文档")
+        
+        if not document_content:
+            logger.warning("文档内容为空，无法解析招聘需求")
+            return {}
+        
+        try:
+            content = await self._complete(
+                "parse_job_requirement", **_parse_job_requirement_request(document_content)
+            )
+            parsed_content = json.loads(content)
+            
+            logger.info(f"招聘需求解析成功: {parsed_content.get('position_name', '未知')}")
+            return parsed_content
+
+        except Exception as e:
+            logger.error(f"招聘需求解析失败: {str(e)}")
+            return {}
+    
+    async def analyze_job_requirement(self, document_content: str) -> Dict[str, Any]:
+        """招聘需求综合分析：一次调用同时完成文档解析和标签提取，失败或缺失时回退到分步调用"""
+        logger.info("开始异步综合分析招聘需求文档")
+        
+        if not document_content:
+            logger.warning("文档内容为空，无法分析招聘需求")
+            return {}
+        
+        local_tags = _local_tags(document_content)
+        with_tags = _needs_llm_tags(local_tags)
+        
+        try:
+            content = await self._complete(
+                "analyze_job_requirement", **_analyze_job_requirement_request(document_content, with_tags)
+            )
+            parsed_content = json.loads(content)
+            if not isinstance(parsed_content, dict):
+                raise ValueError(f"综合分析结果不是JSON对象: {type(parsed_content).__name__}")
+
+        except Exception as e:
+            logger.error(f"招聘需求综合分析失败，回退到分步调用: {str(e)}")
+            parsed_content = await self.parse_job_requirement(document_content)
+        
+        parsed_content["tags"] = _fused_tags(local_tags, with_tags, parsed_content.get("tags"))
+        if parsed_content["tags"] is None:
+            parsed_content["tags"] = await self.extract_job_tags(_job_description(parsed_content))
+        
+        logger.info(f"招聘需求综合分析完成: {parsed_content.get('position_name', '未知')}")
+        return parsed_content
+    
+    async def generate_recruitment_plan(self, job_requirement: Dict[str, Any], matched_resumes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """生成招聘方案"""
+        logger.info("开始异步生成招聘方案")
+        
+        if not job_requirement or not matched_resumes:
+            logger.warning("职位需求或匹配简历为空，无法生成招聘方案")
+            return {}
+        
+        try:
+            content = await self._complete(
+                "generate_recruitment_plan",
+                **_recruitment_plan_request(job_requirement, matched_resumes)
+            )
+            plan = json.loads(content)
+            
+            logger.info("招聘方案生成成功")
+            return plan
+
         except Exception as e:
             logger.error(f"招聘方案生成失败: {str(e)}")
             return {}
@@ -140,6 +140,30 @@ class AIService:
         
         return result
     
+    def match_resumes_to_job(self, job_requirements: str, resumes: Dict[int, str]) -> Dict[int, Dict[str, Any]]:
+        """批量匹配多份简历与同一职位（模拟实现）"""
+        logger.info(f"模拟批量匹配简历与职位需求: 数量={len(resumes)}")
+        
+        return {
+            resume_id: AIService.match_resume_to_job(self, resume_content, job_requirements)
+            for resume_id, resume_content in resumes.items()
+        }
+    
+    def analyze_resume(self, ocr_content: str) -> Dict[str, Any]:
+        """简历综合分析（模拟实现）"""
+        logger.info("模拟综合分析简历内容")
+        
+        # 如果OCR内容为空，返回空结果
+        if not ocr_content:
+            return {"parsed_content": {}, "talent_portrait": "", "tags": []}
+        
+        parsed_content = AIService.parse_resume(self, ocr_content)
+        return {
+            "parsed_content": parsed_content,
+            "talent_portrait": AIService.generate_talent_portrait(self, parsed_content),
+            "tags": AIService.generate_resume_tags(self, ocr_content)
+        }
+    
     def parse_job_requirement(self, document_content: str) -> Dict[str, Any]:
         """解析招聘需求文档（模拟实现）"""
         logger.info("模拟解析招聘需求文档")
@@ -170,6 +194,21 @@ class AIService:
         
         return parsed_content
     
+    def analyze_job_requirement(self, document_content: str) -> Dict[str, Any]:
+        """招聘需求综合分析（模拟实现）"""
+        logger.info("模拟综合分析招聘需求文档")
+        
+        # 如果文档内容为空，返回空结果
+        if not document_content:
+            return {}
+        
+        # 显式调用同步实现，保证异步子类复用时不会拿到协程对象
+        parsed_content = AIService.parse_job_requirement(self, document_content)
+        job_description = f"{parsed_content.get('position_name', '')}\n{parsed_content.get('responsibilities', '')}\n{parsed_content.get('requirements', '')}"
+        parsed_content["tags"] = AIService.extract_job_tags(self, job_description)
+        
+        return parsed_content
+    
     def generate_recruitment_plan(self, job_requirement: Dict[str, Any], matched_resumes: List[Dict[str, Any]]) -> Dict[str, Any]:
         """生成招聘方案（模拟实现）"""
         logger.info("模拟生成招聘方案")
@@ -191,3 +230,46 @@ class AIService:
         }
         
         return plan
+
+class AsyncAIService(AIService):
+    """异步AI服务模拟类，以协程形式提供与AIService相同的模拟实现"""
+    
+    async def parse_resume(self, ocr_content: str) -> Dict[str, Any]:
+        """解析简历内容（异步模拟实现）"""
+        return super().parse_resume(ocr_content)
+    
+    async def generate_talent_portrait(self, parsed_content: Dict[str, Any]) -> str:
+        """生成人才画像（异步模拟实现）"""
+        return super().generate_talent_portrait(parsed_content)
+    
+    async def generate_resume_tags(self, resume_content: str) -> List[str]:
+        """从简历内容中提取标签（异步模拟实现）"""
+        return super().generate_resume_tags(resume_content)
+    
+    async def extract_job_tags(self, job_description: str) -> List[str]:
+        """从职位描述中提取标签（异步模拟实现）"""
+        return super().extract_job_tags(job_description)
+    
+    async def match_resume_to_job(self, resume_content: str, job_requirements: str) -> Dict[str, Any]:
+        """匹配简历与职位需求（异步模拟实现）"""
+        return super().match_resume_to_job(resume_content, job_requirements)
+    
+    async def match_resumes_to_job(self, job_requirements: str, resumes: Dict[int, str]) -> Dict[int, Dict[str, Any]]:
+        """批量匹配多份简历与同一职位（异步模拟实现）"""
+        return super().match_resumes_to_job(job_requirements, resumes)
+    
+    async def analyze_resume(self, ocr_content: str) -> Dict[str, Any]:
+        """简历综合分析（异步模拟实现）"""
+        return super().analyze_resume(ocr_content)
+    
+    async def parse_job_requirement(self, document_content: str) -> Dict[str, Any]:
+        """解析招聘需求文档（异步模拟实现）"""
+        return super().parse_job_requirement(document_content)
+    
+    async def analyze_job_requirement(self, document_content: str) -> Dict[str, Any]:
+        """招聘需求综合分析（异步模拟实现）"""
+        return super().analyze_job_requirement(document_content)
+    
+    async def generate_recruitment_plan(self, job_requirement: Dict[str, Any], matched_resumes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """生成招聘方案（异步模拟实现）"""
+        return super().generate_recruitment_plan(job_requirement, matched_resumes)
@@ -0,0 +1,236 @@
+"""
+AI调用限流模块
+客户端侧的RPM/TPM令牌桶限流，以及基于AIMD的自适应并发控制，
+同步服务（线程）与异步服务（事件循环）共享同一组实例
+"""
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Optional
+from app.core.config import settings
+
+# 获取日志记录器
+logger = logging.getLogger(__name__)
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """判断异常是否表示服务端过载（429、5xx或超时）"""
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+    return isinstance(error, (TimeoutError, asyncio.TimeoutError)) or type(error).__name__ in (
+        "APITimeoutError", "APIConnectionError"
+    )
+
+
+class TokenBucket:
+    """
+    令牌桶
+
+    - 每分钟补充rate_per_minute个令牌，桶容量为一分钟的配额
+    - reserve先扣减令牌并返回需要等待的秒数，余额允许为负，保证先到先得
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """初始化令牌桶"""
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else float(rate_per_minute)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """预留令牌，返回获得令牌前需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    @property
+    def available(self) -> float:
+        """当前可用令牌数（不含补充）"""
+        with self._lock:
+            return self._tokens
+
+
+class RateLimiter:
+    """按请求数（RPM）和预估token数（TPM）双维度限流，配额为0表示不限制"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        """初始化限流器"""
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+    def _reserve(self, tokens: int) -> float:
+        """同时预留请求和token配额，返回需要等待的秒数"""
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+    def acquire(self, tokens: int) -> float:
+        """阻塞等待配额（同步服务使用），返回实际等待秒数"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            logger.info(f"触发客户端限流，等待{wait:.2f}秒")
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: int) -> float:
+        """异步等待配额（异步服务使用），返回实际等待秒数"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            logger.info(f"触发客户端限流，等待{wait:.2f}秒")
+            await asyncio.sleep(wait)
+        return wait
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD自适应并发控制
+
+    - 成功调用时并发上限加性增长（约每轮增加increase）
+    - 遇到429/5xx/超时时乘性下降，冷却期内只下降一次，避免同一波失败把上限压到最低
+    - 线程和协程共用一个等待队列，释放时按先来先得移交并发名额
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: Optional[int] = None,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        backoff_cooldown: float = 1.0
+    ):
+        """初始化并发控制器"""
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum if maximum is not None else initial)
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.backoff_cooldown = backoff_cooldown
+
+        self._limit = float(min(max(initial, self.minimum), self.maximum))
+        self._in_flight = 0
+        self._last_backoff = 0.0
+        self._waiters: "deque[Any]" = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        """当前并发上限"""
+        return max(self.minimum, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        """当前进行中的调用数"""
+        return self._in_flight
+
+    def _try_acquire(self) -> bool:
+        """尝试直接获取名额（调用方需持有锁）"""
+        if not self._waiters and self._in_flight < self.limit:
+            self._in_flight += 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        """阻塞获取并发名额（同步服务使用）"""
+        with self._lock:
+            if self._try_acquire():
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        # 名额由release直接移交，唤醒即已持有
+        event.wait()
+
+    async def acquire_async(self) -> None:
+        """异步获取并发名额（异步服务使用）"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_acquire():
+                return
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # 名额已移交：结果已送达则归还；否则由_wake在发现取消后归还
+            if not future.cancelled():
+                self._release_slot()
+            raise
+
+    def _wake(self, future: "asyncio.Future[None]") -> None:
+        """在等待者所在事件循环中移交名额"""
+        if future.cancelled():
+            self._release_slot()
+        elif not future.done():
+            future.set_result(None)
+
+    def _release_slot(self) -> None:
+        """归还名额并按容量唤醒等待者"""
+        with self._lock:
+            self._in_flight -= 1
+            while self._waiters and self._in_flight < self.limit:
+                waiter = self._waiters.popleft()
+                self._in_flight += 1
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                else:
+                    loop, future = waiter
+                    loop.call_soon_threadsafe(self._wake, future)
+
+    def release(self, success: bool = True, overloaded: bool = False) -> None:
+        """释放名额并根据调用结果调整并发上限"""
+        with self._lock:
+            if overloaded:
+                now = time.monotonic()
+                if now - self._last_backoff >= self.backoff_cooldown:
+                    self._limit = max(float(self.minimum), self._limit * self.decrease_factor)
+                    self._last_backoff = now
+                    logger.warning(f"模型服务过载，并发上限降至{self.limit}")
+            elif success:
+                self._limit = min(float(self.maximum), self._limit + self.increase / max(self._limit, 1.0))
+        self._release_slot()
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None
+_throttle_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """获取进程内共享的RPM/TPM限流器"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _throttle_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter(settings.AI_RATE_LIMIT_RPM, settings.AI_RATE_LIMIT_TPM)
+    return _rate_limiter
+
+
+def get_concurrency_limiter() -> AdaptiveConcurrencyLimiter:
+    """获取进程内共享的自适应并发控制器"""
+    global _concurrency_limiter
+    if _concurrency_limiter is None:
+        with _throttle_lock:
+            if _concurrency_limiter is None:
+                _concurrency_limiter = AdaptiveConcurrencyLimiter(
+                    initial=settings.AI_INITIAL_CONCURRENCY,
+                    minimum=settings.AI_MIN_CONCURRENCY,
+                    maximum=settings.AI_MAX_CONCURRENCY,
+                    backoff_cooldown=settings.AI_CONCURRENCY_BACKOFF_COOLDOWN
+                )
+    return _concurrency_limiter
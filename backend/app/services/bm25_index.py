@@ -0,0 +1,294 @@
+"""
+BM25词法索引模块
+基于倒排索引的BM25打分，作为无需调用大模型的本地匹配层：
+明显不匹配（或明显匹配）的简历直接由本地分数决定，只有边界分数的简历才交给大模型评估
+"""
+import math
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.resume import Resume
+from app.models.job_requirement import JobRequirement
+from app.services.embedding_service import job_text, resume_text, top_k
+from app.services.index_watermark import TableWatermark
+from app.utils.tokenizer import iter_term_ids, term_id, term_ids, tokenize
+
+# 获取日志记录器
+logger = logging.getLogger(__name__)
+
+# 本地评估说明中列出的命中关键词数
+_EXPLANATION_TERMS = 8
+
+
+class BM25Index:
+    """
+    BM25倒排索引
+    
+    - 倒排表为 词ID -> {文档ID: 词频}，同时记录每篇文档的长度和去重词集合，支持增量增删改；
+      文档按词ID批量分词，查询词保留原文用于生成说明
+    - idf = log(1 + (N - df + 0.5) / (df + 0.5))，始终为正
+    - 分数归一化：以"每个查询词恰好出现一次、文档长度为平均长度"的理想文档得分为100分
+    - 全量检索按词把倒排表缓存为NumPy数组向量化累加，文档增删改时只失效其包含的词
+    """
+    
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """初始化BM25索引"""
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[int, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Tuple[int, ...]] = {}
+        self._doc_lengths: Dict[int, int] = {}
+        self._total_length = 0
+        self._arrays: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._max_doc_id = 0
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        """文档数"""
+        return len(self._doc_lengths)
+    
+    def __contains__(self, doc_id: int) -> bool:
+        """是否包含指定文档"""
+        return doc_id in self._doc_lengths
+    
+    @property
+    def average_length(self) -> float:
+        """平均文档长度"""
+        return self._total_length / len(self._doc_lengths) if self._doc_lengths else 0.0
+    
+    def add(self, doc_id: int, text: str) -> None:
+        """新增或更新文档"""
+        self._add(doc_id, term_ids(text))
+    
+    def _add(self, doc_id: int, ids: np.ndarray) -> None:
+        """按词ID新增或更新文档"""
+        ids, counts = np.unique(ids, return_counts=True)
+        frequencies = dict(zip(ids.tolist(), counts.tolist()))
+        with self._lock:
+            self._remove(doc_id)
+            for term, count in frequencies.items():
+                self._postings.setdefault(term, {})[doc_id] = count
+                self._arrays.pop(term, None)
+            self._doc_terms[doc_id] = tuple(frequencies)
+            self._max_doc_id = max(self._max_doc_id, doc_id)
+            length = sum(frequencies.values())
+            self._doc_lengths[doc_id] = length
+            self._total_length += length
+    
+    def _remove(self, doc_id: int) -> bool:
+        """删除文档（调用方需持有锁）"""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            self._arrays.pop(term, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        return True
+    
+    def remove(self, doc_id: int) -> bool:
+        """删除文档，返回是否存在"""
+        with self._lock:
+            return self._remove(doc_id)
+    
+    def load(self, documents: Iterable[Tuple[int, str]]) -> None:
+        """用整批文档替换索引内容"""
+        documents = list(documents)
+        with self._lock:
+            self._postings = {}
+            self._doc_terms = {}
+            self._doc_lengths = {}
+            self._total_length = 0
+            self._arrays = {}
+            self._max_doc_id = 0
+            for (doc_id, _), ids in zip(documents, iter_term_ids(text for _, text in documents)):
+                self._add(doc_id, ids)
+    
+    def idf(self, term: int) -> float:
+        """计算词（词ID）的逆文档频率"""
+        df = len(self._postings.get(term, ()))
+        return math.log(1.0 + (len(self._doc_lengths) - df + 0.5) / (df + 0.5))
+    
+    def _query_terms(self, query: str) -> Dict[int, str]:
+        """查询词：词ID -> 词（去重，保持出现顺序）"""
+        return {term_id(token): token for token in tokenize(query)}
+    
+    def score(self, query: str, doc_ids: Optional[Iterable[int]] = None) -> Dict[int, float]:
+        """
+        计算BM25分数
+        
+        Args:
+            query: 查询文本
+            doc_ids: 需要打分的文档范围，为None时对包含任一查询词的全部文档打分
+        
+        Returns:
+            Dict: 文档ID -> BM25分数（未命中任何查询词的指定文档为0）
+        """
+        terms = self._query_terms(query)
+        with self._lock:
+            average_length = self.average_length or 1.0
+            scores: Dict[int, float] = {}
+            if doc_ids is not None:
+                scores = {doc_id: 0.0 for doc_id in doc_ids if doc_id in self._doc_lengths}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = self.idf(term)
+                if doc_ids is None:
+                    items = postings.items()
+                else:
+                    items = ((doc_id, postings[doc_id]) for doc_id in scores if doc_id in postings)
+                for doc_id, tf in items:
+                    norm = self.k1 * (1.0 - self.b + self.b * self._doc_lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+            return scores
+    
+    def _term_arrays(self, term: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """词的倒排表数组：(文档ID, 词频, 文档长度)，缓存到该词下一次变化（调用方需持有锁）"""
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self._postings[term]
+            doc_ids = np.fromiter(postings, dtype=np.int64, count=len(postings))
+            tfs = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            lengths = np.fromiter(map(self._doc_lengths.__getitem__, postings), dtype=np.float64, count=len(postings))
+            arrays = self._arrays[term] = (doc_ids, tfs, lengths)
+        return arrays
+    
+    def search(self, query: str, k: int, candidate_ids: Optional[Iterable[int]] = None,
+               max_terms: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        检索BM25分数最高的k篇文档（只返回命中查询词的文档）
+        
+        Args:
+            query: 查询文本
+            k: 返回数量
+            candidate_ids: 检索范围，为None时检索全部文档（向量化累加）
+            max_terms: 只使用idf最高的若干个查询词，长查询（如整段职位描述）时限制耗时
+        
+        Returns:
+            List[Tuple[int, float]]: (文档ID, BM25分数)，按分数降序
+        """
+        if candidate_ids is not None:
+            scores = self.score(query, candidate_ids)
+            ranked = sorted(((doc_id, score) for doc_id, score in scores.items() if score > 0),
+                            key=lambda item: item[1], reverse=True)
+            return ranked[:k]
+        with self._lock:
+            terms = [term for term in self._query_terms(query) if term in self._postings]
+            if max_terms is not None:
+                terms = sorted(terms, key=self.idf, reverse=True)[:max_terms]
+            if not terms:
+                return []
+            average_length = self.average_length or 1.0
+            scores = np.zeros(self._max_doc_id + 1, dtype=np.float64)
+            for term in terms:
+                doc_ids, tfs, lengths = self._term_arrays(term)
+                norm = self.k1 * (1.0 - self.b + self.b * lengths / average_length)
+                scores[doc_ids] += self.idf(term) * tfs * (self.k1 + 1.0) / (tfs + norm)
+        positions = top_k(scores, k)
+        return [(int(doc_id), float(scores[doc_id])) for doc_id in positions if scores[doc_id] > 0]
+    
+    def match(self, query: str, doc_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        本地匹配评估：返回与大模型匹配结果相同结构的分数（0-100）和说明
+        
+        Args:
+            query: 职位需求文本
+            doc_ids: 待评估的文档ID
+        
+        Returns:
+            Dict: 文档ID -> {"score": 分数, "explanation": 说明}（不在索引中的文档不返回）
+        """
+        terms = self._query_terms(query)
+        with self._lock:
+            doc_ids = [doc_id for doc_id in doc_ids if doc_id in self._doc_lengths]
+            scores = self.score(query, doc_ids)
+            ideal = sum(self.idf(term) for term in terms)
+            results = {}
+            for doc_id in doc_ids:
+                hits = [token for term, token in terms.items() if doc_id in self._postings.get(term, ())]
+                score = round(min(100.0, 100.0 * scores[doc_id] / ideal)) if ideal else 0
+                explanation = f"本地关键词评估（BM25）：命中职位关键词{len(hits)}/{len(terms)}个"
+                if hits:
+                    more = "等" if len(hits) > _EXPLANATION_TERMS else ""
+                    explanation += f"（{'、'.join(hits[:_EXPLANATION_TERMS])}{more}）"
+                results[doc_id] = {"score": score, "explanation": explanation}
+            return results
+
+
+class ResumeBM25Index(BM25Index):
+    """简历BM25索引：首次使用时从数据库构建，简历增删改时增量更新，按数据水位同步其他进程的写入"""
+    
+    def __init__(self, k1: float = 1.5, b: float = 0.75, sync_interval: float = 5.0):
+        """初始化简历BM25索引"""
+        super().__init__(k1, b)
+        self.watermark = TableWatermark(Resume, sync_interval)
+        self._built = False
+    
+    @property
+    def built(self) -> bool:
+        """索引是否已构建"""
+        return self._built
+    
+    def build(self, db: Session) -> None:
+        """从数据库全量构建索引"""
+        with self._lock:
+            self.watermark.reset(db)
+            rows = db.query(Resume.id, Resume.ocr_content, Resume.talent_portrait).all()
+            self.load((row.id, resume_text(row)) for row in rows)
+            self._built = True
+            logger.info(f"简历BM25索引构建完成: 数量={len(self)}, 词数={len(self._postings)}")
+    
+    def ensure_built(self, db: Session) -> None:
+        """索引未构建时从数据库构建，已构建时同步其他进程的写入"""
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self.build(db)
+                    return
+        self._sync_writes(db)
+    
+    def _sync_writes(self, db: Session) -> None:
+        """数据水位变化时重新加载上次水位以来更新过的简历，行数与索引不一致时全量重建"""
+        changed = self.watermark.poll(db)
+        if changed is None:
+            return
+        resume_ids, count = changed
+        with self._lock:
+            rows = db.query(Resume.id, Resume.ocr_content, Resume.talent_portrait).filter(Resume.id.in_(resume_ids)).all()
+            for row in rows:
+                self.add(row.id, resume_text(row))
+            if len(self) != count:
+                self.build(db)
+    
+    def upsert_resume(self, resume: Resume) -> None:
+        """新增或更新简历（索引未构建时忽略，构建时会读到最新数据；构建进行中时等待构建完成后写入）"""
+        with self._lock:
+            if self._built:
+                self.add(resume.id, resume_text(resume))
+    
+    def remove_resume(self, resume_id: int) -> None:
+        """删除简历"""
+        self.remove(resume_id)
+    
+    def match_resumes(self, db: Session, job_requirements: str, resume_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """本地评估多份简历与职位需求的匹配度（索引未构建时先构建）"""
+        self.ensure_built(db)
+        return self.match(job_requirements, resume_ids)
+    
+    def search_job(self, db: Session, job: JobRequirement, k: int) -> List[Tuple[int, float]]:
+        """检索与招聘需求BM25分数最高的k份简历（索引未构建时先构建）"""
+        self.ensure_built(db)
+        return self.search(job_text(job), k, max_terms=settings.RETRIEVAL_LEXICAL_TERMS)
+
+
+def create_bm25_index() -> ResumeBM25Index:
+    """按配置创建简历BM25索引"""
+    return ResumeBM25Index(k1=settings.BM25_K1, b=settings.BM25_B, sync_interval=settings.INDEX_SYNC_INTERVAL)
@@ -0,0 +1,340 @@
+"""
+文本向量服务模块
+为简历和招聘需求计算、持久化文本向量，供职位推荐（简历 -> 职位）按余弦相似度排名；
+向量化后端不是本地哈希时，批量匹配和混合召回的简历检索（vector_index.EmbeddingResumeIndex）也读取这里的简历向量
+"""
+import hashlib
+import logging
+from typing import Any, Callable, Iterable, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.embedding import Embedding
+from app.models.resume import Resume
+from app.models.job_requirement import JobRequirement
+from app.utils.tokenizer import iter_term_ids, term_ids
+
+# 获取日志记录器
+logger = logging.getLogger(__name__)
+
+RESUME = "resume"
+JOB = "job"
+_LABELS = {RESUME: "简历", JOB: "招聘需求"}
+
+# 批量向量化时单次调用的最大文本数
+_EMBED_BATCH = 256
+
+
+def resume_text(resume: Resume) -> str:
+    """拼接用于向量化的简历文本"""
+    return "\n".join(part for part in (resume.ocr_content, resume.talent_portrait) if part)
+
+
+def job_text(job: JobRequirement) -> str:
+    """拼接用于向量化的招聘需求文本"""
+    tags = " ".join(job.tags) if isinstance(job.tags, list) else ""
+    return "\n".join(part for part in (job.position_name, job.responsibilities, job.requirements, tags) if part)
+
+
+def content_hash(text: str) -> str:
+    """计算源文本哈希，文本未变化时跳过重新向量化"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """按行L2归一化（零向量保持为零）"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """返回分数最高的k个位置（按分数降序），使用argpartition避免全排序"""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class Embedder:
+    """向量化后端接口：输出按行L2归一化的float32矩阵"""
+    
+    name: str = "base"
+    dim: int = 0
+    
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """批量向量化"""
+        raise NotImplementedError
+    
+    def close(self) -> None:
+        """释放后端资源"""
+        pass
+
+
+class HashingEmbedder(Embedder):
+    """
+    本地哈希向量化（特征哈希 + 对数词频），结果确定、无需网络，
+    用于离线环境和测试，也可作为大模型向量不可用时的默认后端
+    
+    词ID由分词模块向量化计算，名称中带分词模式，切换模式后不会混用已持久化的向量
+    """
+    
+    # 词ID乘以该奇数常量后取高位作为哈希桶和符号
+    MIX = np.uint64(0x9E3779B97F4A7C15)
+    
+    def __init__(self, dim: int = 256, mode: Optional[str] = None):
+        """初始化哈希向量化器"""
+        self.dim = dim
+        self.mode = mode or settings.TOKENIZER_MODE
+        self.name = f"hashing-{self.mode}-{dim}"
+    
+    def term_vector(self, text: str) -> np.ndarray:
+        """计算带符号的哈希桶词频向量（1 + log tf）"""
+        return self._bucket(term_ids(text, self.mode))
+    
+    def term_vectors(self, texts: Iterable[str]) -> np.ndarray:
+        """批量计算哈希桶词频向量（批量分词，适合构建索引和批量导入）"""
+        vectors = [self._bucket(ids) for ids in iter_term_ids(texts, self.mode)]
+        return np.stack(vectors) if vectors else np.zeros((0, self.dim), dtype=np.float32)
+    
+    def _bucket(self, ids: np.ndarray) -> np.ndarray:
+        """词ID映射到哈希桶并按词频加权"""
+        ids, counts = np.unique(ids, return_counts=True)
+        mixed = ids.view(np.uint64) * self.MIX
+        buckets = (mixed >> np.uint64(32)) % np.uint64(self.dim)
+        signs = np.where(mixed & np.uint64(1 << 31), -1.0, 1.0)
+        weights = signs * (1.0 + np.log(counts))
+        return np.bincount(buckets.astype(np.intp), weights, minlength=self.dim).astype(np.float32)
+    
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """批量向量化"""
+        return normalize_rows(self.term_vectors(texts))
+
+
+# 不支持dimensions参数的向量模型及其原生维度（截断这些模型的向量会使余弦相似度失去意义）
+_FIXED_DIMENSIONS = {"text-embedding-ada-002": 1536}
+
+
+class OpenAIEmbedder(Embedder):
+    """
+    OpenAI向量接口后端
+    
+    text-embedding-3系列通过dimensions参数由服务端降维；固定维度的模型要求EMBEDDING_DIM等于原生维度。
+    调用与对话接口共用限流、并发控制、重试策略和熔断器
+    """
+    
+    def __init__(self, model: str, dim: int):
+        """初始化OpenAI向量化后端"""
+        from openai import OpenAI
+        from app.services.ai_resilience import get_circuit_breaker, get_retry_policy
+        from app.services.ai_throttle import get_concurrency_limiter, get_rate_limiter
+        native_dim = _FIXED_DIMENSIONS.get(model)
+        if native_dim is not None and dim != native_dim:
+            raise ValueError(f"向量模型{model}不支持指定维度，EMBEDDING_DIM必须为{native_dim}，当前为{dim}")
+        self.model = model
+        self.dim = dim
+        self.name = f"openai-{model}-{dim}"
+        # 重试由共享的重试策略统一处理，关闭SDK自带重试避免叠加
+        self.client = OpenAI(api_key=settings.OPENAI_API_KEY, timeout=settings.AI_REQUEST_TIMEOUT, max_retries=0)
+        self.rate_limiter = get_rate_limiter()
+        self.concurrency = get_concurrency_limiter()
+        self.retry_policy = get_retry_policy()
+        self.breaker = get_circuit_breaker()
+    
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """批量向量化（空文本返回零向量）"""
+        from app.services.ai_resilience import call_with_retry
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        rows = [row for row, text in enumerate(texts) if text]
+        if not rows:
+            return matrix
+        kwargs = {"model": self.model, "input": [texts[row] for row in rows]}
+        if self.model not in _FIXED_DIMENSIONS:
+            kwargs["dimensions"] = self.dim
+        response = call_with_retry(
+            "embeddings",
+            lambda: self.client.embeddings.create(**kwargs),
+            sum(len(text.encode("utf-8")) // 3 + 1 for text in kwargs["input"]),
+            self.rate_limiter, self.concurrency, self.breaker, self.retry_policy
+        )
+        for row, item in zip(rows, response.data):
+            if len(item.embedding) != self.dim:
+                raise ValueError(f"向量维度不一致: 期望{self.dim}，实际{len(item.embedding)}")
+            matrix[row] = np.asarray(item.embedding, dtype=np.float32)
+        return normalize_rows(matrix)
+    
+    def close(self) -> None:
+        """关闭HTTP连接池"""
+        self.client.close()
+
+
+def create_embedder(backend: Optional[str] = None) -> Embedder:
+    """按配置创建向量化后端"""
+    backend = backend or settings.EMBEDDING_BACKEND
+    if backend == "openai":
+        return OpenAIEmbedder(settings.EMBEDDING_MODEL, settings.EMBEDDING_DIM)
+    if backend != "hashing":
+        logger.warning(f"未知的向量化后端: {backend}，使用本地哈希向量化")
+    return HashingEmbedder(settings.EMBEDDING_DIM)
+
+
+class EmbeddingService:
+    """文本向量服务：持久化简历/招聘需求向量，供职位推荐和简历检索按余弦相似度排名"""
+    
+    def __init__(self, embedder: Optional[Embedder] = None):
+        """初始化文本向量服务"""
+        self.embedder = embedder or create_embedder()
+        logger.info(f"文本向量服务初始化成功，向量模型: {self.embedder.name}")
+    
+    @property
+    def model(self) -> str:
+        """当前向量模型名称"""
+        return self.embedder.name
+    
+    def embed_text(self, text: str) -> np.ndarray:
+        """向量化单条文本"""
+        return self.embedder.embed([text])[0]
+    
+    def embed_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """分批向量化多条文本（每批不超过_EMBED_BATCH条）"""
+        if not texts:
+            return np.zeros((0, self.embedder.dim), dtype=np.float32)
+        return np.concatenate([
+            self.embedder.embed(texts[start:start + _EMBED_BATCH]) for start in range(0, len(texts), _EMBED_BATCH)
+        ])
+    
+    def _find(self, db: Session, owner_type: str, owner_id: int) -> Optional[Embedding]:
+        """查询已保存的向量记录"""
+        return db.query(Embedding).filter(
+            Embedding.owner_type == owner_type,
+            Embedding.owner_id == owner_id,
+            Embedding.model == self.model
+        ).first()
+    
+    def upsert(self, db: Session, owner_type: str, owner_id: int, text: str,
+               vector: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        计算并保存向量（源文本未变化时直接返回已保存的向量），由调用方提交事务
+        
+        vector为事先在事务外计算好的向量，指定时不再调用向量化后端
+        """
+        text_hash = content_hash(text)
+        record = self._find(db, owner_type, owner_id)
+        if record is not None and record.content_hash == text_hash:
+            return np.frombuffer(record.vector, dtype=np.float32)
+        
+        if vector is None:
+            vector = self.embed_text(text)
+        if record is None:
+            record = Embedding(owner_type=owner_type, owner_id=owner_id, model=self.model)
+            db.add(record)
+        record.dim = vector.shape[0]
+        record.vector = vector.astype(np.float32).tobytes()
+        record.content_hash = text_hash
+        return vector
+    
+    def vector(self, db: Session, owner_type: str, owner_id: int, text: str) -> np.ndarray:
+        """读取向量：源文本未变化时返回已保存的向量，否则在内存中计算，不写入数据库（供只读请求使用）"""
+        record = self._find(db, owner_type, owner_id)
+        if record is not None and record.content_hash == content_hash(text):
+            return np.frombuffer(record.vector, dtype=np.float32)
+        return self.embed_text(text)
+    
+    def delete(self, db: Session, owner_type: str, owner_id: int) -> None:
+        """删除对象的所有向量记录，由调用方提交事务"""
+        db.query(Embedding).filter(
+            Embedding.owner_type == owner_type,
+            Embedding.owner_id == owner_id
+        ).delete(synchronize_session=False)
+    
+    def _prepare(self, db: Session, owner_type: str, owner_id: Optional[int], text: str) -> Optional[np.ndarray]:
+        """在写事务外计算向量：源文本未变化时返回已保存的向量，失败时记录日志并返回None"""
+        try:
+            return self.vector(db, owner_type, owner_id, text) if owner_id is not None else self.embed_text(text)
+        except Exception as e:
+            logger.error(f"{_LABELS.get(owner_type, owner_type)}向量化失败: ID={owner_id}, {str(e)}")
+            return None
+    
+    def prepare_resume(self, db: Session, resume: Resume) -> Optional[np.ndarray]:
+        """
+        在写事务外计算简历向量（OpenAI后端为网络调用，不应在持有写锁的事务中执行），
+        结果交给stage_resume在同一事务中写入
+        """
+        return self._prepare(db, RESUME, resume.id, resume_text(resume))
+    
+    def prepare_job(self, db: Session, job: JobRequirement) -> Optional[np.ndarray]:
+        """在写事务外计算招聘需求向量，结果交给stage_job在同一事务中写入"""
+        return self._prepare(db, JOB, job.id, job_text(job))
+    
+    def stage_resume(self, db: Session, resume: Resume, vector: Optional[np.ndarray]) -> None:
+        """在当前事务中写入prepare_resume算好的简历向量（简历需已flush获得ID），向量为None（计算失败）时跳过"""
+        if vector is not None:
+            self.upsert(db, RESUME, resume.id, resume_text(resume), vector)
+    
+    def stage_job(self, db: Session, job: JobRequirement, vector: Optional[np.ndarray]) -> None:
+        """在当前事务中写入prepare_job算好的招聘需求向量（招聘需求需已flush获得ID），向量为None时跳过"""
+        if vector is not None:
+            self.upsert(db, JOB, job.id, job_text(job), vector)
+    
+    def _load_vectors(self, db: Session, owner_type: str, model: Any, to_text: Callable[[Any], str],
+                      owner_ids: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        加载某类对象的向量矩阵（只读）
+        
+        缺失的向量（历史数据或向量化失败的对象）只在内存中计算，不写入数据库，由对象的写入路径持久化
+        """
+        query = db.query(Embedding.owner_id, Embedding.vector).join(model, model.id == Embedding.owner_id).filter(
+            Embedding.owner_type == owner_type,
+            Embedding.model == self.model
+        )
+        if owner_ids is not None:
+            query = query.filter(Embedding.owner_id.in_(list(owner_ids)))
+        vectors = {owner_id: np.frombuffer(vector, dtype=np.float32) for owner_id, vector in query}
+        
+        # 在内存中补齐缺失的向量
+        missing_query = db.query(model).outerjoin(
+            Embedding,
+            and_(
+                Embedding.owner_id == model.id,
+                Embedding.owner_type == owner_type,
+                Embedding.model == self.model
+            )
+        ).filter(Embedding.id.is_(None))
+        if owner_ids is not None:
+            missing_query = missing_query.filter(model.id.in_(list(owner_ids)))
+        missing = missing_query.all()
+        if missing:
+            vectors.update(zip((owner.id for owner in missing), self.embed_texts([to_text(owner) for owner in missing])))
+            logger.info(f"{_LABELS.get(owner_type, owner_type)}向量未保存，已在内存中计算: 数量={len(missing)}")
+        
+        ids = np.fromiter(vectors.keys(), dtype=np.int64, count=len(vectors))
+        if not len(ids):
+            return ids, np.zeros((0, self.embedder.dim), dtype=np.float32)
+        matrix = np.stack([vectors[owner_id] for owner_id in ids.tolist()])
+        return ids, matrix
+    
+    def load_resume_vectors(self, db: Session, resume_ids: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        加载简历向量矩阵（只读，缺失的向量只在内存中计算）
+        
+        Returns:
+            Tuple: (简历ID数组, 按行归一化的float32矩阵)
+        """
+        return self._load_vectors(db, RESUME, Resume, resume_text, resume_ids)
+    
+    def load_job_vectors(self, db: Session, job_ids: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        加载招聘需求向量矩阵（只读，缺失的向量只在内存中计算）
+        
+        Returns:
+            Tuple: (招聘需求ID数组, 按行归一化的float32矩阵)
+        """
+        return self._load_vectors(db, JOB, JobRequirement, job_text, job_ids)
+    
+    def close(self) -> None:
+        """释放向量化后端资源"""
+        self.embedder.close()
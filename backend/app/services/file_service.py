@@ -7,6 +7,7 @@ import logging
 import base64
 from typing import Dict, Any, Optional
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from app.core.config import settings
 
 # 获取日志记录器
@@ -28,9 +29,7 @@ class FileService:
         logger.info(f"开始上传文件: {file.filename}, 文件类型: {file.content_type}")
         
         try:
-            # 确保目标文件夹存在
             folder_path = os.path.join(self.storage_path, folder)
-            os.makedirs(folder_path, exist_ok=True)
             
             # 读取文件内容
             file_content = await file.read()
@@ -42,9 +41,8 @@ class FileService:
             file_name = f"{int(time.time())}_{uuid.uuid4().hex}{file_ext}"
             file_path = os.path.join(folder_path, file_name)
             
-            # 保存文件
-            with open(file_path, "wb") as f:
-                f.write(file_content)
+            # 保存文件（阻塞写入放入线程池，避免阻塞事件循环）
+            await run_in_threadpool(self._write_file, file_path, file_content)
             
             # 生成文件URL
             file_url = f"/uploads/{folder}/{file_name}"
@@ -62,6 +60,12 @@ class FileService:
             logger.error(f"文件上传失败: {str(e)}")
             raise e
     
+    def _write_file(self, file_path: str, file_content: bytes) -> None:
+        """写入文件内容（确保目标文件夹存在）"""
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "wb") as f:
+            f.write(file_content)
+    
     def get_file_content(self, file_path: str) -> bytes:
         """获取文件内容"""
         logger.info(f"开始获取文件内容: {file_path}")
@@ -0,0 +1,85 @@
+"""
+混合召回模块
+用倒数排名融合（RRF）合并BM25词法检索和向量检索的排名，为职位快速生成候选简历短名单，
+或为简历推荐职位；全程只用本地索引、不调用大模型，调用方可以只把融合后的Top-K交给大模型评分
+"""
+import logging
+from typing import Any, Dict, List, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.job_requirement import JobRequirement
+from app.models.resume import Resume
+
+# 获取日志记录器
+logger = logging.getLogger(__name__)
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, List[Tuple[int, float]]], k: int,
+                           constant: int = 60, key: str = "resume_id") -> List[Dict[str, Any]]:
+    """
+    倒数排名融合：score = Σ 1 / (constant + rank)，rank从1开始，只依赖排名、不依赖各路分数的量纲
+    
+    Args:
+        rankings: 召回路名称 -> [(ID, 分数)]（按分数降序）
+        k: 返回数量
+        constant: RRF平滑常数，越大越削弱头部排名的优势
+        key: 结果中ID字段的名称
+    
+    Returns:
+        List[Dict]: 按融合分数降序的结果，包含ID、score以及每一路的{名称}_rank和{名称}_score
+                    （未被该路召回时为None）
+    """
+    fused: Dict[int, Dict[str, Any]] = {}
+    for name, ranking in rankings.items():
+        for rank, (item_id, score) in enumerate(ranking, start=1):
+            item = fused.get(item_id)
+            if item is None:
+                item = fused[item_id] = {key: item_id, "score": 0.0}
+                for other in rankings:
+                    item[f"{other}_rank"] = None
+                    item[f"{other}_score"] = None
+            item["score"] += 1.0 / (constant + rank)
+            item[f"{name}_rank"] = rank
+            item[f"{name}_score"] = score
+    return sorted(fused.values(), key=lambda item: (-item["score"], item[key]))[:k]
+
+
+def retrieve_candidates(db: Session, job: JobRequirement, k: int, resume_index: Any, bm25_index: Any) -> List[Dict[str, Any]]:
+    """
+    混合召回职位的候选简历
+    
+    Args:
+        db: 数据库会话（索引未构建时用于构建）
+        job: 招聘需求
+        k: 返回数量
+        resume_index: 简历向量索引
+        bm25_index: 简历BM25索引
+    
+    Returns:
+        List[Dict]: RRF融合结果，每一路召回max(k, RETRIEVAL_DEPTH)份简历
+    """
+    depth = max(k, settings.RETRIEVAL_DEPTH)
+    rankings = {
+        "lexical": bm25_index.search_job(db, job, depth),
+        "vector": resume_index.search_job(db, job, depth),
+    }
+    logger.info(f"混合召回: 职位ID={job.id}, 词法召回={len(rankings['lexical'])}, 向量召回={len(rankings['vector'])}")
+    return reciprocal_rank_fusion(rankings, k, settings.RETRIEVAL_RRF_K)
+
+
+def recommend_jobs(db: Session, resume: Resume, k: int, job_index: Any) -> List[Dict[str, Any]]:
+    """
+    为简历推荐职位：向量、标签、词法三路对全部职位打分后按倒数排名融合
+    
+    Args:
+        db: 数据库会话
+        resume: 简历
+        k: 返回数量
+        job_index: 招聘需求索引
+    
+    Returns:
+        List[Dict]: RRF融合结果（ID字段为job_id）
+    """
+    rankings = job_index.rank(db, resume, max(k, settings.RETRIEVAL_DEPTH))
+    logger.info(f"职位推荐: 简历ID={resume.id}, " + ", ".join(f"{name}={len(ranking)}" for name, ranking in rankings.items()))
+    return reciprocal_rank_fusion(rankings, k, settings.RETRIEVAL_RRF_K, key="job_id")
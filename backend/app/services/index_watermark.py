@@ -0,0 +1,69 @@
+"""
+索引数据水位模块
+简历和招聘需求的内存索引是进程内单例，多worker部署时每个进程各有一份，只能直接看到本进程的写入。
+索引记录表的数据水位（行数 + 最大更新时间），检索前按间隔检查一次：水位变化时重新加载上次水位以来更新过的行，
+行数与索引不一致（其他进程删除了数据）时全量重建
+"""
+import time
+import threading
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+
+class TableWatermark:
+    """表数据水位：行数 + 最大更新时间（检查按间隔节流，两次检查之间不查询数据库）"""
+    
+    def __init__(self, model: Any, interval: float = 5.0):
+        """
+        初始化数据水位
+        
+        Args:
+            model: 数据模型（需有id和updated_at列）
+            interval: 检查间隔（秒），0表示每次都检查
+        """
+        self.model = model
+        self.interval = interval
+        self._count: Optional[int] = None
+        self._latest: Optional[datetime] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+    
+    def _read(self, db: Session) -> Tuple[int, Optional[datetime]]:
+        """读取当前的行数和最大更新时间"""
+        count, latest = db.query(func.count(self.model.id), func.max(self.model.updated_at)).one()
+        return int(count), latest
+    
+    def reset(self, db: Session) -> None:
+        """记录当前水位（在构建索引读取数据之前调用，构建期间的写入会在下次检查时重新加载）"""
+        count, latest = self._read(db)
+        with self._lock:
+            self._count, self._latest = count, latest
+            self._checked = time.monotonic()
+    
+    def poll(self, db: Session) -> Optional[Tuple[List[int], int]]:
+        """
+        检查水位
+        
+        Returns:
+            Optional[Tuple]: 未到检查间隔或水位未变化时为None，否则为(上次水位以来更新过的行ID, 当前行数)
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked < self.interval:
+                return None
+            self._checked = now
+            previous = self._latest
+        count, latest = self._read(db)
+        if (count, latest) == (self._count, previous):
+            return None
+        
+        # 同一时间戳内可能还有未读到的更新，从上次的最大更新时间（含）开始重新加载
+        query = db.query(self.model.id)
+        if previous is not None:
+            query = query.filter(self.model.updated_at >= previous)
+        changed = [row_id for (row_id,) in query]
+        with self._lock:
+            self._count, self._latest = count, latest
+        return changed, count
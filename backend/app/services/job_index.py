@@ -0,0 +1,189 @@
+"""
+招聘需求索引模块
+为全部职位维护向量、标签和BM25三种预计算表示，为一份简历一次性（矩阵运算）对全部职位打分，
+用于"哪些职位适合这位候选人"的反向推荐，不需要逐对调用大模型
+"""
+import logging
+import threading
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.job_requirement import JobRequirement
+from app.models.resume import Resume
+from app.services.bm25_index import BM25Index
+from app.services.embedding_service import RESUME, EmbeddingService, job_text, resume_text, top_k
+from app.services.index_watermark import TableWatermark
+
+# 获取日志记录器
+logger = logging.getLogger(__name__)
+
+
+def _ranking(ids: np.ndarray, scores: np.ndarray, k: int, positive_only: bool = False) -> List[Tuple[int, float]]:
+    """取分数最高的k个ID组成排名"""
+    return [
+        (int(ids[position]), float(scores[position]))
+        for position in top_k(scores, k)
+        if not positive_only or scores[position] > 0
+    ]
+
+
+class JobIndex:
+    """
+    招聘需求索引
+    
+    - 向量：复用文本向量服务持久化的招聘需求向量，简历向量与之做一次矩阵乘法
+    - 标签：职位标签构成0/1矩阵，得分为简历标签覆盖职位标签的比例
+    - 词法：招聘需求文本的BM25索引，以简历文本为查询
+    - 首次使用时从数据库构建；招聘需求增改时只标记过期，下次检索前重新加载这些职位
+    - 检索前按数据水位把其他进程更新过的职位标记过期（多worker部署）
+    - 加载（数据库查询和缺失向量的计算）只持有加载锁，不阻塞打分和写入路径的过期标记
+    """
+    
+    def __init__(self, embedding_service: EmbeddingService, k1: float = 1.5, b: float = 0.75,
+                 sync_interval: float = 5.0):
+        """初始化招聘需求索引"""
+        self.embedding_service = embedding_service
+        self.lexical = BM25Index(k1, b)
+        self.watermark = TableWatermark(JobRequirement, sync_interval)
+        self._vectors: Dict[int, np.ndarray] = {}
+        self._tags: Dict[int, FrozenSet[str]] = {}
+        self._stale: Set[int] = set()
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, int]]] = None
+        self._built = False
+        self._lock = threading.RLock()
+        self._load_lock = threading.RLock()
+    
+    @property
+    def built(self) -> bool:
+        """索引是否已构建"""
+        return self._built
+    
+    def __len__(self) -> int:
+        """已索引的招聘需求数"""
+        return len(self._vectors)
+    
+    def _fetch(self, db: Session, job_ids: Optional[List[int]] = None) -> Tuple[List[JobRequirement], Dict[int, np.ndarray]]:
+        """从数据库读取（全部或指定的）招聘需求及其向量（只读，不需持有锁）"""
+        query = db.query(JobRequirement)
+        if job_ids is not None:
+            query = query.filter(JobRequirement.id.in_(job_ids))
+        jobs = query.all()
+        ids, matrix = self.embedding_service.load_job_vectors(db, None if job_ids is None else [job.id for job in jobs])
+        return jobs, dict(zip(ids.tolist(), matrix))
+    
+    def _apply(self, jobs: List[JobRequirement], vectors: Dict[int, np.ndarray],
+               job_ids: Optional[List[int]] = None) -> None:
+        """写入_fetch读取的招聘需求，指定job_ids时删除其中已不存在的职位（调用方需持有锁）"""
+        for job in jobs:
+            self.lexical.add(job.id, job_text(job))
+            self._tags[job.id] = frozenset(tag.lower() for tag in job.tags or [] if isinstance(tag, str))
+            self._vectors[job.id] = vectors[job.id]
+        for job_id in set(job_ids or ()) - {job.id for job in jobs}:
+            self._remove(job_id)
+        self._arrays = None
+    
+    def build(self, db: Session) -> None:
+        """从数据库全量构建索引（读取期间写入的招聘需求保持过期标记，下次检索前重新加载）"""
+        with self._load_lock:
+            with self._lock:
+                self._stale = set()
+            self.watermark.reset(db)
+            jobs, vectors = self._fetch(db)
+            with self._lock:
+                self.lexical.load([])
+                self._vectors = {}
+                self._tags = {}
+                self._apply(jobs, vectors)
+                self._built = True
+            logger.info(f"招聘需求索引构建完成: 数量={len(self)}")
+    
+    def ensure_built(self, db: Session) -> None:
+        """索引未构建时从数据库构建；有过期的招聘需求（含其他进程的写入）时重新加载，行数不一致时全量重建"""
+        with self._load_lock:
+            if not self._built:
+                self.build(db)
+                return
+            changed = self.watermark.poll(db)
+            with self._lock:
+                if changed is not None:
+                    self._stale.update(changed[0])
+                stale, self._stale = list(self._stale), set()
+            if stale:
+                try:
+                    jobs, vectors = self._fetch(db, stale)
+                except Exception:
+                    with self._lock:
+                        self._stale.update(stale)
+                    raise
+                with self._lock:
+                    self._apply(jobs, vectors, stale)
+            if changed is not None and len(self) != changed[1]:
+                self.build(db)
+    
+    def upsert_job(self, job: JobRequirement) -> None:
+        """招聘需求新增或更新后标记过期（构建进行中也标记，构建完成后重新加载）"""
+        with self._lock:
+            self._stale.add(job.id)
+    
+    def _remove(self, job_id: int) -> None:
+        """删除招聘需求（调用方需持有锁）"""
+        self.lexical.remove(job_id)
+        self._vectors.pop(job_id, None)
+        self._tags.pop(job_id, None)
+        self._stale.discard(job_id)
+        self._arrays = None
+    
+    def remove_job(self, job_id: int) -> None:
+        """删除招聘需求（同时标记过期：进行中的加载可能已读到该职位，重新加载时确认删除）"""
+        with self._lock:
+            self._remove(job_id)
+            self._stale.add(job_id)
+    
+    def _stacked(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, int]]:
+        """(职位ID数组, 向量矩阵, 标签0/1矩阵, 标签 -> 列号)，变化后重新拼接（调用方需持有锁）"""
+        if self._arrays is None:
+            ids = np.array(sorted(self._vectors), dtype=np.int64)
+            dim = self.embedding_service.embedder.dim
+            matrix = np.stack([self._vectors[job_id] for job_id in ids.tolist()]) if len(ids) else np.zeros((0, dim), dtype=np.float32)
+            vocabulary = {tag: column for column, tag in enumerate(sorted(set().union(*self._tags.values())))}
+            tags = np.zeros((len(ids), len(vocabulary)), dtype=np.float32)
+            for row, job_id in enumerate(ids.tolist()):
+                tags[row, [vocabulary[tag] for tag in self._tags[job_id]]] = 1.0
+            self._arrays = (ids, matrix, tags, vocabulary)
+        return self._arrays
+    
+    def rank(self, db: Session, resume: Resume, depth: int) -> Dict[str, List[Tuple[int, float]]]:
+        """
+        为一份简历对全部招聘需求打分
+        
+        Args:
+            db: 数据库会话
+            resume: 简历
+            depth: 每一路返回的职位数
+        
+        Returns:
+            Dict: 召回路名称（vector/tag/lexical） -> [(职位ID, 分数)]，按分数降序
+        """
+        self.ensure_built(db)
+        text = resume_text(resume)
+        # 只读：简历向量由写入路径持久化，这里缺失或过期时只在内存中计算
+        vector = self.embedding_service.vector(db, RESUME, resume.id, text)
+        resume_tags = {tag.name.lower() for tag in resume.tags}
+        
+        with self._lock:
+            ids, matrix, tags, vocabulary = self._stacked()
+            indicator = np.zeros(len(vocabulary), dtype=np.float32)
+            indicator[[vocabulary[tag] for tag in resume_tags if tag in vocabulary]] = 1.0
+            tag_counts = tags.sum(axis=1)
+            tag_scores = (tags @ indicator) / np.maximum(tag_counts, 1.0)
+            return {
+                "vector": _ranking(ids, matrix @ vector, depth),
+                "tag": _ranking(ids, tag_scores, depth, positive_only=True),
+                "lexical": self.lexical.search(text, depth, max_terms=settings.RETRIEVAL_LEXICAL_TERMS),
+            }
+
+
+def create_job_index(embedding_service: EmbeddingService) -> JobIndex:
+    """按配置创建招聘需求索引"""
+    return JobIndex(embedding_service, k1=settings.BM25_K1, b=settings.BM25_B, sync_interval=settings.INDEX_SYNC_INTERVAL)
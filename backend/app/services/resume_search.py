@@ -0,0 +1,226 @@
+"""
+简历全文检索模块
+基于数据库全文索引检索ocr_content、talent_portrait、parsed_content，提供相关度排序、命中片段和键集分页
+
+- SQLite：FTS5 trigram索引，bm25()排序，snippet()生成片段；不足3个字符的检索词无法走trigram索引，
+  改为在命中结果（或全表）上用LIKE过滤
+- MySQL：FULLTEXT ngram索引，布尔模式MATCH ... AGAINST的相关度排序，片段在应用层截取
+- 其他数据库：退化为LIKE过滤，按ID排序
+
+片段是HTML：简历原文先转义，再插入高亮标记，前端可直接渲染
+"""
+import html
+import re
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.db.fulltext import COLUMNS, FTS_TABLE
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# 获取日志记录器
+logger = logging.getLogger(__name__)
+
+# 片段中命中词的高亮标记
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+
+# SQLite snippet()使用的占位标记（私有区字符），转义片段原文后替换为高亮标记
+_SENTINEL_OPEN = "\ue000"
+_SENTINEL_CLOSE = "\ue001"
+
+# 片段长度：SQLite为词元数，应用层截取时为命中位置前后的字符数
+_SNIPPET_TOKENS = 24
+_SNIPPET_CHARS = 40
+
+# trigram分词器能够索引的最短检索词
+_TRIGRAM = 3
+
+
+def _query_terms(q: str) -> List[str]:
+    """拆分检索词（按空白分隔，去重）"""
+    return list(dict.fromkeys(term for term in q.split() if term))
+
+
+def _like_pattern(term: str) -> str:
+    """LIKE模式（转义通配符）"""
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _like_filters(terms: Sequence[str], alias: str, params: Dict[str, Any]) -> List[str]:
+    """每个检索词都需出现在任一索引字段中"""
+    filters = []
+    for position, term in enumerate(terms):
+        name = f"like_{position}"
+        params[name] = _like_pattern(term)
+        filters.append("(" + " OR ".join(f"{alias}.{column} LIKE :{name} ESCAPE '\\'" for column in COLUMNS) + ")")
+    return filters
+
+
+def _highlight_snippet(texts: Sequence[Optional[str]], terms: Sequence[str]) -> Optional[str]:
+    """应用层生成片段：截取第一个命中位置前后的文本并高亮命中词"""
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    for content in texts:
+        if not content:
+            continue
+        found = pattern.search(content)
+        if found is None:
+            continue
+        start = max(0, found.start() - _SNIPPET_CHARS)
+        end = min(len(content), found.end() + _SNIPPET_CHARS)
+        # 逐段转义原文，高亮标记在转义之后插入
+        parts = []
+        position = start
+        for match in pattern.finditer(content, start, end):
+            parts.append(html.escape(content[position:match.start()]))
+            parts.append(f"{HIGHLIGHT_OPEN}{html.escape(match.group(0))}{HIGHLIGHT_CLOSE}")
+            position = match.end()
+        parts.append(html.escape(content[position:end]))
+        return ("…" if start else "") + "".join(parts) + ("…" if end < len(content) else "")
+    return None
+
+
+def _escape_snippet(snippet: Optional[str]) -> Optional[str]:
+    """转义SQLite snippet()返回的原文，再把占位标记替换为高亮标记"""
+    if snippet is None:
+        return None
+    escaped = html.escape(snippet)
+    return escaped.replace(_SENTINEL_OPEN, HIGHLIGHT_OPEN).replace(_SENTINEL_CLOSE, HIGHLIGHT_CLOSE)
+
+
+def _keyset(cursor: Optional[str], params: Dict[str, Any]) -> Optional[str]:
+    """键集分页条件：排序为 score DESC, id ASC，从上一页最后一条之后继续"""
+    if not cursor:
+        return None
+    keys = decode_cursor(cursor)
+    try:
+        params["cursor_score"] = float(keys["score"])
+        params["cursor_id"] = int(keys["id"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+    return "(hits.score < :cursor_score OR (hits.score = :cursor_score AND hits.id > :cursor_id))"
+
+
+def _page(db: Session, inner: str, params: Dict[str, Any], cursor: Optional[str], limit: int) -> List[Any]:
+    """在内层命中查询外包一层键集分页（排序键是计算列，不能直接写在内层WHERE中）"""
+    condition = _keyset(cursor, params)
+    params["limit"] = limit + 1
+    sql = f"SELECT hits.id, hits.score FROM ({inner}) AS hits"
+    if condition:
+        sql += f" WHERE {condition}"
+    sql += " ORDER BY hits.score DESC, hits.id LIMIT :limit"
+    return db.execute(text(sql), params).all()
+
+
+def _search_sqlite(db: Session, terms: List[str], cursor: Optional[str], limit: int) -> Tuple[List[Any], Dict[int, str]]:
+    """SQLite FTS5检索：返回(命中行, 简历ID -> 片段)"""
+    indexed = [term for term in terms if len(term) >= _TRIGRAM]
+    params: Dict[str, Any] = {}
+    filters = _like_filters([term for term in terms if len(term) < _TRIGRAM], "r", params)
+    if not indexed:
+        inner = "SELECT r.id AS id, 0.0 AS score FROM resumes AS r WHERE " + " AND ".join(filters)
+        return _page(db, inner, params, cursor, limit), {}
+    
+    # 每个检索词作为短语（双引号转义），多个词之间为AND
+    params["match"] = " ".join('"' + term.replace('"', '""') + '"' for term in indexed)
+    inner = (
+        f"SELECT r.id AS id, -bm25({FTS_TABLE}) AS score FROM {FTS_TABLE} "
+        f"JOIN resumes AS r ON r.id = {FTS_TABLE}.rowid WHERE {FTS_TABLE} MATCH :match"
+    )
+    if filters:
+        inner += " AND " + " AND ".join(filters)
+    rows = _page(db, inner, params, cursor, limit)
+    
+    snippets: Dict[int, str] = {}
+    ids = [row.id for row in rows[:limit]]
+    if ids:
+        placeholders = ", ".join(f":id_{position}" for position in range(len(ids)))
+        snippet_params = {f"id_{position}": resume_id for position, resume_id in enumerate(ids)}
+        snippet_params["match"] = params["match"]
+        snippet_rows = db.execute(text(
+            f"SELECT rowid AS id, snippet({FTS_TABLE}, -1, '{_SENTINEL_OPEN}', '{_SENTINEL_CLOSE}', '…', {_SNIPPET_TOKENS}) AS snippet "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match AND rowid IN ({placeholders})"
+        ), snippet_params).all()
+        snippets = {row.id: _escape_snippet(row.snippet) for row in snippet_rows}
+    return rows, snippets
+
+
+def _search_mysql(db: Session, terms: List[str], cursor: Optional[str], limit: int) -> Tuple[List[Any], Dict[int, str]]:
+    """MySQL FULLTEXT检索：返回(命中行, 空片段表)，片段在应用层生成"""
+    columns = ", ".join(COLUMNS)
+    # 布尔模式：每个检索词都必须出现（按短语匹配）
+    params: Dict[str, Any] = {"match": " ".join('+"' + term.replace('"', " ") + '"' for term in terms)}
+    inner = (
+        f"SELECT id, MATCH({columns}) AGAINST(:match IN BOOLEAN MODE) AS score FROM resumes "
+        f"WHERE MATCH({columns}) AGAINST(:match IN BOOLEAN MODE)"
+    )
+    return _page(db, inner, params, cursor, limit), {}
+
+
+def _search_like(db: Session, terms: List[str], cursor: Optional[str], limit: int) -> Tuple[List[Any], Dict[int, str]]:
+    """无全文索引时的LIKE检索"""
+    params: Dict[str, Any] = {}
+    inner = "SELECT r.id AS id, 0.0 AS score FROM resumes AS r WHERE " + " AND ".join(_like_filters(terms, "r", params))
+    return _page(db, inner, params, cursor, limit), {}
+
+
+def search_resumes(db: Session, q: str, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    全文检索简历
+    
+    Args:
+        db: 数据库会话
+        q: 检索词（空白分隔，全部命中才返回）
+        limit: 每页数量
+        cursor: 上一页返回的next_cursor，为None时从第一页开始
+    
+    Returns:
+        Dict: {"items": [{id, candidate_name, score, snippet}], "next_cursor": 下一页游标（没有更多时为None）}
+    
+    Raises:
+        ValueError: 游标无效
+    """
+    terms = _query_terms(q)
+    if not terms:
+        return {"items": [], "next_cursor": None}
+    
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        rows, snippets = _search_sqlite(db, terms, cursor, limit)
+    elif dialect == "mysql":
+        rows, snippets = _search_mysql(db, terms, cursor, limit)
+    else:
+        rows, snippets = _search_like(db, terms, cursor, limit)
+    
+    page = rows[:limit]
+    ids = [row.id for row in page]
+    resumes = {}
+    if ids:
+        details = db.execute(
+            text(
+                "SELECT id, candidate_name, " + ", ".join(COLUMNS) + " FROM resumes WHERE id IN ("
+                + ", ".join(f":id_{position}" for position in range(len(ids))) + ")"
+            ),
+            {f"id_{position}": resume_id for position, resume_id in enumerate(ids)}
+        ).all()
+        resumes = {row.id: row for row in details}
+    
+    items = []
+    for row in page:
+        resume = resumes.get(row.id)
+        if resume is None:
+            continue
+        snippet = snippets.get(row.id) or _highlight_snippet([getattr(resume, column) for column in COLUMNS], terms)
+        items.append({
+            "id": row.id,
+            "candidate_name": resume.candidate_name,
+            "score": float(row.score or 0.0),
+            "snippet": snippet,
+        })
+    
+    next_cursor = None
+    if len(rows) > limit and page:
+        last = page[-1]
+        next_cursor = encode_cursor({"score": float(last.score or 0.0), "id": last.id})
+    logger.info(f"简历全文检索: 检索词={terms}, 数据库={dialect}, 返回={len(items)}")
+    return {"items": items, "next_cursor": next_cursor}
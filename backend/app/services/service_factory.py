@@ -1,31 +1,141 @@
 """
 服务工厂模块
 用于创建和获取各种服务实例
+
+服务实例在进程内共享：应用启动时通过init_services创建，关闭时通过close_services释放，
+get_*函数可直接作为FastAPI依赖使用（未经启动流程时首次调用会惰性创建）
+
+简历和招聘需求索引也是进程内单例：多worker部署时每个进程各有一份，
+检索前按数据水位（INDEX_SYNC_INTERVAL）同步其他进程的写入，见index_watermark
 """
 import os
+import inspect
 import logging
-from app.services.ai_service import AIService
+import threading
+from typing import Any, Dict, Callable, List
+from app.services.ai_service import AIService, AsyncAIService
 from app.services.ai_service_mock import AIService as MockAIService
+from app.services.ai_service_mock import AsyncAIService as MockAsyncAIService
+from app.services.bm25_index import create_bm25_index
+from app.services.embedding_service import EmbeddingService
 from app.services.file_service import FileService
 from app.services.file_service_mock import FileService as MockFileService
+from app.services.job_index import create_job_index
+from app.services.vector_index import create_resume_index
 
 # 获取日志记录器
 logger = logging.getLogger(__name__)
 
-def get_ai_service():
-    """获取AI服务实例"""
+# 进程内共享的服务实例
+_services: Dict[str, Any] = {}
+_services_lock = threading.Lock()
+
+def _use_mock_services() -> bool:
+    """是否使用模拟服务"""
+    return os.getenv("MOCK_SERVICES", "False").lower() == "true" or os.getenv("ENV") == "test"
+
+def _get_or_create(name: str, factory: Callable[[], Any]) -> Any:
+    """获取共享服务实例，不存在时创建"""
+    service = _services.get(name)
+    if service is None:
+        with _services_lock:
+            service = _services.get(name)
+            if service is None:
+                service = factory()
+                _services[name] = service
+    return service
+
+def _create_ai_service():
+    """创建AI服务实例"""
     # 在测试环境中使用模拟服务
-    if os.getenv("MOCK_SERVICES", "False").lower() == "true" or os.getenv("ENV") == "test":
+    if _use_mock_services():
         logger.info("使用模拟AI服务")
         return MockAIService()
     logger.info("使用真实AI服务")
     return AIService()
 
-def get_file_service():
-    """获取文件服务实例"""
+def _create_async_ai_service():
+    """创建异步AI服务实例"""
+    # 在测试环境中使用模拟服务
+    if _use_mock_services():
+        logger.info("使用模拟异步AI服务")
+        return MockAsyncAIService()
+    logger.info("使用真实异步AI服务")
+    return AsyncAIService()
+
+def _create_file_service():
+    """创建文件服务实例"""
     # 在测试环境中使用模拟服务
-    if os.getenv("MOCK_SERVICES", "False").lower() == "true" or os.getenv("ENV") == "test":
+    if _use_mock_services():
         logger.info("使用模拟文件服务")
         return MockFileService()
     logger.info("使用真实文件服务")
     return FileService()
+
+def _create_embedding_service():
+    """创建文本向量服务实例（测试环境固定使用本地哈希向量化）"""
+    if _use_mock_services():
+        from app.services.embedding_service import create_embedder
+        return EmbeddingService(create_embedder("hashing"))
+    return EmbeddingService()
+
+def get_ai_service():
+    """获取AI服务实例（进程内共享）"""
+    return _get_or_create("ai_service", _create_ai_service)
+
+def get_async_ai_service():
+    """获取异步AI服务实例（进程内共享）"""
+    return _get_or_create("async_ai_service", _create_async_ai_service)
+
+def get_file_service():
+    """获取文件服务实例（进程内共享）"""
+    return _get_or_create("file_service", _create_file_service)
+
+def get_embedding_service():
+    """获取文本向量服务实例（进程内共享）"""
+    return _get_or_create("embedding_service", _create_embedding_service)
+
+def get_resume_index():
+    """获取简历内存向量索引（进程内共享，首次检索时从数据库构建；按向量化后端选择索引类型）"""
+    return _get_or_create("resume_index", lambda: create_resume_index(get_embedding_service()))
+
+def get_bm25_index():
+    """获取简历BM25索引（进程内共享，首次使用时从数据库构建）"""
+    return _get_or_create("bm25_index", create_bm25_index)
+
+def get_job_index():
+    """获取招聘需求索引（进程内共享，首次使用时从数据库构建）"""
+    return _get_or_create("job_index", lambda: create_job_index(get_embedding_service()))
+
+def get_resume_indexes() -> List[Any]:
+    """获取需要随简历增删改同步更新的全部索引"""
+    return [get_resume_index(), get_bm25_index()]
+
+def init_services() -> None:
+    """应用启动时创建共享服务实例"""
+    get_ai_service()
+    get_async_ai_service()
+    get_file_service()
+    get_embedding_service()
+    get_resume_index()
+    get_bm25_index()
+    get_job_index()
+    logger.info("共享服务实例初始化完成")
+
+async def close_services() -> None:
+    """应用关闭时释放共享服务实例（关闭HTTP连接池）"""
+    with _services_lock:
+        services = list(_services.values())
+        _services.clear()
+    
+    for service in services:
+        close = getattr(service, "close", None)
+        if close is None:
+            continue
+        try:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"关闭服务实例失败: {type(service).__name__}: {str(e)}")
+    logger.info("共享服务实例已释放")
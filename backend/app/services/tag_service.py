@@ -0,0 +1,125 @@
+"""
+标签写入模块
+按集合批量解析标签：一次IN查询已有标签，一次多行插入（冲突忽略）缺失标签，一次批量写入简历-标签关联，
+不逐个标签查询和flush；并发上传同时创建同名标签时，冲突的插入被忽略而不是违反唯一约束导致失败，
+插入后以加锁读重新查询，REPEATABLE READ（MySQL默认）下也能读到其他事务已提交的标签
+"""
+import logging
+from typing import Dict, Iterable, List
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Insert, Select
+from app.models.tag import Tag, resume_tag
+
+# 获取日志记录器
+logger = logging.getLogger(__name__)
+
+# 标签名称最大长度（与Tag.name列一致）
+_MAX_NAME_LENGTH = 50
+
+
+def _normalize(names: Iterable[str]) -> List[str]:
+    """去除空白、空值和重复的标签名称（保持出现顺序）"""
+    result = {}
+    for name in names:
+        name = (name or "").strip()[:_MAX_NAME_LENGTH]
+        if name:
+            result.setdefault(name, None)
+    return list(result)
+
+
+def _insert_ignore_statement(dialect: str, table, conflict_columns: List[str]) -> Insert:
+    """
+    按方言构建忽略唯一约束冲突的插入语句
+    
+    MySQL使用ON DUPLICATE KEY UPDATE（空更新）而不是INSERT IGNORE，后者会把所有错误降级为警告
+    """
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert(table).on_conflict_do_nothing(index_elements=conflict_columns)
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        return dialect_insert(table).on_conflict_do_nothing(index_elements=conflict_columns)
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        column = conflict_columns[0]
+        return dialect_insert(table).on_duplicate_key_update({column: table.c[column]})
+    return insert(table)
+
+
+def _insert_ignore(db: Session, table, rows: List[Dict], conflict_columns: List[str]) -> None:
+    """多行插入，忽略唯一约束冲突的行"""
+    if rows:
+        db.execute(_insert_ignore_statement(db.get_bind().dialect.name, table, conflict_columns), rows)
+
+
+def _tags_query(names: List[str], locking: bool = False) -> Select:
+    """按名称查询标签；locking时为共享锁读（FOR SHARE），读取最新提交的数据而不是事务快照"""
+    query = select(Tag.id, Tag.name).where(Tag.name.in_(names))
+    return query.with_for_update(read=True) if locking else query
+
+
+def _find_tags(db: Session, names: List[str], locking: bool = False) -> Dict[str, int]:
+    """一次IN查询已有标签：名称 -> ID"""
+    rows = db.execute(_tags_query(names, locking)).all()
+    return {name: tag_id for tag_id, name in rows}
+
+
+def resolve_tags(db: Session, names: Iterable[str], category: str = "skill") -> Dict[str, int]:
+    """
+    查找或创建标签，由调用方提交事务
+    
+    Args:
+        db: 数据库会话
+        names: 标签名称
+        category: 新建标签的类别
+    
+    Returns:
+        Dict: 标签名称 -> 标签ID（名称已去除首尾空白并去重）
+    """
+    names = _normalize(names)
+    if not names:
+        return {}
+    
+    tag_ids = _find_tags(db, names)
+    missing = [name for name in names if name not in tag_ids]
+    if missing:
+        _insert_ignore(db, Tag.__table__, [{"name": name, "category": category} for name in missing], ["name"])
+        # 重新查询以取得新建（或被并发请求抢先创建）的标签ID；
+        # 第一次查询已建立事务快照，需加锁读才能看到并发请求已提交的标签
+        tag_ids.update(_find_tags(db, missing, locking=True))
+    
+    # 不区分大小写的排序规则（如MySQL默认）下，数据库返回的名称可能与请求的大小写不同
+    folded = {name.casefold(): tag_id for name, tag_id in tag_ids.items()}
+    result = {}
+    for name in names:
+        tag_id = tag_ids.get(name, folded.get(name.casefold()))
+        if tag_id is not None:
+            result[name] = tag_id
+    unresolved = [name for name in names if name not in result]
+    if unresolved:
+        logger.warning(f"标签写入后仍无法查询到，已跳过: {unresolved}")
+    return result
+
+
+def add_resume_tags(db: Session, resume_id: int, names: Iterable[str], category: str = "skill") -> List[int]:
+    """
+    为简历批量添加标签关联（已存在的关联忽略），由调用方提交事务
+    
+    Args:
+        db: 数据库会话
+        resume_id: 简历ID（简历需已flush获得ID）
+        names: 标签名称
+        category: 新建标签的类别
+    
+    Returns:
+        List[int]: 关联的标签ID
+    """
+    tag_ids = list(dict.fromkeys(resolve_tags(db, names, category).values()))
+    _insert_ignore(
+        db,
+        resume_tag,
+        [{"resume_id": resume_id, "tag_id": tag_id} for tag_id in tag_ids],
+        ["resume_id", "tag_id"]
+    )
+    return tag_ids
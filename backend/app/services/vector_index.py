@@ -0,0 +1,670 @@
+"""
+简历向量索引模块
+在内存中维护全部简历的向量矩阵，相似度检索只需一次矩阵向量乘法加argpartition，
+不再扫描数据库；简历增删改时增量更新索引
+
+- 文本向量化后端为本地哈希（EMBEDDING_BACKEND=hashing）时，使用哈希TF-IDF向量（ResumeIndex）
+- 其他后端时，使用文本向量服务持久化的简历向量（EmbeddingResumeIndex），与职位推荐共用同一份向量
+"""
+import math
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.resume import Resume
+from app.models.job_requirement import JobRequirement
+from app.services.embedding_service import (
+    JOB, EmbeddingService, HashingEmbedder, job_text, normalize_rows, resume_text, top_k
+)
+from app.services.index_watermark import TableWatermark
+
+# 获取日志记录器
+logger = logging.getLogger(__name__)
+
+# float16矩阵按块转换为float32后计算，限制临时内存
+_SCORE_CHUNK_ROWS = 65536
+
+
+def _dot(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """计算矩阵与查询向量的内积（float32结果）"""
+    if matrix.dtype == np.float32:
+        return matrix @ query
+    scores = np.empty(matrix.shape[0], dtype=np.float32)
+    for start in range(0, matrix.shape[0], _SCORE_CHUNK_ROWS):
+        chunk = matrix[start:start + _SCORE_CHUNK_ROWS].astype(np.float32)
+        np.dot(chunk, query, out=scores[start:start + _SCORE_CHUNK_ROWS])
+    return scores
+
+
+class VectorIndex:
+    """
+    连续内存的向量索引
+    
+    - 向量按行存放在预分配的矩阵中，容量不足时倍增，新增为均摊O(1)
+    - 更新直接覆盖所在行；删除只打墓碑（清零该行并记录位置），新增优先复用墓碑行
+    - 墓碑比例超过compact_ratio时整体压缩，压缩代价由之前的删除均摊
+    - 检索为一次矩阵向量乘法，墓碑行置为-inf后用argpartition取top-K
+    """
+    
+    def __init__(self, dim: int, dtype: str = "float32", initial_capacity: int = 1024,
+                 compact_ratio: float = 0.25):
+        """初始化向量索引"""
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.initial_capacity = max(1, initial_capacity)
+        self.compact_ratio = compact_ratio
+        
+        self._matrix = np.zeros((self.initial_capacity, dim), dtype=self.dtype)
+        self._ids = np.full(self.initial_capacity, -1, dtype=np.int64)
+        self._size = 0  # 已使用的行数（含墓碑）
+        self._positions: Dict[int, int] = {}
+        self._tombstones: Set[int] = set()
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        """有效向量数"""
+        return len(self._positions)
+    
+    def __contains__(self, item_id: int) -> bool:
+        """是否包含指定ID"""
+        return item_id in self._positions
+    
+    @property
+    def capacity(self) -> int:
+        """矩阵容量（行数）"""
+        return self._matrix.shape[0]
+    
+    def _allocate(self, capacity: int) -> None:
+        """重新分配矩阵并保留已使用的行"""
+        matrix = np.zeros((capacity, self.dim), dtype=self.dtype)
+        matrix[:self._size] = self._matrix[:self._size]
+        ids = np.full(capacity, -1, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        self._matrix, self._ids = matrix, ids
+    
+    def load(self, ids: Iterable[int], matrix: np.ndarray) -> None:
+        """用整批向量替换索引内容"""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        with self._lock:
+            count = len(ids)
+            self._matrix = np.zeros((max(self.initial_capacity, count), self.dim), dtype=self.dtype)
+            self._matrix[:count] = matrix
+            self._ids = np.full(self._matrix.shape[0], -1, dtype=np.int64)
+            self._ids[:count] = ids
+            self._size = count
+            self._positions = {item_id: position for position, item_id in enumerate(ids.tolist())}
+            self._tombstones.clear()
+    
+    def add(self, item_id: int, vector: np.ndarray) -> None:
+        """新增或更新向量"""
+        with self._lock:
+            position = self._positions.get(item_id)
+            if position is None:
+                if self._tombstones:
+                    position = self._tombstones.pop()
+                else:
+                    if self._size == self.capacity:
+                        self._allocate(self.capacity * 2)
+                    position = self._size
+                    self._size += 1
+                self._positions[item_id] = position
+                self._ids[position] = item_id
+            self._matrix[position] = vector
+    
+    def get(self, item_id: int) -> Optional[np.ndarray]:
+        """获取向量副本，不存在时返回None"""
+        with self._lock:
+            position = self._positions.get(item_id)
+            if position is None:
+                return None
+            return self._matrix[position].copy()
+    
+    def remove(self, item_id: int) -> bool:
+        """删除向量（打墓碑），返回是否存在"""
+        with self._lock:
+            position = self._positions.pop(item_id, None)
+            if position is None:
+                return False
+            self._matrix[position] = 0
+            self._ids[position] = -1
+            self._tombstones.add(position)
+            if len(self._tombstones) > self.compact_ratio * self._size:
+                self.compact()
+            return True
+    
+    def compact(self) -> None:
+        """压缩墓碑行，并按有效向量数收缩矩阵"""
+        with self._lock:
+            alive = self._ids[:self._size] >= 0
+            count = int(alive.sum())
+            capacity = max(self.initial_capacity, count * 2)
+            matrix = np.zeros((capacity, self.dim), dtype=self.dtype)
+            matrix[:count] = self._matrix[:self._size][alive]
+            ids = np.full(capacity, -1, dtype=np.int64)
+            ids[:count] = self._ids[:self._size][alive]
+            self._matrix, self._ids, self._size = matrix, ids, count
+            self._positions = {item_id: position for position, item_id in enumerate(ids[:count].tolist())}
+            self._tombstones.clear()
+    
+    def search(self, query: np.ndarray, k: int,
+               candidate_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """
+        按内积检索最相近的k个向量（向量已归一化时即余弦相似度）
+        
+        Args:
+            query: 查询向量
+            k: 返回数量
+            candidate_ids: 候选ID范围，为None时在全部向量中检索
+        
+        Returns:
+            List: (ID, 相似度) 列表，按相似度降序
+        """
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            if candidate_ids is not None:
+                positions = np.fromiter(
+                    (self._positions[item_id] for item_id in dict.fromkeys(candidate_ids) if item_id in self._positions),
+                    dtype=np.int64
+                )
+                ids = self._ids[positions]
+                scores = _dot(self._matrix[positions], query)
+            else:
+                ids = self._ids[:self._size]
+                scores = _dot(self._matrix[:self._size], query)
+                if self._tombstones:
+                    scores[np.fromiter(self._tombstones, dtype=np.int64, count=len(self._tombstones))] = -np.inf
+            # 只取有效向量数以内的结果，保证墓碑行不会入选
+            positions = top_k(scores, min(k, len(self._positions)))
+            return [(int(ids[position]), float(scores[position])) for position in positions]
+
+
+def _nearest_centroids(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """按内积为每行分配最近的聚类中心（分块计算，限制临时内存）"""
+    assignments = np.empty(data.shape[0], dtype=np.int64)
+    for start in range(0, data.shape[0], _SCORE_CHUNK_ROWS):
+        chunk = data[start:start + _SCORE_CHUNK_ROWS].astype(np.float32, copy=False)
+        assignments[start:start + _SCORE_CHUNK_ROWS] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+def kmeans(data: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """
+    球面k-means（按内积聚类）
+    
+    Args:
+        data: 按行归一化的样本矩阵
+        n_clusters: 聚类数
+        iterations: 迭代次数
+        seed: 随机种子
+    
+    Returns:
+        np.ndarray: 按行归一化的聚类中心（float32）
+    """
+    rng = np.random.default_rng(seed)
+    data = np.asarray(data, dtype=np.float32)
+    n_clusters = min(n_clusters, data.shape[0])
+    centroids = data[rng.choice(data.shape[0], n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = _nearest_centroids(data, centroids)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        sums = np.empty_like(centroids)
+        for column in range(data.shape[1]):
+            sums[:, column] = np.bincount(assignments, weights=data[:, column], minlength=n_clusters)
+        # 空聚类用随机样本重新初始化
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = data[rng.choice(data.shape[0], len(empty), replace=False)]
+        centroids = normalize_rows(sums).astype(np.float32)
+    return centroids
+
+
+class IVFIndex:
+    """
+    IVF-flat近似最近邻索引
+    
+    - 训练：对（抽样的）全部向量做球面k-means，得到nlist个聚类中心作为粗量化器
+    - 每个倒排列表是一个VectorIndex，向量归入最相近中心的列表，增删改沿用其墓碑与压缩机制
+    - 检索：只在与查询最相近的nprobe个列表内精确计算；exact=True时扫描全部列表，用于验证召回率
+    - 聚类中心只在load时训练，增量写入不会移动中心，数据分布明显变化后应重建
+    - 向量数不足以训练时退化为单列表（即精确检索）
+    """
+    
+    # 每个列表至少需要的训练样本数
+    MIN_POINTS_PER_LIST = 32
+    
+    def __init__(self, dim: int, dtype: str = "float32", nlist: int = 0, nprobe: int = 8,
+                 kmeans_iterations: int = 10, train_sample: int = 100000, compact_ratio: float = 0.25):
+        """
+        初始化IVF索引
+        
+        Args:
+            dim: 向量维度
+            dtype: 存储类型（float32/float16）
+            nlist: 倒排列表数，0表示按sqrt(N)自动选择
+            nprobe: 检索时扫描的列表数，越大召回率越高、延迟越大
+            kmeans_iterations: k-means迭代次数
+            train_sample: 训练k-means使用的最大样本数
+            compact_ratio: 各列表的墓碑压缩阈值
+        """
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.kmeans_iterations = kmeans_iterations
+        self.train_sample = train_sample
+        self.compact_ratio = compact_ratio
+        
+        self._centroids = np.zeros((1, dim), dtype=np.float32)
+        self._lists = [self._new_list()]
+        self._assignments: Dict[int, int] = {}
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        """有效向量数"""
+        return len(self._assignments)
+    
+    def __contains__(self, item_id: int) -> bool:
+        """是否包含指定ID"""
+        return item_id in self._assignments
+    
+    @property
+    def n_lists(self) -> int:
+        """当前倒排列表数"""
+        return len(self._lists)
+    
+    def _new_list(self) -> VectorIndex:
+        """创建倒排列表"""
+        return VectorIndex(self.dim, self.dtype.name, initial_capacity=16, compact_ratio=self.compact_ratio)
+    
+    def _assign(self, vector: np.ndarray) -> int:
+        """返回向量所属的列表"""
+        if len(self._lists) == 1:
+            return 0
+        return int(np.argmax(self._centroids @ np.asarray(vector, dtype=np.float32)))
+    
+    def load(self, ids: Iterable[int], matrix: np.ndarray) -> None:
+        """用整批向量替换索引内容，并重新训练聚类中心"""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        count = len(ids)
+        nlist = self.nlist or int(math.sqrt(count))
+        nlist = min(nlist, count // self.MIN_POINTS_PER_LIST)
+        
+        if nlist > 1:
+            rng = np.random.default_rng(0)
+            sample = matrix if count <= self.train_sample else matrix[rng.choice(count, self.train_sample, replace=False)]
+            centroids = kmeans(sample, nlist, self.kmeans_iterations)
+            assignments = _nearest_centroids(matrix, centroids)
+        else:
+            centroids = np.zeros((1, self.dim), dtype=np.float32)
+            assignments = np.zeros(count, dtype=np.int64)
+        
+        # 按列表分组后整批写入
+        order = np.argsort(assignments, kind="stable")
+        boundaries = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+        lists = []
+        for list_no in range(len(centroids)):
+            selected = order[boundaries[list_no]:boundaries[list_no + 1]]
+            vector_list = self._new_list()
+            vector_list.load(ids[selected], matrix[selected])
+            lists.append(vector_list)
+        
+        with self._lock:
+            self._centroids = centroids
+            self._lists = lists
+            self._assignments = dict(zip(ids.tolist(), assignments.tolist()))
+        logger.info(f"IVF索引训练完成: 数量={count}, 列表数={len(lists)}")
+    
+    def add(self, item_id: int, vector: np.ndarray) -> None:
+        """新增或更新向量（向量变化导致所属列表变化时迁移）"""
+        with self._lock:
+            list_no = self._assign(vector)
+            previous = self._assignments.get(item_id)
+            if previous is not None and previous != list_no:
+                self._lists[previous].remove(item_id)
+            self._lists[list_no].add(item_id, vector)
+            self._assignments[item_id] = list_no
+    
+    def get(self, item_id: int) -> Optional[np.ndarray]:
+        """获取向量副本，不存在时返回None"""
+        with self._lock:
+            list_no = self._assignments.get(item_id)
+            if list_no is None:
+                return None
+            return self._lists[list_no].get(item_id)
+    
+    def remove(self, item_id: int) -> bool:
+        """删除向量，返回是否存在"""
+        with self._lock:
+            list_no = self._assignments.pop(item_id, None)
+            if list_no is None:
+                return False
+            return self._lists[list_no].remove(item_id)
+    
+    def compact(self) -> None:
+        """压缩全部列表"""
+        with self._lock:
+            for vector_list in self._lists:
+                vector_list.compact()
+    
+    def search(self, query: np.ndarray, k: int, candidate_ids: Optional[Iterable[int]] = None,
+               nprobe: Optional[int] = None, exact: bool = False) -> List[Tuple[int, float]]:
+        """
+        检索最相近的k个向量
+        
+        Args:
+            query: 查询向量
+            k: 返回数量
+            candidate_ids: 候选ID范围，指定时在其所属列表内精确检索
+            nprobe: 本次检索扫描的列表数，默认使用初始化时的配置
+            exact: 是否扫描全部列表（精确检索）
+        
+        Returns:
+            List: (ID, 相似度) 列表，按相似度降序
+        """
+        query = np.asarray(query, dtype=np.float32)
+        results: List[Tuple[int, float]] = []
+        with self._lock:
+            if candidate_ids is not None:
+                groups: Dict[int, List[int]] = {}
+                for item_id in dict.fromkeys(candidate_ids):
+                    list_no = self._assignments.get(item_id)
+                    if list_no is not None:
+                        groups.setdefault(list_no, []).append(item_id)
+                for list_no, item_ids in groups.items():
+                    results.extend(self._lists[list_no].search(query, k, item_ids))
+            else:
+                nprobe = nprobe or self.nprobe
+                if exact or nprobe >= len(self._lists):
+                    probes = range(len(self._lists))
+                else:
+                    probes = top_k(self._centroids @ query, nprobe).tolist()
+                for list_no in probes:
+                    results.extend(self._lists[list_no].search(query, k))
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results[:k]
+
+
+def create_vector_index(dim: int, dtype: str = "float32", compact_ratio: float = 0.25) -> Any:
+    """按配置创建向量索引（flat: 精确检索；ivf: IVF-flat近似检索；mmap: 多进程共享的内存映射存储）"""
+    if settings.VECTOR_INDEX_TYPE == "mmap":
+        from app.services.vector_store import MmapVectorStore
+        return MmapVectorStore(
+            settings.VECTOR_STORE_PATH,
+            dim,
+            settings.VECTOR_STORE_DTYPE,
+            compact_ratio=compact_ratio
+        )
+    if settings.VECTOR_INDEX_TYPE == "ivf":
+        return IVFIndex(
+            dim,
+            dtype,
+            nlist=settings.VECTOR_INDEX_NLIST,
+            nprobe=settings.VECTOR_INDEX_NPROBE,
+            kmeans_iterations=settings.VECTOR_INDEX_KMEANS_ITERATIONS,
+            train_sample=settings.VECTOR_INDEX_TRAIN_SAMPLE,
+            compact_ratio=compact_ratio
+        )
+    if settings.VECTOR_INDEX_TYPE != "flat":
+        logger.warning(f"未知的向量索引类型: {settings.VECTOR_INDEX_TYPE}，使用精确检索")
+    return VectorIndex(dim, dtype, compact_ratio=compact_ratio)
+
+
+class ResumeIndex:
+    """
+    简历哈希TF-IDF向量索引
+    
+    - 词项经特征哈希映射到dim维，权重为 (1 + log tf) * idf，按行L2归一化
+    - 文档频率随增删改增量维护；已入索引的向量保留写入时的idf，重建索引时统一刷新
+    - 首次检索时从数据库构建，构建前的增量写入直接忽略（构建会读到最新数据）
+    - 检索前按数据水位同步其他进程的写入（多worker部署）
+    - 底层可以是精确检索的VectorIndex，也可以是近似检索的IVFIndex
+    """
+    
+    def __init__(self, dim: int, dtype: str = "float32", compact_ratio: float = 0.25, index: Any = None,
+                 sync_interval: float = 5.0):
+        """初始化简历索引"""
+        self.hasher = HashingEmbedder(dim)
+        self.index = index if index is not None else VectorIndex(dim, dtype, compact_ratio=compact_ratio)
+        self.watermark = TableWatermark(Resume, sync_interval)
+        self._df = np.zeros(dim, dtype=np.int64)
+        self._built = False
+        self._lock = threading.RLock()
+    
+    @property
+    def built(self) -> bool:
+        """索引是否已构建"""
+        return self._built
+    
+    def __len__(self) -> int:
+        """已索引的简历数"""
+        return len(self.index)
+    
+    def _term_vector(self, text: str) -> np.ndarray:
+        """计算哈希词频向量（1 + log tf，带符号）"""
+        return self.hasher.term_vector(text)
+    
+    def _idf(self, count: int) -> np.ndarray:
+        """平滑idf：log((1 + N) / (1 + df)) + 1"""
+        return (np.log((1.0 + count) / (1.0 + self._df)) + 1.0).astype(np.float32)
+    
+    def _weight(self, vectors: np.ndarray, count: Optional[int] = None) -> np.ndarray:
+        """乘以idf并按行L2归一化（原地修改）"""
+        vectors *= self._idf(len(self.index) if count is None else count)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors /= norms
+        return vectors
+    
+    def _term_vectors(self, rows: List[Any]) -> np.ndarray:
+        """批量计算哈希词频向量"""
+        return self.hasher.term_vectors(resume_text(row) for row in rows)
+    
+    def build(self, db: Session) -> None:
+        """从数据库构建索引（持久化存储中已有数据时只同步差异）"""
+        with self._lock:
+            self.watermark.reset(db)
+            if getattr(self.index, "persistent", False) and len(self.index):
+                self._sync(db)
+            else:
+                rows = db.query(Resume.id, Resume.ocr_content, Resume.talent_portrait).all()
+                vectors = self._term_vectors(rows)
+                self._df = np.count_nonzero(vectors, axis=0).astype(np.int64)
+                self.index.load([row.id for row in rows], self._weight(vectors, len(rows)))
+            self._built = True
+            logger.info(f"简历向量索引构建完成: 数量={len(self.index)}, 维度={self.hasher.dim}, 类型={type(self.index).__name__}/{self.index.dtype}")
+    
+    def _sync(self, db: Session) -> None:
+        """与数据库对齐持久化存储：删除已不存在的简历，补齐缺失的简历，并从存储恢复文档频率"""
+        stored = set(self.index.ids().tolist())
+        current = {resume_id for (resume_id,) in db.query(Resume.id)}
+        for resume_id in stored - current:
+            self.index.remove(resume_id)
+        self._df = self.index.nonzero_counts()
+        
+        missing = sorted(current - stored)
+        if missing:
+            rows = db.query(Resume.id, Resume.ocr_content, Resume.talent_portrait).filter(Resume.id.in_(missing)).all()
+            vectors = self._term_vectors(rows)
+            self._df += np.count_nonzero(vectors, axis=0)
+            self.index.add_many([row.id for row in rows], self._weight(vectors, len(current)))
+        logger.info(f"简历向量存储同步完成: 删除={len(stored - current)}, 补齐={len(missing)}")
+    
+    def ensure_built(self, db: Session) -> None:
+        """索引未构建时从数据库构建，已构建时同步其他进程的写入"""
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self.build(db)
+                    return
+        self._sync_writes(db)
+    
+    def _sync_writes(self, db: Session) -> None:
+        """数据水位变化时重新计算上次水位以来更新过的简历向量，行数与索引不一致时全量重建"""
+        changed = self.watermark.poll(db)
+        if changed is None:
+            return
+        resume_ids, count = changed
+        with self._lock:
+            rows = db.query(Resume.id, Resume.ocr_content, Resume.talent_portrait).filter(Resume.id.in_(resume_ids)).all()
+            for row in rows:
+                self.upsert_resume(row)
+            if getattr(self.index, "persistent", False):
+                # 共享存储中的向量可能已由其他进程写入，文档频率从存储重新统计
+                self._df = self.index.nonzero_counts()
+            if len(self.index) != count:
+                self.build(db)
+    
+    def upsert_resume(self, resume: Resume) -> None:
+        """新增或更新简历向量"""
+        with self._lock:
+            if not self._built:
+                return
+            previous = self.index.get(resume.id)
+            if previous is not None:
+                self._df -= previous != 0
+            vector = self._term_vector(resume_text(resume))
+            self._df += vector != 0
+            self.index.add(resume.id, self._weight(vector))
+    
+    def remove_resume(self, resume_id: int) -> None:
+        """删除简历向量"""
+        with self._lock:
+            previous = self.index.get(resume_id)
+            if previous is None:
+                return
+            self._df -= previous != 0
+            self.index.remove(resume_id)
+    
+    def search(self, text: str, k: int, candidate_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """按文本检索最相近的k份简历"""
+        with self._lock:
+            query = self._weight(self._term_vector(text))
+        return self.index.search(query, k, candidate_ids)
+    
+    def search_job(self, db: Session, job: JobRequirement, k: int,
+                   candidate_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """检索与招聘需求最相近的k份简历（索引未构建时先构建）"""
+        self.ensure_built(db)
+        return self.search(job_text(job), k, candidate_ids)
+
+
+class EmbeddingResumeIndex:
+    """
+    简历文本向量索引（向量化后端不是本地哈希时使用）
+    
+    - 向量读取文本向量服务持久化的简历向量，检索时以招聘需求向量做一次矩阵向量乘法（余弦相似度）
+    - 首次检索时从数据库构建；简历增删改时只标记过期，下次检索前重新读取这些简历的向量
+    - 读取只在内存中补齐缺失的向量，不写入数据库（由简历写入路径持久化）
+    - 检索前按数据水位把其他进程更新过的简历标记过期（多worker部署）
+    - 加载只持有加载锁，不阻塞写入路径的过期标记
+    """
+    
+    def __init__(self, embedding_service: EmbeddingService, index: Any, sync_interval: float = 5.0):
+        """初始化简历文本向量索引"""
+        self.embedding_service = embedding_service
+        self.index = index
+        self.watermark = TableWatermark(Resume, sync_interval)
+        self._stale: Set[int] = set()
+        self._built = False
+        self._lock = threading.RLock()
+        self._load_lock = threading.RLock()
+    
+    @property
+    def built(self) -> bool:
+        """索引是否已构建"""
+        return self._built
+    
+    def __len__(self) -> int:
+        """已索引的简历数"""
+        return len(self.index)
+    
+    def build(self, db: Session) -> None:
+        """从数据库构建索引（持久化存储中已有数据时只同步差异；读取期间写入的简历保持过期标记）"""
+        with self._load_lock:
+            with self._lock:
+                self._stale = set()
+            self.watermark.reset(db)
+            if getattr(self.index, "persistent", False) and len(self.index):
+                stored = set(self.index.ids().tolist())
+                current = {resume_id for (resume_id,) in db.query(Resume.id)}
+                ids, matrix = self.embedding_service.load_resume_vectors(db, sorted(current - stored))
+                with self._lock:
+                    for resume_id in stored - current:
+                        self.index.remove(resume_id)
+                    if len(ids):
+                        self.index.add_many(ids.tolist(), matrix)
+            else:
+                ids, matrix = self.embedding_service.load_resume_vectors(db)
+                with self._lock:
+                    self.index.load(ids.tolist(), matrix)
+            self._built = True
+            logger.info(f"简历文本向量索引构建完成: 数量={len(self.index)}, 向量模型={self.embedding_service.model}, 类型={type(self.index).__name__}")
+    
+    def ensure_built(self, db: Session) -> None:
+        """索引未构建时从数据库构建；有过期的简历（含其他进程的写入）时重新读取其向量，行数不一致时全量重建"""
+        with self._load_lock:
+            if not self._built:
+                self.build(db)
+                return
+            changed = self.watermark.poll(db)
+            with self._lock:
+                if changed is not None:
+                    self._stale.update(changed[0])
+                stale, self._stale = sorted(self._stale), set()
+            if stale:
+                try:
+                    ids, matrix = self.embedding_service.load_resume_vectors(db, stale)
+                except Exception:
+                    with self._lock:
+                        self._stale.update(stale)
+                    raise
+                with self._lock:
+                    for resume_id, vector in zip(ids.tolist(), matrix):
+                        self.index.add(resume_id, vector)
+                    for resume_id in set(stale) - set(ids.tolist()):
+                        self.index.remove(resume_id)
+            if changed is not None and len(self.index) != changed[1]:
+                self.build(db)
+    
+    def upsert_resume(self, resume: Resume) -> None:
+        """简历新增或更新后标记过期（向量已由写入路径持久化，下次检索前读取）"""
+        with self._lock:
+            self._stale.add(resume.id)
+    
+    def remove_resume(self, resume_id: int) -> None:
+        """删除简历向量（同时标记过期：进行中的加载可能已读到该简历，重新读取时确认删除）"""
+        with self._lock:
+            self.index.remove(resume_id)
+            self._stale.add(resume_id)
+    
+    def search_job(self, db: Session, job: JobRequirement, k: int,
+                   candidate_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """检索与招聘需求最相近的k份简历（索引未构建时先构建；职位向量只读）"""
+        self.ensure_built(db)
+        query = self.embedding_service.vector(db, JOB, job.id, job_text(job))
+        return self.index.search(query, k, candidate_ids)
+
+
+def create_resume_index(embedding_service: Optional[EmbeddingService] = None) -> Any:
+    """按配置创建简历索引：本地哈希向量化后端使用哈希TF-IDF索引，其他后端使用持久化的文本向量"""
+    if embedding_service is not None and not isinstance(embedding_service.embedder, HashingEmbedder):
+        return EmbeddingResumeIndex(
+            embedding_service,
+            create_vector_index(
+                embedding_service.embedder.dim,
+                settings.VECTOR_INDEX_DTYPE,
+                settings.VECTOR_INDEX_COMPACT_RATIO
+            ),
+            sync_interval=settings.INDEX_SYNC_INTERVAL
+        )
+    return ResumeIndex(
+        dim=settings.VECTOR_INDEX_DIM,
+        index=create_vector_index(
+            settings.VECTOR_INDEX_DIM,
+            settings.VECTOR_INDEX_DTYPE,
+            settings.VECTOR_INDEX_COMPACT_RATIO
+        ),
+        sync_interval=settings.INDEX_SYNC_INTERVAL
+    )
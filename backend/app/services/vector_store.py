@@ -0,0 +1,357 @@
+"""
+内存映射向量存储模块
+简历向量持久化在单个文件中，各uvicorn worker通过numpy.memmap打开，共享同一份页缓存；
+写入只追加（更新为追加新行并给旧行打墓碑），墓碑过多或容量用尽时由写入方重写文件完成压缩
+
+文件格式:
+    header   64字节: magic, 版本, 存储类型, 维度, 容量, 已写行数, 有效行数
+    ids      int64[capacity]，墓碑行为-1
+    scales   float32[capacity]，int8量化的逐行缩放系数（float16存储时为1）
+    matrix   float16/int8[capacity, dim]
+"""
+import os
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from app.services.embedding_service import top_k
+
+try:
+    import fcntl
+except ImportError:  # Windows下退化为仅进程内加锁
+    fcntl = None
+
+# 获取日志记录器
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"HRVS"
+_VERSION = 1
+_HEADER_SIZE = 64
+_HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    ("dtype", "<u2"),
+    ("dim", "<u4"),
+    ("capacity", "<u8"),
+    ("count", "<u8"),
+    ("live", "<u8"),
+])
+_DTYPE_CODES = {"float16": 1, "int8": 2}
+_CODE_DTYPES = {code: name for name, code in _DTYPE_CODES.items()}
+
+# 按块反量化后计算内积，限制临时内存
+_SCORE_CHUNK_ROWS = 65536
+
+
+def _align(offset: int, alignment: int = 64) -> int:
+    """向上对齐偏移量"""
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def _layout(capacity: int, dim: int, dtype: np.dtype) -> Tuple[int, int, int, int]:
+    """计算各段偏移量，返回 (ids偏移, scales偏移, matrix偏移, 文件大小)"""
+    ids_offset = _HEADER_SIZE
+    scales_offset = _align(ids_offset + 8 * capacity)
+    matrix_offset = _align(scales_offset + 4 * capacity)
+    size = matrix_offset + capacity * dim * dtype.itemsize
+    return ids_offset, scales_offset, matrix_offset, size
+
+
+def quantize(vectors: np.ndarray, dtype: np.dtype) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    按存储类型编码向量
+    
+    Returns:
+        Tuple: (编码后的矩阵, 逐行缩放系数)
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if dtype == np.int8:
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        encoded = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return encoded, scales.astype(np.float32)
+    return vectors.astype(dtype), np.ones(vectors.shape[0], dtype=np.float32)
+
+
+class MmapVectorStore:
+    """
+    内存映射的向量存储
+    
+    - 读取：每次操作前检查文件是否被压缩替换（inode变化），必要时重新映射；
+      已写行数从header读取，其他worker追加的行立即可见
+    - 写入：通过文件锁保证同一时刻只有一个写入方；先写向量和ID，最后更新header中的行数；
+      文件可随时由数据库重建，写入后不强制同步刷盘
+    - 检索接口与VectorIndex一致，可作为ResumeIndex的底层索引
+    """
+    
+    persistent = True
+    
+    def __init__(self, path: str, dim: int, dtype: str = "float16", initial_capacity: int = 1024,
+                 compact_ratio: float = 0.25):
+        """
+        初始化向量存储（文件不存在时创建）
+        
+        Args:
+            path: 存储文件路径
+            dim: 向量维度
+            dtype: 存储类型（float16/int8）
+            initial_capacity: 初始容量（行数）
+            compact_ratio: 墓碑占比超过该值时压缩
+        """
+        if dtype not in _DTYPE_CODES:
+            raise ValueError(f"不支持的向量存储类型: {dtype}")
+        self.path = path
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.initial_capacity = max(1, initial_capacity)
+        self.compact_ratio = compact_ratio
+        
+        self._inode: Optional[int] = None
+        self._header = None
+        self._ids = None
+        self._scales = None
+        self._matrix = None
+        self._lock = threading.RLock()
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._write_lock():
+            if not os.path.exists(path):
+                self._create(path, self.initial_capacity, np.empty(0, dtype=np.int64),
+                             np.empty((0, dim), dtype=self.dtype), np.empty(0, dtype=np.float32))
+            self._refresh()
+    
+    def _create(self, path: str, capacity: int, ids: np.ndarray, matrix: np.ndarray, scales: np.ndarray) -> None:
+        """写出完整的存储文件"""
+        ids_offset, scales_offset, matrix_offset, size = _layout(capacity, self.dim, self.dtype)
+        with open(path, "wb") as f:
+            f.truncate(size)
+        count = len(ids)
+        header = np.memmap(path, dtype=_HEADER_DTYPE, mode="r+", shape=(1,))
+        header[0] = (_MAGIC, _VERSION, _DTYPE_CODES[self.dtype.name], self.dim, capacity, count, count)
+        file_ids = np.memmap(path, dtype=np.int64, mode="r+", offset=ids_offset, shape=(capacity,))
+        file_ids[:count] = ids
+        file_scales = np.memmap(path, dtype=np.float32, mode="r+", offset=scales_offset, shape=(capacity,))
+        file_scales[:count] = scales
+        if count:
+            file_matrix = np.memmap(path, dtype=self.dtype, mode="r+", offset=matrix_offset, shape=(capacity, self.dim))
+            file_matrix[:count] = matrix
+            file_matrix.flush()
+        file_ids.flush()
+        file_scales.flush()
+        header.flush()
+    
+    def _refresh(self) -> None:
+        """文件被替换（压缩）后重新映射"""
+        inode = os.stat(self.path).st_ino
+        if inode == self._inode:
+            return
+        header = np.memmap(self.path, dtype=_HEADER_DTYPE, mode="r+", shape=(1,))
+        if header[0]["magic"] != _MAGIC or header[0]["version"] != _VERSION:
+            raise ValueError(f"向量存储文件格式不正确: {self.path}")
+        if header[0]["dim"] != self.dim or _CODE_DTYPES.get(int(header[0]["dtype"])) != self.dtype.name:
+            raise ValueError(
+                f"向量存储文件参数不一致: {self.path}, 维度={int(header[0]['dim'])}, "
+                f"类型={_CODE_DTYPES.get(int(header[0]['dtype']))}"
+            )
+        capacity = int(header[0]["capacity"])
+        ids_offset, scales_offset, matrix_offset, _ = _layout(capacity, self.dim, self.dtype)
+        self._header = header
+        self._ids = np.memmap(self.path, dtype=np.int64, mode="r+", offset=ids_offset, shape=(capacity,))
+        self._scales = np.memmap(self.path, dtype=np.float32, mode="r+", offset=scales_offset, shape=(capacity,))
+        self._matrix = np.memmap(self.path, dtype=self.dtype, mode="r+", offset=matrix_offset,
+                                 shape=(capacity, self.dim))
+        self._inode = inode
+    
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """写锁：进程内互斥 + 跨进程文件锁"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.path + ".lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    @property
+    def _count(self) -> int:
+        """已写行数（含墓碑）"""
+        return int(self._header["count"][0])
+    
+    @property
+    def capacity(self) -> int:
+        """文件容量（行数）"""
+        return int(self._header["capacity"][0])
+    
+    def _find(self, item_id: int) -> np.ndarray:
+        """查找ID所在的行（顺序扫描ID段，只在写入和单条读取时使用）"""
+        return np.flatnonzero(self._ids[:self._count] == item_id)
+    
+    def __len__(self) -> int:
+        """有效向量数"""
+        with self._lock:
+            self._refresh()
+            return int(self._header["live"][0])
+    
+    def __contains__(self, item_id: int) -> bool:
+        """是否包含指定ID"""
+        with self._lock:
+            self._refresh()
+            return bool(len(self._find(item_id)))
+    
+    def ids(self) -> np.ndarray:
+        """全部有效ID"""
+        with self._lock:
+            self._refresh()
+            ids = np.array(self._ids[:self._count])
+            return ids[ids >= 0]
+    
+    def get(self, item_id: int) -> Optional[np.ndarray]:
+        """获取（反量化后的）向量，不存在时返回None"""
+        with self._lock:
+            self._refresh()
+            positions = self._find(item_id)
+            if not len(positions):
+                return None
+            position = positions[-1]
+            return self._matrix[position].astype(np.float32) * self._scales[position]
+    
+    def nonzero_counts(self) -> np.ndarray:
+        """统计有效向量每一维的非零个数（用于恢复文档频率）"""
+        with self._lock:
+            self._refresh()
+            count = self._count
+            counts = np.zeros(self.dim, dtype=np.int64)
+            for start in range(0, count, _SCORE_CHUNK_ROWS):
+                alive = self._ids[start:min(count, start + _SCORE_CHUNK_ROWS)] >= 0
+                counts += np.count_nonzero(self._matrix[start:start + len(alive)][alive], axis=0)
+            return counts
+    
+    def _scores(self, positions: Optional[np.ndarray], query: np.ndarray, count: int) -> np.ndarray:
+        """反量化并计算内积（float32结果）"""
+        if positions is not None:
+            return (self._matrix[positions].astype(np.float32) @ query) * self._scales[positions]
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, _SCORE_CHUNK_ROWS):
+            end = min(count, start + _SCORE_CHUNK_ROWS)
+            np.dot(self._matrix[start:end].astype(np.float32), query, out=scores[start:end])
+        if self.dtype == np.int8:
+            scores *= self._scales[:count]
+        return scores
+    
+    def search(self, query: np.ndarray, k: int,
+               candidate_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """
+        按内积检索最相近的k个向量
+        
+        Args:
+            query: 查询向量
+            k: 返回数量
+            candidate_ids: 候选ID范围，为None时在全部向量中检索
+        
+        Returns:
+            List: (ID, 相似度) 列表，按相似度降序
+        """
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            self._refresh()
+            count = self._count
+            ids = np.array(self._ids[:count])
+            if candidate_ids is not None:
+                positions = np.flatnonzero(np.isin(ids, np.fromiter(candidate_ids, dtype=np.int64)))
+                ids = ids[positions]
+                scores = self._scores(positions, query, count)
+            else:
+                scores = self._scores(None, query, count)
+                scores[ids < 0] = -np.inf
+            positions = top_k(scores, min(k, int(np.count_nonzero(ids >= 0))))
+            results = [(int(ids[position]), float(scores[position])) for position in positions]
+        # 其他进程更新过程中（新行已追加、旧行尚未打墓碑）可能读到重复ID
+        seen = set()
+        unique = []
+        for item_id, score in results:
+            if item_id not in seen:
+                seen.add(item_id)
+                unique.append((item_id, score))
+        return unique
+    
+    def load(self, ids: Iterable[int], matrix: np.ndarray) -> None:
+        """用整批向量重写存储文件"""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        encoded, scales = quantize(matrix, self.dtype) if len(ids) else (
+            np.empty((0, self.dim), dtype=self.dtype), np.empty(0, dtype=np.float32)
+        )
+        with self._write_lock():
+            self._rewrite(ids, encoded, scales)
+    
+    def _rewrite(self, ids: np.ndarray, encoded: np.ndarray, scales: np.ndarray, reserve: int = 0) -> None:
+        """写出新文件后原子替换，容量为 (有效行数 + reserve) * 2（调用方需持有写锁）"""
+        capacity = max(self.initial_capacity, (len(ids) + reserve) * 2)
+        temp_path = self.path + ".compact"
+        self._create(temp_path, capacity, ids, encoded, scales)
+        os.replace(temp_path, self.path)
+        self._refresh()
+    
+    def compact(self) -> None:
+        """去除墓碑行并按有效向量数重新分配容量"""
+        with self._write_lock():
+            self._refresh()
+            self._compact()
+    
+    def _compact(self, reserve: int = 0) -> None:
+        """压缩并预留reserve行容量（调用方需持有写锁）"""
+        count = self._count
+        alive = np.flatnonzero(self._ids[:count] >= 0)
+        self._rewrite(np.array(self._ids[alive]), np.array(self._matrix[alive]), np.array(self._scales[alive]), reserve)
+        logger.info(f"向量存储压缩完成: 有效数量={len(alive)}, 容量={self.capacity}")
+    
+    def add(self, item_id: int, vector: np.ndarray) -> None:
+        """新增或更新向量"""
+        self.add_many([item_id], np.atleast_2d(vector))
+    
+    def add_many(self, ids: Iterable[int], matrix: np.ndarray) -> None:
+        """批量追加向量，已存在的ID在追加后给旧行打墓碑"""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if not len(ids):
+            return
+        encoded, scales = quantize(matrix, self.dtype)
+        with self._write_lock():
+            self._refresh()
+            count = self._count
+            if count + len(ids) > self.capacity:
+                # 容量不足：压缩并扩容后继续追加
+                self._compact(reserve=len(ids))
+                count = self._count
+            previous = np.flatnonzero(np.isin(self._ids[:count], ids))
+            
+            end = count + len(ids)
+            self._matrix[count:end] = encoded
+            self._scales[count:end] = scales
+            self._ids[count:end] = ids
+            self._header["count"][0] = end
+            self._ids[previous] = -1
+            self._header["live"][0] = int(self._header["live"][0]) + len(ids) - len(previous)
+            self._maybe_compact()
+    
+    def remove(self, item_id: int) -> bool:
+        """删除向量（打墓碑），返回是否存在"""
+        with self._write_lock():
+            self._refresh()
+            positions = self._find(item_id)
+            if not len(positions):
+                return False
+            self._ids[positions] = -1
+            self._header["live"][0] = int(self._header["live"][0]) - len(positions)
+            self._maybe_compact()
+            return True
+    
+    def _maybe_compact(self) -> None:
+        """墓碑过多时压缩"""
+        count = self._count
+        if count and (count - int(self._header["live"][0])) > self.compact_ratio * count:
+            self._compact()
@@ -3,6 +3,7 @@
 提供数据库操作相关的工具函数
 """
 import logging
+from typing import Any, Callable, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -31,3 +32,28 @@ def safe_commit(db: Session, error_msg: str = "数据库提交失败") -> bool:
         db.rollback()
         logger.error(f"{error_msg}: {str(e)}")
         return False
+
+def save_and_refresh(db: Session, instance, error_msg: str = "数据库提交失败",
+                     before_commit: Optional[Callable[[Any], None]] = None) -> bool:
+    """
+    添加对象、提交事务并刷新对象
+    
+    供async端点通过run_in_threadpool调用，使阻塞的数据库操作不在事件循环中执行
+    
+    Args:
+        db: 数据库会话
+        instance: ORM对象
+        error_msg: 错误消息
+        before_commit: 提交前回调（对象已flush获得ID），用于在同一事务中写入派生数据
+        
+    Returns:
+        bool: 保存是否成功
+    """
+    db.add(instance)
+    if before_commit is not None:
+        db.flush()
+        before_commit(instance)
+    if not safe_commit(db, error_msg):
+        return False
+    db.refresh(instance)
+    return True
@@ -0,0 +1,119 @@
+"""
+分页工具模块
+键集（keyset）分页：游标是上一页最后一条记录排序键的不透明编码，翻页时按排序键定位，
+配合排序键上的索引，任意深度的翻页耗时都相同，并发插入也不会使后续页错位；
+排序键必须是NOT NULL列（NULL无法参与键集比较）；
+列表端点保留skip/limit偏移分页作为兼容方式
+"""
+import json
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+# 列表端点返回下一页游标的响应头
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(keys: Dict[str, Any]) -> str:
+    """
+    编码游标
+    
+    Args:
+        keys: 当前页最后一条记录的排序键
+    
+    Returns:
+        str: URL安全的游标字符串
+    """
+    payload = json.dumps(keys, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    解码游标
+    
+    Args:
+        cursor: encode_cursor生成的游标
+    
+    Returns:
+        Dict: 排序键
+    
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        keys = json.loads(payload.decode("utf-8"))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+    if not isinstance(keys, dict):
+        raise ValueError(f"无效的分页游标: {cursor}")
+    return keys
+
+
+def _cursor_values(cursor: str, keys: Sequence[Tuple[Any, bool]]) -> List[Any]:
+    """解码游标中的排序键值（按列类型还原）"""
+    values = decode_cursor(cursor).get("keys")
+    if not isinstance(values, list) or len(values) != len(keys) or None in values:
+        raise ValueError(f"无效的分页游标: {cursor}")
+    try:
+        return [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else value
+            for (column, _), value in zip(keys, values)
+        ]
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
+
+def _after(keys: Sequence[Tuple[Any, bool]], values: Sequence[Any]) -> Any:
+    """排序在游标之后的条件：(k1, k2, ...) 按各自方向逐列比较"""
+    clauses = []
+    for position, (column, descending) in enumerate(keys):
+        equal = [key == value for (key, _), value in zip(keys[:position], values)]
+        beyond = column < values[position] if descending else column > values[position]
+        clauses.append(and_(*equal, beyond))
+    return or_(*clauses)
+
+
+def _page_query(query: Query, keys: Sequence[Tuple[Any, bool]], limit: int,
+                cursor: Optional[str] = None, skip: int = 0) -> Query:
+    """构建一页的查询（多取一条用于判断是否还有下一页），排序键作为附加列查询"""
+    if cursor:
+        query = query.filter(_after(keys, _cursor_values(cursor, keys)))
+    # 排序键作为附加列查询，摘要视图未加载这些列时也不会逐条懒加载
+    query = query.add_columns(*(column for column, _ in keys)).order_by(
+        *(column.desc() if descending else column.asc() for column, descending in keys)
+    )
+    if skip and not cursor:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def paginate(query: Query, keys: Sequence[Tuple[Any, bool]], limit: int,
+             cursor: Optional[str] = None, skip: int = 0) -> Tuple[List[Any], Optional[str]]:
+    """
+    按排序键分页查询
+    
+    Args:
+        query: 已应用过滤条件的查询（不含排序和分页）
+        keys: 排序键 (列, 是否降序)，均为NOT NULL列，最后一列必须唯一（通常为id），保证排序确定
+        limit: 每页数量
+        cursor: 上一页返回的游标，指定时按键集定位并忽略skip
+        skip: 偏移量（兼容旧的偏移分页）
+    
+    Returns:
+        Tuple[List, Optional[str]]: (本页记录, 下一页游标)，没有更多记录时游标为None
+    
+    Raises:
+        ValueError: 游标无效
+    """
+    rows = _page_query(query, keys, limit, cursor, skip).all()
+    
+    next_cursor = None
+    if len(rows) > limit > 0:
+        last = rows[limit - 1]
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in last[1:]]
+        next_cursor = encode_cursor({"keys": values})
+    return [row[0] for row in rows[:limit]], next_cursor
@@ -0,0 +1,56 @@
+"""
+列表投影工具模块
+列表端点的摘要视图（view=summary）和字段选择（fields=）：SQL只查询所选列，并用轻量响应模型输出，
+不再读取和序列化简历全文、职位描述等大文本字段
+"""
+from typing import Any, Iterable, List, Optional, Type
+from pydantic import BaseModel
+
+# 列表视图：full 完整字段；summary 摘要字段
+VIEW_PATTERN = "^(full|summary)$"
+
+
+def summary_fields(schema: Type[BaseModel], view: str, fields: Optional[str]) -> Optional[List[str]]:
+    """
+    解析视图和字段选择参数
+    
+    Args:
+        schema: 摘要响应模型
+        view: 列表视图
+        fields: 逗号分隔的字段名（只能从摘要模型中选择），指定时隐含摘要视图
+    
+    Returns:
+        Optional[List[str]]: 输出字段（始终包含id，按摘要模型字段顺序）；完整视图时为None
+    
+    Raises:
+        ValueError: 包含摘要模型之外的字段
+    """
+    if view != "summary" and not fields:
+        return None
+    available = list(schema.model_fields)
+    if not fields:
+        return available
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(available)
+    if unknown:
+        raise ValueError(f"不支持的字段: {', '.join(sorted(unknown))}，可选字段: {', '.join(available)}")
+    return [name for name in available if name == "id" or name in requested]
+
+
+def columns(model: Any, names: Iterable[str]) -> List[Any]:
+    """字段名中属于模型表列的属性（关系字段由调用方预加载），用于load_only"""
+    table_columns = model.__table__.columns
+    return [getattr(model, name) for name in names if name in table_columns]
+
+
+def to_summaries(schema: Type[BaseModel], rows: Iterable[Any], names: List[str]) -> List[BaseModel]:
+    """
+    构造摘要响应模型
+    
+    只读取所选字段，未加载的列不会触发懒加载；
+    未选择的字段保持未设置状态，端点以response_model_exclude_unset输出时不会出现在响应中
+    """
+    return [
+        schema.model_validate({name: getattr(row, name) for name in names}, from_attributes=True)
+        for row in rows
+    ]
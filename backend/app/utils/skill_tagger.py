@@ -0,0 +1,217 @@
+"""
+本地技能标签提取模块
+基于Aho-Corasick自动机在文本中一次扫描匹配全部技能名称及同义词，返回标准标签；
+忽略大小写和全角半角差异，英文名称按词边界匹配，重叠命中时取最左最长；
+以"="开头的名称只用于归一（如单独的"Go"、"Spring"易误命中普通英文），不在文本中匹配
+"""
+import os
+import threading
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+
+# 内置技能词库
+DEFAULT_SKILLS_PATH = os.path.join(os.path.dirname(__file__), "skills.txt")
+
+# 紧邻英文名称时视为同一个词的字符（"c"不应命中"c++"，"java"不应命中"javascript"）
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789+#")
+
+# 以"."开头的名称（如.NET）左侧还不得紧邻"."，避免命中域名和邮箱（cnblogs.net、foo@bar.net）
+_DOT_BOUNDARY = _WORD_CHARS | {"."}
+
+
+def _fold(text: str) -> str:
+    """归一化：全角转半角并忽略大小写"""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def _is_word_char(char: str) -> bool:
+    """是否为英文名称的组成字符"""
+    return char in _WORD_CHARS
+
+
+def _left_boundary(name: str) -> frozenset:
+    """名称左侧不得紧邻的字符"""
+    if name[0] == ".":
+        return _DOT_BOUNDARY
+    return _WORD_CHARS if _is_word_char(name[0]) else frozenset()
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick多模式匹配自动机
+    
+    状态转移为每个状态一个字典，失败指针在构建时按层序计算，
+    每个状态的输出合并了失败链上的全部模式，扫描时无需回溯
+    """
+    
+    def __init__(self, patterns: Iterable[Tuple[str, int]]):
+        """
+        构建自动机
+        
+        Args:
+            patterns: (模式串, 模式ID)，模式串需已归一化
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, int]]] = [[]]
+        for pattern, pattern_id in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((len(pattern), pattern_id))
+        
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fallback = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fallback
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def __len__(self) -> int:
+        """状态数"""
+        return len(self._goto)
+    
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int, int]]:
+        """
+        扫描文本
+        
+        Yields:
+            Tuple[int, int, int]: (起始位置, 结束位置, 模式ID)，按结束位置顺序
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                end = position + 1
+                for length, pattern_id in output[state]:
+                    yield end - length, end, pattern_id
+
+
+class SkillTagger:
+    """技能标签提取器：技能名称及同义词 -> 标准标签"""
+    
+    def __init__(self, skills: Iterable[Tuple[str, Iterable[str]]]):
+        """
+        初始化提取器
+        
+        Args:
+            skills: (标准标签, 同义词列表)；同一名称出现多次时以先出现的标准标签为准，
+                    以"="开头的名称只用于归一，不在文本中匹配
+        """
+        self.tags: List[str] = []
+        self._names: Dict[str, int] = {}
+        scanned = []
+        for tag, synonyms in skills:
+            tag_id = len(self.tags)
+            self.tags.append(tag.strip().lstrip("="))
+            for name in (tag, *synonyms):
+                name = name.strip()
+                scan = not name.startswith("=")
+                name = _fold(name.lstrip("="))
+                if name and name not in self._names:
+                    self._names[name] = tag_id
+                    if scan:
+                        scanned.append(name)
+        # 模式ID即名称序号：记录标签ID、左侧不得紧邻的字符和右侧是否需要词边界
+        self._patterns: List[Tuple[int, frozenset, bool]] = []
+        names = []
+        for name in scanned:
+            names.append((name, len(self._patterns)))
+            self._patterns.append((self._names[name], _left_boundary(name), _is_word_char(name[-1])))
+        self._automaton = AhoCorasick(names)
+    
+    @classmethod
+    def from_file(cls, path: str) -> "SkillTagger":
+        """从词库文件加载（每行"标准标签,同义词,..."，#开头为注释）"""
+        skills = []
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                names = [name.strip() for name in line.split(",") if name.strip()]
+                skills.append((names[0], names[1:]))
+        return cls(skills)
+    
+    def __len__(self) -> int:
+        """标准标签数"""
+        return len(self.tags)
+    
+    def canonical(self, name: str) -> Optional[str]:
+        """技能名称或同义词对应的标准标签"""
+        tag_id = self._names.get(_fold(name.strip()))
+        return self.tags[tag_id] if tag_id is not None else None
+    
+    def _matches(self, text: str) -> List[Tuple[int, int, int]]:
+        """满足词边界且互不重叠（最左最长）的命中：(起始位置, 结束位置, 标签ID)"""
+        candidates = []
+        for start, end, pattern_id in self._automaton.iter_matches(text):
+            tag_id, left_boundary, right_bound = self._patterns[pattern_id]
+            if start > 0 and text[start - 1] in left_boundary:
+                continue
+            if right_bound and end < len(text) and _is_word_char(text[end]):
+                continue
+            candidates.append((start, end, tag_id))
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        
+        matches = []
+        covered = 0
+        for start, end, tag_id in candidates:
+            if start >= covered:
+                matches.append((start, end, tag_id))
+                covered = end
+        return matches
+    
+    def tag(self, text: str, limit: Optional[int] = None) -> List[str]:
+        """
+        提取标准技能标签
+        
+        Args:
+            text: 简历或职位描述文本
+            limit: 最多返回的标签数，为None时使用配置
+        
+        Returns:
+            List[str]: 标准标签，按出现次数降序、首次出现位置升序
+        """
+        if not text:
+            return []
+        counts: Dict[int, int] = {}
+        first: Dict[int, int] = {}
+        for start, _, tag_id in self._matches(_fold(text)):
+            counts[tag_id] = counts.get(tag_id, 0) + 1
+            first.setdefault(tag_id, start)
+        ranked = sorted(counts, key=lambda tag_id: (-counts[tag_id], first[tag_id]))
+        return [self.tags[tag_id] for tag_id in ranked[:limit or settings.TAGGER_MAX_TAGS]]
+
+
+# 进程内共享的技能标签提取器（首次使用时加载）
+_tagger: Optional[SkillTagger] = None
+_tagger_lock = threading.Lock()
+
+
+def get_skill_tagger() -> SkillTagger:
+    """获取技能标签提取器（首次使用时按配置加载词库）"""
+    global _tagger
+    if _tagger is None:
+        with _tagger_lock:
+            if _tagger is None:
+                _tagger = SkillTagger.from_file(settings.TAGGER_SKILLS_PATH or DEFAULT_SKILLS_PATH)
+    return _tagger
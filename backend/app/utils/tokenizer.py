@@ -0,0 +1,357 @@
+"""
+分词工具模块
+提供中英文混合文本的分词，供关键词匹配、BM25、文本向量化、全文检索和标签提取使用
+
+- 英文/数字词：连续的字母数字统一转小写，保留C++、C#、Vue.js等技能写法
+  （+/#紧跟在字母数字之后，.夹在两个字母数字之间）
+- 中文：连续汉字切分为双字词（单独一个汉字时保留单字）；
+  dictionary模式下先按内置词典做正向最大匹配，未登录的部分再回退为双字词
+- 建索引使用term_ids/iter_term_ids：基于NumPy向量化直接计算词ID，不为每个词创建字符串，
+  批量导入时多份文本拼接后一次处理；term_id(词)与term_ids(文本)中对应词的ID一致，
+  检索时可以用tokenize得到的字符串查询词对照
+"""
+import os
+import threading
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+import numpy as np
+from app.core.config import settings
+
+BIGRAM = "bigram"
+DICTIONARY = "dictionary"
+
+# 内置词典：技能名称和常用词，每行一个词，#开头为注释
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(__file__), "lexicon.txt")
+
+# 中文词ID的标志位：双字词为 (c1 | c2 << 32) | 标志位，单字为 码点 | 标志位，不与哈希ID冲突
+_CJK_FLAG = 1 << 62
+_CJK_FIRST = 0x4E00
+_CJK_SPAN = 0x9FFF - 0x4E00 + 1
+
+# 其余词（英文词、词典词）的ID：64位多项式哈希右移2位，取值范围[0, 2^62)
+_MASK = (1 << 64) - 1
+_HASH_BASE = 0x100000001B3
+
+# ASCII字符分类表：字母数字、+/#、.，其余字符（含非ASCII）归为OTHER
+_OTHER, _ALNUM, _SYMBOL, _DOT = 0, 1, 2, 3
+_CLASSES = bytes(
+    _ALNUM if chr(code).isascii() and chr(code).isalnum()
+    else _SYMBOL if chr(code) in "+#"
+    else _DOT if chr(code) == "."
+    else _OTHER
+    for code in range(256)
+)
+
+
+def _codes(text: str) -> bytes:
+    """文本的UTF-32（小端）编码，每个字符4字节"""
+    return text.encode("utf-32-le", "surrogatepass")
+
+
+def _classes(text: str) -> np.ndarray:
+    """逐字符的ASCII分类（非ASCII字符编码为?，长度与文本一致）"""
+    return np.frombuffer(text.encode("ascii", "replace").translate(_CLASSES), dtype=np.uint8)
+
+
+def _padded(mask: np.ndarray) -> np.ndarray:
+    """首尾各补一个False的布尔数组，便于向量化地比较相邻字符"""
+    padded = np.zeros(len(mask) + 2, dtype=bool)
+    padded[1:-1] = mask
+    return padded
+
+
+def _runs(padded: np.ndarray):
+    """补齐后的掩码中连续True区间的起止位置（对应原文本下标，止位置不含）"""
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[::2], edges[1::2]
+
+
+def _word_spans(text: str):
+    """
+    英文/数字词的起止位置：字母数字组成词，
+    .夹在两个字母数字之间、+/#跟在字母数字（或跟在字母数字后的+/#）之后时也算作词的一部分
+    """
+    classes = _classes(text)
+    padded = _padded(classes == _ALNUM)
+    positions = np.flatnonzero(classes[1:] > _ALNUM) + 1
+    if len(positions):
+        before = padded[positions]
+        following = padded[positions + 2]
+        second = padded[positions - 1] & (classes[positions - 1] == _SYMBOL)
+        padded[positions + 1] = np.where(classes[positions] == _DOT, before & following, before | second)
+    return _runs(padded), padded[1:-1]
+
+
+def _cjk_mask(codes: np.ndarray) -> np.ndarray:
+    """中文字符掩码（首尾补False）"""
+    return _padded((codes - np.uint32(_CJK_FIRST)) < _CJK_SPAN)
+
+
+def _bigram_positions(cjk: np.ndarray):
+    """双字词的起始位置和单独汉字的位置"""
+    pairs = np.flatnonzero(cjk[1:-2] & cjk[2:-1])
+    starts, ends = _runs(cjk)
+    return pairs, starts[ends - starts == 1]
+
+
+_powers = np.empty(0, dtype=np.uint64)
+
+
+def _hash_powers(length: int) -> np.ndarray:
+    """B^0..B^(length-1) mod 2^64（缓存，词更长时扩容）"""
+    global _powers
+    if len(_powers) < length:
+        powers = np.full(max(length, 64), _HASH_BASE, dtype=np.uint64)
+        powers[0] = 1
+        _powers = np.cumprod(powers)
+    return _powers
+
+
+def _span_hashes(codes: np.ndarray, word: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    向量化计算全部英文词的多项式哈希 sum(lower(c[i]) * B^(i - start)) mod 2^64（与_string_hash一致），
+    只处理词内字符；词内字符|0x20即转为小写（数字和+#.本身已含该位）
+    """
+    if not len(starts):
+        return np.empty(0, dtype=np.int64)
+    lengths = ends - starts
+    offsets = np.cumsum(lengths) - lengths
+    exponents = np.arange(offsets[-1] + lengths[-1]) - np.repeat(offsets, lengths)
+    terms = (codes[word] | np.uint32(0x20)) * _hash_powers(int(lengths.max()))[exponents]
+    hashes = np.add.reduceat(terms, offsets)
+    return (hashes >> np.uint64(2)).astype(np.int64)
+
+
+def _string_hash(token: str) -> int:
+    """单个词的多项式哈希（与_span_hashes一致）"""
+    hashed, power = 0, 1
+    for char in token:
+        hashed = (hashed + ord(char) * power) & _MASK
+        power = (power * _HASH_BASE) & _MASK
+    return hashed >> 2
+
+
+def _is_cjk(char: str) -> bool:
+    """是否为中文字符"""
+    return 0 <= ord(char) - _CJK_FIRST < _CJK_SPAN
+
+
+def term_id(token: str) -> int:
+    """
+    计算单个词的ID（与term_ids对同一个词给出的ID一致）
+    
+    Args:
+        token: tokenize输出的词
+    
+    Returns:
+        int: 非负64位整数ID
+    """
+    if len(token) == 2 and _is_cjk(token[0]) and _is_cjk(token[1]):
+        return (ord(token[0]) | ord(token[1]) << 32) | _CJK_FLAG
+    if len(token) == 1 and _is_cjk(token):
+        return ord(token) | _CJK_FLAG
+    return _string_hash(token)
+
+
+class Lexicon:
+    """
+    分词词典：对连续汉字做正向最大匹配，
+    词典外的部分按双字切分（单独一个汉字时保留单字），保证未登录词仍可检索
+    """
+    
+    def __init__(self, words: Iterable[str]):
+        """初始化词典（只有含两个以上汉字的词参与中文分词）"""
+        self.words: FrozenSet[str] = frozenset(word.strip().lower() for word in words if word.strip())
+        # 首字 -> 以该字开头的中文词长度（降序），没有候选词的字直接跳过
+        lengths: Dict[str, Set[int]] = {}
+        for word in self.words:
+            if len(word) > 1 and all(map(_is_cjk, word)):
+                lengths.setdefault(word[0], set()).add(len(word))
+        self._lengths = {char: sorted(values, reverse=True) for char, values in lengths.items()}
+    
+    @classmethod
+    def from_file(cls, path: str) -> "Lexicon":
+        """从词典文件加载（每行一个词，#开头为注释）"""
+        with open(path, encoding="utf-8") as file:
+            return cls(line for line in file if not line.lstrip().startswith("#"))
+    
+    def __contains__(self, word: str) -> bool:
+        """是否为词典词"""
+        return word.lower() in self.words
+    
+    def __len__(self) -> int:
+        """词数"""
+        return len(self.words)
+    
+    def segment(self, run: str) -> List[str]:
+        """
+        切分一段连续汉字
+        
+        Args:
+            run: 连续汉字
+        
+        Returns:
+            List[str]: 词列表（按出现顺序）
+        """
+        tokens: List[str] = []
+        position, pending, size = 0, 0, len(run)
+        while position < size:
+            for length in self._lengths.get(run[position], ()):
+                if position + length <= size and run[position:position + length] in self.words:
+                    break
+            else:
+                position += 1
+                continue
+            tokens.extend(_bigrams(run[pending:position]))
+            tokens.append(run[position:position + length])
+            position += length
+            pending = position
+        tokens.extend(_bigrams(run[pending:]))
+        return tokens
+
+
+def _bigrams(run: str) -> List[str]:
+    """连续汉字切分为双字词（单独一个汉字时保留单字）"""
+    if len(run) < 2:
+        return [run] if run else []
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+_lexicon: Optional[Lexicon] = None
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon() -> Lexicon:
+    """获取分词词典（首次使用时按配置加载）"""
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                _lexicon = Lexicon.from_file(settings.TOKENIZER_LEXICON_PATH or DEFAULT_LEXICON_PATH)
+    return _lexicon
+
+
+def _mode(mode: Optional[str]) -> str:
+    """解析分词模式（未指定时使用配置）"""
+    return mode or settings.TOKENIZER_MODE
+
+
+def tokenize(text: str, mode: Optional[str] = None) -> List[str]:
+    """
+    分词：英文词转小写，中文按分词模式切分，按出现顺序返回（含重复）
+    
+    Args:
+        text: 待分词文本
+        mode: 分词模式（bigram或dictionary），为None时使用配置
+    
+    Returns:
+        List[str]: 词列表
+    """
+    if not text:
+        return []
+    (starts, ends), _ = _word_spans(text)
+    cjk = _cjk_mask(np.frombuffer(_codes(text), dtype="<u4"))
+    tokens = [text[start:end].lower() for start, end in zip(starts.tolist(), ends.tolist())]
+    positions = [starts]
+    if _mode(mode) == DICTIONARY:
+        for start, words in _segment_runs(text, cjk):
+            tokens.extend(words)
+            positions.append(np.full(len(words), start))
+    else:
+        pairs, singles = _bigram_positions(cjk)
+        tokens.extend([text[position:position + 2] for position in pairs.tolist()])
+        tokens.extend([text[position] for position in singles.tolist()])
+        positions.extend((pairs, singles))
+    order = np.argsort(np.concatenate(positions), kind="stable")
+    return [tokens[position] for position in order.tolist()]
+
+
+def _segment_runs(text: str, cjk: np.ndarray) -> Iterator[Tuple[int, List[str]]]:
+    """按词典切分每段连续汉字，产出(段起始位置, 词列表)"""
+    lexicon = get_lexicon()
+    starts, ends = _runs(cjk)
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        yield start, lexicon.segment(text[start:end])
+
+
+def _bigram_terms(text: str) -> Tuple[Tuple[np.ndarray, np.ndarray], ...]:
+    """bigram模式的(词ID, 起始位置)：英文词、双字词、单字三组，每组内按位置有序"""
+    if not text:
+        empty = np.empty(0, dtype=np.int64)
+        return ((empty, empty),) * 3
+    encoded = _codes(text)
+    codes = np.frombuffer(encoded, dtype="<u4")
+    (starts, ends), word = _word_spans(text)
+    pairs, singles = _bigram_positions(_cjk_mask(codes))
+    # 相邻两个字符的UTF-32编码按小端读作一个64位整数，即 c1 | c2 << 32
+    adjacent = np.ndarray(len(codes) - 1, dtype="<u8", buffer=encoded, strides=(4,))
+    return (
+        (_span_hashes(codes, word, starts, ends), starts),
+        ((adjacent[pairs] | np.uint64(_CJK_FLAG)).astype(np.int64), pairs),
+        (codes[singles].astype(np.int64) | _CJK_FLAG, singles),
+    )
+
+
+def term_ids(text: str, mode: Optional[str] = None) -> np.ndarray:
+    """
+    建索引用的分词：直接返回词ID数组（含重复，不保证顺序），
+    bigram模式全程向量化；dictionary模式英文词向量化，中文逐段匹配词典后计算ID
+    
+    Args:
+        text: 待分词文本
+        mode: 分词模式（bigram或dictionary），为None时使用配置
+    
+    Returns:
+        np.ndarray: int64词ID数组
+    """
+    if not text:
+        return np.empty(0, dtype=np.int64)
+    if _mode(mode) != DICTIONARY:
+        return np.concatenate([ids for ids, _ in _bigram_terms(text)])
+    codes = np.frombuffer(_codes(text), dtype="<u4")
+    (starts, ends), word = _word_spans(text)
+    words = [token for _, tokens in _segment_runs(text, _cjk_mask(codes)) for token in tokens]
+    return np.concatenate((
+        _span_hashes(codes, word, starts, ends),
+        np.fromiter(map(term_id, words), dtype=np.int64, count=len(words)),
+    ))
+
+
+# 批量分词时每次拼接处理的最大字符数
+_BATCH_CHARS = 1 << 15
+
+
+def iter_term_ids(texts: Iterable[str], mode: Optional[str] = None) -> Iterator[np.ndarray]:
+    """
+    批量导入用的分词：逐份产出与term_ids相同的词ID数组
+    
+    bigram模式下把多份文本用换行拼接（换行不属于任何词），按块一次向量化，
+    再按位置拆回各份文本，摊薄短文本逐条调用NumPy的固定开销
+    
+    Args:
+        texts: 待分词文本
+        mode: 分词模式（bigram或dictionary），为None时使用配置
+    
+    Yields:
+        np.ndarray: 每份文本的int64词ID数组
+    """
+    if _mode(mode) == DICTIONARY:
+        for text in texts:
+            yield term_ids(text, DICTIONARY)
+        return
+    batch: List[str] = []
+    size = 0
+    for text in texts:
+        batch.append(text or "")
+        size += len(batch[-1]) + 1
+        if size >= _BATCH_CHARS:
+            yield from _split_batch(batch)
+            batch, size = [], 0
+    if batch:
+        yield from _split_batch(batch)
+
+
+def _split_batch(texts: List[str]) -> List[np.ndarray]:
+    """拼接分词后按位置拆回各份文本"""
+    bounds = np.cumsum([len(text) + 1 for text in texts])[:-1]
+    groups = [np.split(ids, np.searchsorted(positions, bounds)) for ids, positions in _bigram_terms("\n".join(texts))]
+    return [np.concatenate(parts) for parts in zip(*groups)]
@@ -0,0 +1,58 @@
+"""
+分词吞吐量基准测试脚本
+分别测试批量导入（iter_term_ids）、逐份建索引（term_ids）和字符串分词（tokenize），报告每秒处理的UTF-8文本量
+
+用法: python benchmark_tokenizer.py --documents 2000 --mode bigram
+"""
+import time
+import random
+import argparse
+from app.utils.tokenizer import iter_term_ids, term_ids, tokenize
+
+CHINESE = "五年后端开发经验熟悉分布式系统设计负责推荐系统和搜索引擎的架构与性能优化具备良好的沟通能力和团队合作精神"
+SKILLS = "Python FastAPI MySQL Redis Docker Kubernetes C++ C# Vue.js Node.js Spring Boot 2019".split()
+
+def make_documents(count, size, seed=0):
+    """生成中英文混合的模拟简历文本（以中文为主，夹杂技能名称和标点）"""
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(count):
+        parts, length = [], 0
+        while length < size:
+            if rng.random() < 0.7:
+                start = rng.randrange(len(CHINESE) - 10)
+                part = CHINESE[start:start + rng.randint(5, 30)]
+            else:
+                part = " ".join(rng.sample(SKILLS, 4))
+            parts.append(part + rng.choice("，。\n "))
+            length += len(part) + 1
+        documents.append("".join(parts))
+    return documents
+
+def throughput(function, documents, mode):
+    """执行分词，返回MB/s"""
+    size = sum(len(document.encode("utf-8")) for document in documents) / 1e6
+    start = time.perf_counter()
+    function(documents, mode)
+    return size / (time.perf_counter() - start)
+
+def one_by_one(function):
+    """逐份调用分词函数"""
+    return lambda documents, mode: [function(document, mode) for document in documents]
+
+def main():
+    """运行基准测试"""
+    parser = argparse.ArgumentParser(description="分词吞吐量基准测试")
+    parser.add_argument("--documents", type=int, default=2000, help="简历数")
+    parser.add_argument("--size", type=int, default=4000, help="每份简历的字符数")
+    parser.add_argument("--mode", default="bigram", help="分词模式：bigram或dictionary")
+    args = parser.parse_args()
+    
+    documents = make_documents(args.documents, args.size)
+    batch = lambda documents, mode: list(iter_term_ids(documents, mode))
+    print(f"iter_term_ids(批量导入): {throughput(batch, documents, args.mode):.1f} MB/s")
+    print(f"term_ids(逐份建索引): {throughput(one_by_one(term_ids), documents, args.mode):.1f} MB/s")
+    print(f"tokenize(字符串): {throughput(one_by_one(tokenize), documents, args.mode):.1f} MB/s")
+
+if __name__ == "__main__":
+    main()
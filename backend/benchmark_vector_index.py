@@ -0,0 +1,70 @@
+"""
+向量索引基准测试脚本
+比较IVF近似检索与精确检索的延迟，并报告recall@K
+
+用法: python benchmark_vector_index.py --size 500000 --nprobe 4 8 16 32
+"""
+import time
+import argparse
+import numpy as np
+from app.services.embedding_service import normalize_rows
+from app.services.vector_index import VectorIndex, IVFIndex
+
+def make_dataset(size, dim, clusters, noise, seed=0):
+    """生成带聚类结构的归一化向量（近似真实文本向量的分布）"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size)
+    data = centers[labels] + noise * rng.standard_normal((size, dim)).astype(np.float32)
+    return normalize_rows(data).astype(np.float32)
+
+def timed_search(index, queries, k, **options):
+    """执行全部查询，返回结果和平均延迟（毫秒）"""
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        results.append([item_id for item_id, _ in index.search(query, k, **options)])
+    return results, (time.perf_counter() - start) / len(queries) * 1000
+
+def recall(approximate, exact):
+    """计算平均recall@K"""
+    hits = [len(set(a) & set(e)) / max(len(e), 1) for a, e in zip(approximate, exact)]
+    return sum(hits) / len(hits)
+
+def main():
+    """运行基准测试"""
+    parser = argparse.ArgumentParser(description="向量索引基准测试")
+    parser.add_argument("--size", type=int, default=200000, help="向量数")
+    parser.add_argument("--dim", type=int, default=256, help="向量维度")
+    parser.add_argument("--clusters", type=int, default=500, help="数据集的自然聚类数")
+    parser.add_argument("--noise", type=float, default=2.0, help="聚类内噪声强度，越大越难")
+    parser.add_argument("--queries", type=int, default=50, help="查询数")
+    parser.add_argument("--k", type=int, default=50, help="召回数量")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF列表数，0表示sqrt(N)")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32], help="IVF扫描列表数")
+    parser.add_argument("--dtype", default="float32", help="存储类型")
+    args = parser.parse_args()
+    
+    print(f"生成数据集: 数量={args.size}, 维度={args.dim}")
+    data = make_dataset(args.size + args.queries, args.dim, args.clusters, args.noise)
+    vectors, queries = data[:args.size], data[args.size:]
+    ids = np.arange(args.size)
+    
+    flat = VectorIndex(args.dim, args.dtype)
+    flat.load(ids, vectors)
+    exact, flat_ms = timed_search(flat, queries, args.k)
+    print(f"精确检索(flat): {flat_ms:.2f} ms/查询")
+    
+    start = time.perf_counter()
+    ivf = IVFIndex(args.dim, args.dtype, nlist=args.nlist)
+    ivf.load(ids, vectors)
+    print(f"IVF训练: 列表数={ivf.n_lists}, 耗时={time.perf_counter() - start:.1f} s")
+    
+    _, exact_ms = timed_search(ivf, queries, args.k, exact=True)
+    print(f"精确检索(ivf exact): {exact_ms:.2f} ms/查询")
+    for nprobe in args.nprobe:
+        approximate, ivf_ms = timed_search(ivf, queries, args.k, nprobe=nprobe)
+        print(f"nprobe={nprobe:<4} recall@{args.k}={recall(approximate, exact):.3f}  {ivf_ms:.2f} ms/查询")
+
+if __name__ == "__main__":
+    main()
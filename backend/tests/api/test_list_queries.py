@@ -0,0 +1,158 @@
+"""
+列表端点查询测试（N+1查询、摘要视图与字段选择）
+"""
+import json
+from app.models.job_requirement import JobRequirement
+from app.models.match import Match
+from app.models.plan import Plan
+from app.models.resume import Resume
+from app.models.tag import Tag
+from app.models.user import User
+from app.utils.pagination import encode_cursor
+from tests.conftest import count_queries
+
+def _setup_data(db, count=5):
+    """创建带标签的简历、职位、匹配记录和招聘方案"""
+    user = User(username="hr", email="hr@example.com", hashed_password="x", full_name="HR")
+    tags = [Tag(name=f"标签{i}", category="skill") for i in range(3)]
+    db.add(user)
+    for i in range(count):
+        resume = Resume(candidate_name=f"候选人{i}", file_url=f"/uploads/{i}.pdf", file_type="application/pdf",
+                        ocr_content=f"Python {i}", tags=tags[:i % 3 + 1])
+        job = JobRequirement(position_name=f"职位{i}", responsibilities="后端开发", requirements="Python")
+        db.add_all([resume, job])
+        db.flush()
+        db.add(Match(resume_id=resume.id, job_id=job.id, match_score=90 - i, match_explanation="匹配"))
+        db.add(Plan(title=f"方案{i}", job_id=job.id, created_by=user.id, candidate_ids=[resume.id]))
+    db.commit()
+
+def test_list_endpoints_do_not_issue_n_plus_one(client, db, assert_constant_queries):
+    """测试简历、匹配、招聘方案、职位列表的SQL语句数与返回条数无关"""
+    _setup_data(db)
+    
+    assert assert_constant_queries("/api/v1/resumes", large=5) <= 2
+    assert assert_constant_queries("/api/v1/matches", large=5) <= 2
+    assert assert_constant_queries("/api/v1/plans", large=5) <= 1
+    assert assert_constant_queries("/api/v1/jobs", large=5) <= 1
+    
+    response = client.get("/api/v1/matches", params={"limit": 5})
+    first = response.json()[0]
+    assert first["resume"]["candidate_name"] == "候选人0"
+    assert [tag["name"] for tag in first["resume"]["tags"]] == ["标签0"]
+    assert first["job"]["position_name"] == "职位0"
+
+def test_tag_filter_keeps_all_tags(client, db, assert_constant_queries):
+    """测试按标签筛选简历时仍返回每份简历的全部标签"""
+    _setup_data(db)
+    
+    response = client.get("/api/v1/resumes", params={"tag": "标签1"})
+    
+    assert sorted(len(resume["tags"]) for resume in response.json()) == [2, 2, 3]
+    assert assert_constant_queries("/api/v1/resumes", params={"tag": "标签1"}, large=3) <= 2
+
+def test_summary_view_omits_text_columns(client, db, assert_constant_queries):
+    """测试摘要视图的SQL不查询大文本列，响应使用摘要模型"""
+    _setup_data(db)
+    
+    for url, text_columns in (("/api/v1/resumes", ("ocr_content", "talent_portrait")),
+                              ("/api/v1/jobs", ("responsibilities", "requirements")),
+                              ("/api/v1/matches", ("ocr_content", "responsibilities"))):
+        db.expunge_all()
+        with count_queries() as statements:
+            response = client.get(url, params={"view": "summary", "limit": 5})
+        assert response.status_code == 200
+        assert not any(f".{column}" in statement for statement in statements for column in text_columns), url
+        assert not any(column in json.dumps(response.json()) for column in text_columns), url
+        assert assert_constant_queries(url, params={"view": "summary"}, large=5) <= 2
+    
+    match = client.get("/api/v1/matches", params={"view": "summary"}).json()[0]
+    assert match["match_score"] == 90
+    assert match["resume"]["candidate_name"] == "候选人0"
+    assert [tag["name"] for tag in match["resume"]["tags"]] == ["标签0"]
+    assert match["job"]["position_name"] == "职位0"
+    assert "ocr_content" in client.get("/api/v1/resumes").json()[0]
+
+def test_fields_selects_columns(client, db):
+    """测试fields只返回所选字段，且不加载未选择的关系"""
+    _setup_data(db)
+    
+    db.expunge_all()
+    with count_queries() as statements:
+        response = client.get("/api/v1/matches", params={"fields": "match_score, resume_id"})
+    assert len(statements) == 1
+    assert response.json()[0] == {"id": 1, "resume_id": 1, "match_score": 90}
+    
+    response = client.get("/api/v1/resumes", params={"fields": "candidate_name"})
+    assert all(set(resume) == {"id", "candidate_name"} for resume in response.json())
+    
+    response = client.get("/api/v1/jobs", params={"fields": "position_name,requirements"})
+    assert response.status_code == 400
+    assert "requirements" in response.json()["message"]
+    assert client.get("/api/v1/jobs", params={"view": "compact"}).status_code == 422
+
+def _walk(client, url, limit, headers=None, **params):
+    """按响应头中的游标逐页读取列表，返回各页ID"""
+    pages, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+def test_cursor_pagination(client, db, superuser_token_headers):
+    """测试游标分页：排序键相同的记录不重复不遗漏，与偏移分页顺序一致，翻页期间新增记录不影响后续页"""
+    _setup_data(db)
+    same_time = db.get(Resume, 1).created_at
+    db.query(Resume).update({Resume.created_at: same_time})
+    db.query(Match).filter(Match.id > 2).update({Match.match_score: 80})
+    db.commit()
+    
+    for url, params in (("/api/v1/resumes", {}), ("/api/v1/matches", {}), ("/api/v1/matches", {"view": "summary"}),
+                        ("/api/v1/jobs", {}), ("/api/v1/plans", {})):
+        expected = [item["id"] for item in client.get(url, params=params).json()]
+        pages = _walk(client, url, 2, **params)
+        assert [len(page) for page in pages] == [2, 2, 1], url
+        assert sum(pages, []) == expected, url
+    
+    assert sum(_walk(client, "/api/v1/resumes", 2), []) == [5, 4, 3, 2, 1]
+    assert sum(_walk(client, "/api/v1/matches", 2), []) == [1, 2, 3, 4, 5]
+    assert sum(_walk(client, "/api/v1/auth/users", 1, headers=superuser_token_headers), []) == [1, 2]
+    
+    first = client.get("/api/v1/resumes", params={"limit": 2})
+    db.add(Resume(candidate_name="新候选人", file_url="/uploads/new.pdf", file_type="application/pdf"))
+    db.commit()
+    second = client.get("/api/v1/resumes", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert [item["id"] for item in second.json()] == [3, 2]
+    
+    assert "X-Next-Cursor" not in client.get("/api/v1/resumes", params={"limit": 10}).headers
+    assert client.get("/api/v1/resumes", params={"cursor": "bad"}).status_code == 400
+    null_cursor = encode_cursor({"keys": [None, 1]})
+    assert client.get("/api/v1/resumes", params={"cursor": null_cursor}).status_code == 400
+    assert client.get("/api/v1/plans", params={"cursor": "bad"}).status_code == 400
+    assert [item["id"] for item in client.get("/api/v1/resumes", params={"skip": 4, "limit": 2}).json()] == [2, 1]
+
+def test_batch_match_queries_do_not_grow_with_resumes(client, db):
+    """测试批量匹配的SQL语句数与简历数无关，响应中的简历和职位已预加载"""
+    _setup_data(db)
+    counts = []
+    # 第一次请求用于加载BM25索引，不计入
+    for resume_ids in ([1], [1], [1, 2, 3, 4, 5]):
+        job = JobRequirement(position_name="新职位", responsibilities="后端开发", requirements="Python")
+        db.add(job)
+        db.commit()
+        job_id = job.id
+        db.expunge_all()
+        with count_queries() as statements:
+            response = client.post("/api/v1/matches/batch?scoring=local",
+                                   json={"job_id": job_id, "resume_ids": resume_ids})
+        assert response.status_code == 200
+        # 新匹配记录的INSERT需逐行取得自增ID，不计入
+        counts.append(len([statement for statement in statements if not statement.startswith("INSERT")]))
+    
+    assert counts[1] == counts[2]
+    matches = response.json()
+    assert [match["resume_id"] for match in matches] == [1, 2, 3, 4, 5]
+    assert [tag["name"] for tag in matches[0]["resume"]["tags"]] == ["标签0"]
+    assert matches[0]["job"]["position_name"] == "新职位"
@@ -1,9 +1,15 @@
 """
 简历API测试模块
 """
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 from fastapi.testclient import TestClient
 from app.models.resume import Resume
+from app.services.ai_service_mock import AsyncAIService as MockAsyncAIService
+from app.services.file_service_mock import FileService as MockFileService
 
 def test_create_resume(client, db):
     """测试创建简历"""
@@ -181,3 +187,77 @@ def test_delete_resume(client, db):
     # 测试不存在的ID
     response = client.delete("/api/v1/resumes/999")
     assert response.status_code == 404
+
+def test_upload_resume_keeps_event_loop_responsive(client, monkeypatch):
+    """测试简历上传处理期间，并发的健康检查仍能在毫秒级响应"""
+    resume_text = "姓名：张三\n学历：本科\n技能：Python, FastAPI\n工作经验：3年"
+    
+    def slow_get_file_content(self, file_path):
+        # 模拟阻塞的文件读取
+        time.sleep(0.5)
+        return resume_text.encode("utf-8")
+    
+    async def slow_analyze_resume(self, ocr_content):
+        # 模拟耗时的LLM调用
+        await asyncio.sleep(0.5)
+        return {
+            "parsed_content": {"name": "张三", "skills": ["Python", "FastAPI"]},
+            "talent_portrait": "张三是一名有3年经验的Python开发工程师",
+            "tags": ["Python", "FastAPI"]
+        }
+    
+    monkeypatch.setattr(MockFileService, "get_file_content", slow_get_file_content)
+    monkeypatch.setattr(MockAsyncAIService, "analyze_resume", slow_analyze_resume)
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        upload = executor.submit(
+            client.post,
+            "/api/v1/resumes/upload",
+            files={"file": ("resume.txt", io.BytesIO(resume_text.encode("utf-8")), "text/plain")}
+        )
+        
+        # 上传进行期间持续发起健康检查
+        latencies = []
+        time.sleep(0.05)
+        while not upload.done():
+            start = time.perf_counter()
+            response = client.get("/api/health")
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+            time.sleep(0.05)
+        
+        assert upload.result().status_code == 201
+        assert sorted(tag["name"] for tag in upload.result().json()["tags"]) == ["FastAPI", "Python"]
+    
+    # 验证健康检查未被上传阻塞
+    assert len(latencies) >= 5
+    assert max(latencies) < 0.2
+
+def test_upload_resume_updates_indexes_off_event_loop(client):
+    """测试上传简历后在线程池中（不在事件循环中）更新简历检索索引"""
+    from app.main import app
+    from app.services.service_factory import get_resume_indexes
+    
+    class RecordingIndex:
+        def __init__(self):
+            self.calls = []
+        
+        def upsert_resume(self, resume):
+            try:
+                asyncio.get_running_loop()
+                on_event_loop = True
+            except RuntimeError:
+                on_event_loop = False
+            self.calls.append((resume.id, on_event_loop))
+    
+    index = RecordingIndex()
+    app.dependency_overrides[get_resume_indexes] = lambda: [index]
+    
+    resume_text = "姓名：张三\n技能：Python"
+    response = client.post(
+        "/api/v1/resumes/upload",
+        files={"file": ("resume.txt", io.BytesIO(resume_text.encode("utf-8")), "text/plain")}
+    )
+    
+    assert response.status_code == 201
+    assert index.calls == [(response.json()["id"], False)]
@@ -2,21 +2,29 @@
 测试配置
 """
 import os
+import asyncio
 import pytest
-from typing import Dict, Generator
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Generator, Iterator, List, Optional
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 from app.db.base import Base
 from app.main import app
 from app.db.session import get_db
+from app.core.config import settings
 from app.core.security import create_access_token, get_password_hash
 from app.models.user import User
+from app.services.ai_service import AsyncAIService
 
 # 设置测试环境变量
 os.environ["ENV"] = "test"
 os.environ["MOCK_SERVICES"] = "True"
 
+# LLM缓存在测试中仅使用内存层，避免在工作目录生成缓存文件
+settings.AI_CACHE_PATH = ""
+
 # 测试用户数据
 test_user = {
     "username": "testuser",
@@ -40,6 +48,41 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+class FakeStatusError(Exception):
+    """模拟带HTTP状态码的OpenAI异常"""
+    
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+def make_completion(content):
+    """构造模拟的Chat Completions响应"""
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+class FakeAsyncCompletions:
+    """模拟AsyncOpenAI的chat.completions接口，按顺序返回预设响应（最后一个重复使用）"""
+    
+    def __init__(self, *contents):
+        self.contents = list(contents)
+        self.calls = []
+    
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(0)
+        content = self.contents[min(len(self.calls), len(self.contents)) - 1]
+        return make_completion(content)
+
+def make_async_client(*contents):
+    """构造模拟的AsyncOpenAI客户端"""
+    return SimpleNamespace(chat=SimpleNamespace(completions=FakeAsyncCompletions(*contents)))
+
+def make_async_service(*contents):
+    """构造不使用缓存、按顺序返回预设响应的异步AI服务"""
+    service = AsyncAIService()
+    service.cache = None
+    service.client = make_async_client(*contents)
+    return service
+
 @pytest.fixture(scope="function")
 def db():
     """
@@ -79,6 +122,46 @@ def client(db):
     # 清理依赖覆盖
     app.dependency_overrides = {}
 
+@contextmanager
+def count_queries() -> Iterator[List[str]]:
+    """
+    统计代码块内在测试数据库上执行的SQL语句
+    
+    用法: with count_queries() as statements: ...; len(statements)
+    """
+    statements: List[str] = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+@pytest.fixture(scope="function")
+def assert_constant_queries(client, db) -> Callable[..., int]:
+    """
+    断言列表端点的SQL语句数不随分页大小增长（N+1查询检测）
+    
+    分别以limit=small和limit=large请求同一端点，请求前清空会话，保证关联对象都需从数据库加载；
+    用法: assert_constant_queries("/api/v1/matches", small=1, large=5)
+    """
+    def check(url: str, params: Optional[Dict[str, Any]] = None, small: int = 1, large: int = 10) -> int:
+        counts = []
+        for limit in (small, large):
+            db.expunge_all()
+            with count_queries() as statements:
+                response = client.get(url, params={**(params or {}), "limit": limit})
+            assert response.status_code == 200, response.text
+            assert len(response.json()) == limit, f"{url}: 测试数据不足{limit}条"
+            counts.append(len(statements))
+        assert counts[0] == counts[1], f"{url}: limit={small}执行{counts[0]}条SQL，limit={large}执行{counts[1]}条SQL"
+        return counts[1]
+    
+    return check
+
 @pytest.fixture(scope="function")
 def user_token_headers(client: TestClient, db) -> Dict[str, str]:
     """
@@ -0,0 +1,61 @@
+"""
+热点查询索引测试
+通过EXPLAIN QUERY PLAN确认列表、筛选和查重查询都使用索引，而不是全表扫描或临时排序
+"""
+import pytest
+from sqlalchemy import text
+from app.models.job_requirement import JobRequirement
+from app.models.match import Match
+from app.models.plan import Plan
+from app.models.resume import Resume
+from app.utils.pagination import _page_query, encode_cursor
+
+def _query_plan(db, query):
+    """查询的执行计划（各步骤说明以 | 连接）"""
+    statement = query.statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    return " | ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {statement}")))
+
+@pytest.mark.parametrize("build, index, ordered", [
+    # create_match / 批量匹配查重
+    (lambda db: db.query(Match).filter(Match.resume_id == 1, Match.job_id == 2).limit(1), "ix_matches_resume_id_job_id", False),
+    # read_matches 按职位筛选并按分数排序；生成招聘方案时加载职位下的匹配
+    (lambda db: db.query(Match).filter(Match.job_id == 2).order_by(Match.match_score.desc()).limit(100),
+     "ix_matches_job_id_match_score", True),
+    (lambda db: db.query(Match).filter(Match.job_id == 2, Match.match_score >= 60).order_by(Match.match_score.desc()),
+     "ix_matches_job_id_match_score", True),
+    # read_matches 按简历筛选
+    (lambda db: db.query(Match).filter(Match.resume_id == 1).order_by(Match.match_score.desc()), "ix_matches_resume_id_job_id", False),
+    # 各列表端点按创建时间倒序分页
+    (lambda db: db.query(Resume).order_by(Resume.created_at.desc()).offset(0).limit(100), "ix_resumes_created_at", True),
+    (lambda db: db.query(JobRequirement).order_by(JobRequirement.created_at.desc()).offset(0).limit(100),
+     "ix_job_requirements_created_at", True),
+    (lambda db: db.query(Plan).order_by(Plan.created_at.desc()).offset(0).limit(100), "ix_plans_created_at", True),
+])
+def test_hot_queries_use_index(db, build, index, ordered):
+    """测试热点查询使用对应索引，按索引顺序读取的查询不再额外排序"""
+    plan = _query_plan(db, build(db))
+    
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan, plan
+    if ordered:
+        assert "TEMP B-TREE" not in plan, plan
+
+@pytest.mark.parametrize("model, keys, filters, index", [
+    (Resume, [(Resume.created_at, True), (Resume.id, True)], [], "ix_resumes_created_at"),
+    (JobRequirement, [(JobRequirement.created_at, True), (JobRequirement.id, True)], [], "ix_job_requirements_created_at"),
+    (Plan, [(Plan.created_at, True), (Plan.id, True)], [], "ix_plans_created_at"),
+    (Match, [(Match.match_score, True), (Match.id, False)], [], "ix_matches_match_score"),
+    (Match, [(Match.match_score, True), (Match.id, False)], [Match.job_id == 2], "ix_matches_job_id_match_score"),
+])
+@pytest.mark.parametrize("page", ["first", "cursor", "offset"])
+def test_keyset_pages_use_index(db, model, keys, filters, index, page):
+    """测试列表端点实际发出的分页查询（首页、按游标定位的后续页、偏移页）按索引顺序读取，不做临时排序"""
+    assert not any(column.nullable for column, _ in keys)
+    cursor = None
+    if page == "cursor":
+        cursor = encode_cursor({"keys": ["2026-01-01T00:00:00" if column.key == "created_at" else 80 for column, _ in keys]})
+    query = _page_query(db.query(model).filter(*filters), keys, 100, cursor, 200 if page == "offset" else 0)
+    
+    plan = _query_plan(db, query)
+    
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
@@ -0,0 +1,74 @@
+"""
+LLM响应缓存测试
+"""
+import time
+import pytest
+from app.services.ai_cache import LLMCache
+
+@pytest.fixture
+def cache_path(tmp_path):
+    """提供缓存数据库路径"""
+    return str(tmp_path / "ai_cache.db")
+
+def test_make_key_depends_on_all_fields():
+    """测试缓存键由方法、模型、提示词、温度和最大token数共同决定"""
+    base = LLMCache.make_key("parse_resume", "gpt-4o", "简历内容", 0.3, 1000)
+    
+    assert base == LLMCache.make_key("parse_resume", "gpt-4o", "简历内容", 0.3, 1000)
+    assert base != LLMCache.make_key("parse_job_requirement", "gpt-4o", "简历内容", 0.3, 1000)
+    assert base != LLMCache.make_key("parse_resume", "gpt-4o-mini", "简历内容", 0.3, 1000)
+    assert base != LLMCache.make_key("parse_resume", "gpt-4o", "其他内容", 0.3, 1000)
+    assert base != LLMCache.make_key("parse_resume", "gpt-4o", "简历内容", 0.5, 1000)
+    assert base != LLMCache.make_key("parse_resume", "gpt-4o", "简历内容", 0.3, 200)
+
+def test_memory_lru_eviction():
+    """测试内存层按LRU淘汰并统计命中、未命中和淘汰次数"""
+    cache = LLMCache(max_entries=2)
+    cache.set("parse_resume", "a", "A")
+    cache.set("parse_resume", "b", "B")
+    
+    # 访问a使其成为最近使用
+    assert cache.get("a") == "A"
+    cache.set("parse_resume", "c", "C")
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    
+    stats = cache.stats()
+    assert stats["memory_hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+def test_disk_tier_survives_restart(cache_path):
+    """测试磁盘层在新实例（模拟重启）中仍可命中"""
+    cache = LLMCache(max_entries=4, db_path=cache_path)
+    cache.set("parse_resume", "key", '{"name": "张三"}')
+    cache.close()
+    
+    restarted = LLMCache(max_entries=4, db_path=cache_path)
+    assert restarted.get("key") == '{"name": "张三"}'
+    assert restarted.stats()["disk_hits"] == 1
+    
+    # 磁盘命中后回填内存层
+    assert restarted.get("key") == '{"name": "张三"}'
+    assert restarted.stats()["memory_hits"] == 1
+
+def test_per_method_ttl(cache_path):
+    """测试按方法配置的TTL，过期条目不再返回"""
+    cache = LLMCache(
+        max_entries=4,
+        db_path=cache_path,
+        ttls={"match_resume_to_job": 1, "generate_recruitment_plan": 0}
+    )
+    cache.set("match_resume_to_job", "match", "M")
+    cache.set("generate_recruitment_plan", "plan", "P")
+    
+    assert cache.get("match") == "M"
+    # TTL为0的方法不缓存
+    assert cache.get("plan") is None
+    
+    cache._memory["match"] = ("M", time.time() - 1)
+    cache._conn.execute("UPDATE llm_cache SET expires_at = ?", (time.time() - 1,))
+    assert cache.get("match") is None
+    assert cache.stats()["expirations"] == 2
@@ -0,0 +1,123 @@
+"""
+AI调用容错测试模块
+"""
+import asyncio
+import json
+import time
+import pytest
+from types import SimpleNamespace
+from app.core.config import settings
+from app.services.ai_service import AsyncAIService
+from app.services.ai_throttle import RateLimiter, AdaptiveConcurrencyLimiter
+from app.services.ai_resilience import RetryPolicy, CircuitBreaker, CircuitOpenError, is_retryable_error
+from tests.conftest import FakeStatusError
+
+class ScriptedCompletions:
+    """按脚本依次抛出异常或返回响应的模拟chat.completions接口"""
+    
+    def __init__(self, *steps, delay=0.0):
+        self.steps = list(steps)
+        self.delay = delay
+        self.calls = []
+    
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        step = self.steps[min(len(self.calls), len(self.steps)) - 1]
+        if isinstance(step, Exception):
+            raise step
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=step))])
+
+def make_service(completions, retry_policy=None, breaker=None, timeout=5.0):
+    """构造使用独立限流、重试和熔断实例的异步AI服务"""
+    service = AsyncAIService()
+    service.cache = None
+    service.rate_limiter = RateLimiter(0, 0)
+    service.concurrency = AdaptiveConcurrencyLimiter(initial=4, maximum=4)
+    service.retry_policy = retry_policy or RetryPolicy(max_retries=2, base_delay=0.0)
+    service.breaker = breaker or CircuitBreaker()
+    service.timeout = timeout
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return service
+
+def test_retry_policy_only_retries_retryable_errors():
+    """测试仅对可重试错误重试，且受次数和累计耗时限制"""
+    policy = RetryPolicy(max_retries=2, base_delay=1.0, max_delay=8.0, max_elapsed=60.0)
+    
+    assert policy.next_delay(FakeStatusError(400), 0, 0.0) is None
+    assert 0 <= policy.next_delay(FakeStatusError(503), 1, 0.0) <= 2.0
+    assert policy.next_delay(FakeStatusError(503), 2, 0.0) is None
+    assert policy.next_delay(FakeStatusError(429), 0, 60.0) is None
+    assert not is_retryable_error(CircuitOpenError())
+
+def test_circuit_breaker_opens_and_recovers_after_probe():
+    """测试熔断器连续失败后打开，恢复期后只放行一个探测请求"""
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+    
+    breaker.record_failure(FakeStatusError(503))
+    breaker.before_call()
+    breaker.record_failure(FakeStatusError(503))
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    
+    time.sleep(0.06)
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+def test_circuit_breaker_reopens_when_probe_fails():
+    """测试探测请求失败时熔断器重新打开"""
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+    breaker.record_failure(FakeStatusError(429))
+    time.sleep(0.06)
+    
+    breaker.before_call()
+    breaker.record_failure(FakeStatusError(429))
+    
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_transient_error_is_retried():
+    """测试瞬时5xx错误重试后返回真实结果"""
+    completions = ScriptedCompletions(
+        FakeStatusError(503),
+        json.dumps({"score": 88, "explanation": "技能匹配"}, ensure_ascii=False)
+    )
+    service = make_service(completions)
+    
+    result = asyncio.run(service.match_resume_to_job("熟悉Python", "Python开发工程师"))
+    
+    assert result == {"score": 88, "explanation": "技能匹配"}
+    assert len(completions.calls) == 2
+    assert completions.calls[0]["timeout"] == service.timeout
+
+def test_open_breaker_fails_fast_with_heuristic_match():
+    """测试熔断打开时不调用模型，匹配回退到本地启发式评分"""
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure(FakeStatusError(503))
+    completions = ScriptedCompletions(json.dumps({"score": 88, "explanation": "技能匹配"}))
+    service = make_service(completions, breaker=breaker)
+    
+    result = asyncio.run(service.match_resume_to_job("熟悉Python和FastAPI", "Python FastAPI Docker"))
+    
+    assert completions.calls == []
+    assert result["score"] == 67
+    assert "模型服务暂不可用" in result["explanation"]
+    assert result["degraded"] is True
+
+def test_call_timeout_bounds_latency(monkeypatch):
+    """测试单次调用超时后不会无限等待"""
+    monkeypatch.setattr(settings, "TAGGER_MODE", "llm")
+    completions = ScriptedCompletions(json.dumps({"tags": ["Python"]}), delay=1.0)
+    service = make_service(completions, retry_policy=RetryPolicy(max_retries=1, base_delay=0.0), timeout=0.05)
+    
+    started = time.monotonic()
+    result = asyncio.run(service.extract_job_tags("Python开发工程师"))
+    
+    assert result == []
+    assert len(completions.calls) == 2
+    assert time.monotonic() - started < 0.5
@@ -1,8 +1,17 @@
 """
 AI服务测试模块
 """
+import asyncio
+import json
+import threading
 import pytest
+from types import SimpleNamespace
+from app.core.config import settings
+from app.services.ai_cache import LLMCache
+from app.services.ai_throttle import AdaptiveConcurrencyLimiter
+from app.services.ai_service import AsyncAIService, _plan_match_batches
 from app.services.service_factory import get_ai_service
+from tests.conftest import make_async_client, make_completion
 
 class TestAIService:
     """AI服务测试类"""
@@ -160,3 +169,204 @@ class TestAIService:
         # 验证结果
         assert isinstance(result, dict)
         assert len(result) > 0
+
+def test_async_ai_service_awaits_async_client():
+    """测试异步AI服务通过AsyncOpenAI客户端完成调用"""
+    service = AsyncAIService()
+    service.cache = None
+    service.client = make_async_client(json.dumps({"score": 88, "explanation": "技能匹配"}))
+    
+    result = asyncio.run(service.match_resume_to_job("熟悉Python和FastAPI", "Python开发工程师"))
+    
+    assert result == {"score": 88, "explanation": "技能匹配"}
+    calls = service.client.chat.completions.calls
+    assert len(calls) == 1
+    assert calls[0]["model"] == service.model
+    assert calls[0]["response_format"] == {"type": "json_object"}
+
+def test_async_ai_service_uses_cache(tmp_path, monkeypatch):
+    """测试相同请求第二次直接命中缓存，不再调用客户端"""
+    monkeypatch.setattr(settings, "TAGGER_MODE", "llm")
+    service = AsyncAIService()
+    service.cache = LLMCache(max_entries=16, db_path=str(tmp_path / "ai_cache.db"))
+    service.client = make_async_client(json.dumps({"tags": ["Python", "FastAPI"]}))
+    
+    first = asyncio.run(service.extract_job_tags("Python开发工程师，熟悉FastAPI"))
+    second = asyncio.run(service.extract_job_tags("Python开发工程师，熟悉FastAPI"))
+    
+    assert first == second == ["Python", "FastAPI"]
+    assert len(service.client.chat.completions.calls) == 1
+    assert service.cache.stats()["memory_hits"] == 1
+
+def test_async_cache_access_runs_off_event_loop(tmp_path, monkeypatch):
+    """测试异步服务的缓存读写（含SQLite磁盘层）在线程池中执行，不阻塞事件循环"""
+    monkeypatch.setattr(settings, "TAGGER_MODE", "llm")
+    service = AsyncAIService()
+    service.cache = LLMCache(max_entries=16, db_path=str(tmp_path / "ai_cache.db"))
+    service.client = make_async_client(json.dumps({"tags": ["Python"]}))
+    threads = []
+    for name in ("get", "set"):
+        original = getattr(service.cache, name)
+        monkeypatch.setattr(service.cache, name,
+                            lambda *args, original=original: threads.append(threading.get_ident()) or original(*args))
+    
+    async def run():
+        return threading.get_ident(), await service.extract_job_tags("Python开发工程师")
+    
+    loop_thread, tags = asyncio.run(run())
+    
+    assert tags == ["Python"]
+    assert len(threads) == 2
+    assert loop_thread not in threads
+
+def test_async_analyze_resume_single_completion():
+    """测试简历综合分析只发起一次调用"""
+    service = AsyncAIService()
+    service.cache = None
+    service.client = make_async_client(json.dumps({
+        "parsed_content": {"name": "张三", "skills": ["Python"]},
+        "talent_portrait": "张三是一名Python开发工程师",
+        "tags": ["Python"]
+    }, ensure_ascii=False))
+    
+    result = asyncio.run(service.analyze_resume("姓名：张三\n技能：Python"))
+    
+    assert result["parsed_content"]["name"] == "张三"
+    assert result["talent_portrait"] == "张三是一名Python开发工程师"
+    assert result["tags"] == ["Python"]
+    assert len(service.client.chat.completions.calls) == 1
+
+def test_async_analyze_resume_falls_back_for_missing_parts(monkeypatch):
+    """测试综合分析结果缺失标签时回退到单独的标签提取调用"""
+    monkeypatch.setattr(settings, "TAGGER_MODE", "llm")
+    service = AsyncAIService()
+    service.cache = None
+    service.client = make_async_client(
+        json.dumps({"parsed_content": {"name": "张三"}, "talent_portrait": "人才画像"}, ensure_ascii=False),
+        json.dumps({"tags": ["Python"]})
+    )
+    
+    result = asyncio.run(service.analyze_resume("姓名：张三\n技能：Python"))
+    
+    assert result["parsed_content"] == {"name": "张三"}
+    assert result["tags"] == ["Python"]
+    assert len(service.client.chat.completions.calls) == 2
+
+def test_async_analyze_job_requirement_single_completion():
+    """测试招聘需求综合分析只发起一次调用"""
+    service = AsyncAIService()
+    service.cache = None
+    service.client = make_async_client(json.dumps({
+        "position_name": "Python开发工程师",
+        "department": "技术部",
+        "tags": ["Python", "FastAPI"]
+    }, ensure_ascii=False))
+    
+    result = asyncio.run(service.analyze_job_requirement("招聘Python开发工程师，熟悉FastAPI"))
+    
+    assert result["position_name"] == "Python开发工程师"
+    assert result["tags"] == ["Python", "FastAPI"]
+    assert len(service.client.chat.completions.calls) == 1
+
+def test_async_analyze_job_requirement_rejects_non_object():
+    """测试综合分析返回的JSON不是对象时回退到parse_job_requirement"""
+    service = AsyncAIService()
+    service.cache = None
+    service.client = make_async_client(
+        json.dumps(["Python开发工程师"], ensure_ascii=False),
+        json.dumps({"position_name": "Python开发工程师"}, ensure_ascii=False)
+    )
+    
+    result = asyncio.run(service.analyze_job_requirement("招聘Python开发工程师，熟悉FastAPI"))
+    
+    assert result == {"position_name": "Python开发工程师", "tags": ["Python", "FastAPI"]}
+    assert len(service.client.chat.completions.calls) == 2
+
+def test_analyze_uses_local_tagger_by_default(monkeypatch):
+    """测试默认local模式下综合分析不向大模型请求标签，标签来自本地技能词库；hybrid模式合并归一后的大模型标签"""
+    service = AsyncAIService()
+    service.cache = None
+    service.client = make_async_client(json.dumps({
+        "parsed_content": {"name": "张三"},
+        "talent_portrait": "人才画像",
+        "position_name": "Python开发工程师",
+        "tags": ["python3", "团队管理", 42]
+    }, ensure_ascii=False))
+    calls = service.client.chat.completions.calls
+    
+    resume = asyncio.run(service.analyze_resume("姓名：张三\n技能：Python、FastAPI"))
+    job = asyncio.run(service.analyze_job_requirement("招聘Python开发工程师，熟悉FastAPI"))
+    
+    assert resume["tags"] == ["Python", "FastAPI"]
+    assert job["tags"] == ["Python", "FastAPI"]
+    assert len(calls) == 2
+    assert all("tags" not in call["messages"][-1]["content"] for call in calls)
+    
+    monkeypatch.setattr(settings, "TAGGER_MODE", "hybrid")
+    resume = asyncio.run(service.analyze_resume("姓名：张三\n技能：Python、FastAPI"))
+    
+    assert resume["tags"] == ["Python", "FastAPI", "团队管理"]
+    assert "tags" in calls[-1]["messages"][-1]["content"]
+
+def test_async_match_resumes_to_job_batches_and_falls_back():
+    """测试批量匹配一次评估多份简历，缺失的简历回退到逐份匹配"""
+    service = AsyncAIService()
+    service.cache = None
+    service.client = make_async_client(
+        json.dumps({"results": [
+            {"resume_id": 1, "score": 90, "explanation": "高度匹配"},
+            {"resume_id": 2, "score": "无效分数", "explanation": "格式错误"},
+            {"resume_id": 99, "score": 60, "explanation": "不属于本批次"}
+        ]}, ensure_ascii=False),
+        json.dumps({"score": 70, "explanation": "基本匹配"}, ensure_ascii=False)
+    )
+    
+    results = asyncio.run(service.match_resumes_to_job("Python开发工程师", {1: "熟悉Python", 2: "熟悉Java", 3: ""}))
+    
+    assert set(results) == {1, 2, 3}
+    assert results[1] == {"score": 90.0, "explanation": "高度匹配"}
+    assert results[2] == {"score": 70, "explanation": "基本匹配"}
+    assert results[3]["score"] == 0
+    # 一次批量调用 + 一次逐份回退调用（空简历不调用模型）
+    assert len(service.client.chat.completions.calls) == 2
+
+def test_plan_match_batches_respects_size_and_token_budget():
+    """测试批量匹配按批量大小和token预算分批且保持顺序"""
+    resumes = [(i, "Python开发" * 10) for i in range(5)]
+    
+    assert [len(batch) for batch in _plan_match_batches("职位", resumes, 2, 100000)] == [2, 2, 1]
+    assert [len(batch) for batch in _plan_match_batches("职位", resumes, 10, 90)] == [2, 2, 1]
+    # 单份简历超出预算时独占一批
+    oversized = _plan_match_batches("职位", resumes, 2, 10)
+    assert [resume_id for batch in oversized for resume_id, _ in batch] == [0, 1, 2, 3, 4]
+    assert len(oversized) == 5
+
+def test_async_match_resumes_to_job_bounds_concurrency():
+    """测试批量匹配并发执行但不超过并发上限，结果顺序与输入一致"""
+    in_flight = 0
+    peak = 0
+    
+    class TrackingCompletions:
+        calls = []
+        
+        async def create(self, **kwargs):
+            nonlocal in_flight, peak
+            self.calls.append(kwargs)
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            # 批量响应无法解析，全部回退到逐份匹配
+            return make_completion(json.dumps({"score": 60, "explanation": "基本匹配"}, ensure_ascii=False))
+    
+    service = AsyncAIService()
+    service.cache = None
+    service.concurrency = AdaptiveConcurrencyLimiter(initial=2, maximum=2)
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=TrackingCompletions()))
+    resumes = {resume_id: f"简历{resume_id}" for resume_id in (5, 3, 8, 1, 9, 2)}
+    
+    results = asyncio.run(service.match_resumes_to_job("Python开发工程师", resumes))
+    
+    assert list(results) == [5, 3, 8, 1, 9, 2]
+    assert all(result["score"] == 60 for result in results.values())
+    assert peak == 2
@@ -1,8 +1,9 @@
 """
 AI服务模拟测试
 """
+import asyncio
 import pytest
-from app.services.ai_service_mock import AIService
+from app.services.ai_service_mock import AIService, AsyncAIService
 
 @pytest.fixture
 def ai_service():
@@ -162,3 +163,64 @@ def test_generate_recruitment_plan(ai_service):
     assert len(result["candidate_recommendations"]) > 0
     assert "candidate_id" in result["candidate_recommendations"][0]
     assert "recommendation_reason" in result["candidate_recommendations"][0]
+
+def test_async_ai_service_matches_sync(ai_service):
+    """测试异步模拟服务与同步模拟服务结果一致"""
+    async_service = AsyncAIService()
+    ocr_content = "姓名：王五\n学历：硕士\n技能：Java, Spring\n工作经验：5年"
+    
+    # 调用方法
+    result = asyncio.run(async_service.parse_resume(ocr_content))
+    
+    # 验证结果
+    assert result == ai_service.parse_resume(ocr_content)
+    assert result.get("name") == "王五"
+
+def test_analyze_resume(ai_service):
+    """测试简历综合分析返回解析结果、人才画像和标签"""
+    # 准备测试数据
+    ocr_content = """
+    姓名：张三
+    学历：本科
+    技能：Python, FastAPI, Docker
+    工作经验：3年
+    """
+    
+    # 调用方法
+    result = ai_service.analyze_resume(ocr_content)
+    
+    # 验证结果
+    assert result["parsed_content"].get("name") == "张三"
+    assert "张三" in result["talent_portrait"]
+    assert "Python" in result["tags"]
+    assert "Docker" in result["tags"]
+
+def test_analyze_job_requirement(ai_service):
+    """测试招聘需求综合分析同时返回解析字段和标签"""
+    # 调用方法
+    result = ai_service.analyze_job_requirement("招聘Python开发工程师，熟悉FastAPI和Docker")
+    
+    # 验证结果
+    assert result["position_name"] == "Python开发工程师"
+    assert "Python" in result["tags"]
+    assert ai_service.analyze_job_requirement("") == {}
+
+def test_async_combined_analysis_matches_sync(ai_service):
+    """测试异步模拟服务的综合分析结果与同步实现一致"""
+    async_service = AsyncAIService()
+    ocr_content = "姓名：王五\n技能：Java, Spring"
+    document_content = "招聘Java开发工程师"
+    
+    # 验证结果
+    assert asyncio.run(async_service.analyze_resume(ocr_content)) == ai_service.analyze_resume(ocr_content)
+    assert asyncio.run(async_service.analyze_job_requirement(document_content)) == ai_service.analyze_job_requirement(document_content)
+
+def test_match_resumes_to_job(ai_service):
+    """测试批量匹配按简历ID返回每份简历的匹配结果"""
+    # 调用方法
+    results = ai_service.match_resumes_to_job("Python开发工程师", {1: "熟悉Python", 2: ""})
+    
+    # 验证结果
+    assert set(results) == {1, 2}
+    assert results[1]["score"] == 75
+    assert results[2]["score"] == 0
@@ -0,0 +1,105 @@
+"""
+AI调用限流测试模块
+"""
+import asyncio
+import json
+import pytest
+from types import SimpleNamespace
+from app.core.config import settings
+from app.services.ai_service import AsyncAIService
+from app.services.ai_resilience import RetryPolicy, CircuitBreaker
+from app.services.ai_throttle import (
+    TokenBucket, RateLimiter, AdaptiveConcurrencyLimiter, is_overload_error
+)
+from tests.conftest import FakeStatusError
+
+def test_token_bucket_returns_wait_when_exhausted():
+    """测试令牌桶耗尽后按补充速率计算等待时间"""
+    bucket = TokenBucket(rate_per_minute=60)
+    
+    assert bucket.reserve(60) == 0.0
+    # 每秒补充1个令牌，再预留2个约需等待2秒
+    assert bucket.reserve(2) == pytest.approx(2.0, abs=0.05)
+
+def test_rate_limiter_zero_quota_is_unlimited():
+    """测试配额为0时不限流"""
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+    
+    assert limiter.acquire(10 ** 9) == 0.0
+
+def test_rate_limiter_applies_token_budget():
+    """测试TPM配额不足时需要等待"""
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=600)
+    
+    assert limiter._reserve(600) == 0.0
+    assert limiter._reserve(20) == pytest.approx(2.0, abs=0.05)
+
+def test_is_overload_error():
+    """测试过载错误识别"""
+    assert is_overload_error(FakeStatusError(429))
+    assert is_overload_error(FakeStatusError(503))
+    assert is_overload_error(asyncio.TimeoutError())
+    assert not is_overload_error(FakeStatusError(400))
+    assert not is_overload_error(ValueError("bad json"))
+
+def test_adaptive_concurrency_aimd():
+    """测试并发上限在成功时加性增长、过载时乘性下降且冷却期内只下降一次"""
+    limiter = AdaptiveConcurrencyLimiter(initial=8, minimum=1, maximum=16, backoff_cooldown=60)
+    
+    limiter.acquire()
+    limiter.release(success=False, overloaded=True)
+    assert limiter.limit == 4
+    
+    limiter.acquire()
+    limiter.release(success=False, overloaded=True)
+    assert limiter.limit == 4
+    
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release()
+    assert 5 <= limiter.limit <= 16
+    assert limiter.in_flight == 0
+
+def test_adaptive_concurrency_bounds_async_waiters():
+    """测试异步等待者在名额释放后依次获得执行机会"""
+    limiter = AdaptiveConcurrencyLimiter(initial=2, maximum=2)
+    in_flight = 0
+    peak = 0
+    
+    async def worker():
+        nonlocal in_flight, peak
+        await limiter.acquire_async()
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        limiter.release()
+    
+    async def main():
+        await asyncio.gather(*(worker() for _ in range(6)))
+    
+    asyncio.run(main())
+    
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+def test_async_complete_backs_off_on_rate_limit(monkeypatch):
+    """测试模型返回429时并发上限下降且名额被归还"""
+    monkeypatch.setattr(settings, "TAGGER_MODE", "llm")
+    class RateLimitedCompletions:
+        async def create(self, **kwargs):
+            raise FakeStatusError(429)
+    
+    service = AsyncAIService()
+    service.cache = None
+    service.rate_limiter = RateLimiter(0, 0)
+    service.concurrency = AdaptiveConcurrencyLimiter(initial=4, maximum=4)
+    service.retry_policy = RetryPolicy(max_retries=0)
+    service.breaker = CircuitBreaker()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=RateLimitedCompletions()))
+    
+    result = asyncio.run(service.extract_job_tags("Python开发工程师"))
+    
+    assert result == []
+    assert service.concurrency.limit == 2
+    assert service.concurrency.in_flight == 0
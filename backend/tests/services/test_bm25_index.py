@@ -0,0 +1,178 @@
+"""
+BM25词法索引测试
+"""
+import threading
+import pytest
+from app.models.resume import Resume
+from app.core.config import settings
+from app.services.bm25_index import BM25Index, ResumeBM25Index
+from app.utils.tokenizer import term_id
+from app.services.service_factory import get_async_ai_service
+
+@pytest.fixture
+def index():
+    """提供包含中英文简历的BM25索引"""
+    bm25 = BM25Index()
+    bm25.load([
+        (1, "五年Python后端开发经验，熟悉FastAPI和MySQL，负责推荐系统开发"),
+        (2, "Java开发工程师，熟悉Spring Boot和MySQL"),
+        (3, "平面设计师，精通Photoshop和Illustrator"),
+    ])
+    return bm25
+
+def test_search_ranks_chinese_and_english_terms(index):
+    """测试中英文混合查询的BM25排序"""
+    results = index.search("Python后端开发 FastAPI", 3)
+    
+    assert [doc_id for doc_id, _ in results][:2] == [1, 2]
+    assert 3 not in [doc_id for doc_id, _ in results]
+    assert index.search("平面设计", 3)[0][0] == 3
+
+def test_incremental_add_update_remove(index):
+    """测试增量新增、更新和删除"""
+    index.add(4, "Golang 微服务")
+    assert index.search("golang", 1)[0][0] == 4
+    
+    index.add(4, "Rust 系统编程")
+    assert index.search("golang", 1) == []
+    assert index.search("rust", 1)[0][0] == 4
+    
+    assert index.remove(4)
+    assert not index.remove(4)
+    assert 4 not in index
+    assert term_id("rust") not in index._postings
+    assert index._total_length == sum(index._doc_lengths.values())
+
+def test_upsert_during_build_is_not_lost():
+    """测试构建进行中的简历写入在构建完成后生效，而不是因未构建被忽略"""
+    bm25 = ResumeBM25Index()
+    resume = Resume(id=7, candidate_name="张三", ocr_content="Golang 微服务")
+    
+    # 持有索引锁模拟构建进行中：写入线程需等待构建完成
+    with bm25._lock:
+        writer = threading.Thread(target=bm25.upsert_resume, args=(resume,))
+        writer.start()
+        writer.join(0.1)
+        assert writer.is_alive()
+        bm25.load([])
+        bm25._built = True
+    writer.join()
+    assert 7 in bm25
+
+def test_vectorized_search_matches_scoring(index):
+    """测试全量检索（向量化累加）与逐文档打分结果一致，且增删后缓存失效"""
+    query = "后端开发 MySQL Spring"
+    expected = sorted(index.score(query).items(), key=lambda item: item[1], reverse=True)
+    
+    results = index.search(query, 10)
+    assert [doc_id for doc_id, _ in results] == [doc_id for doc_id, _ in expected]
+    assert [round(score, 6) for _, score in results] == [round(score, 6) for _, score in expected]
+    assert [doc_id for doc_id, _ in index.search("MySQL Spring", 10, max_terms=1)] == [2]
+    
+    index.add(5, "Spring Spring Spring MySQL")
+    assert index.search("spring", 1)[0][0] == 5
+    index.remove(5)
+    assert index.search("spring", 1)[0][0] == 2
+
+def test_match_normalizes_scores(index):
+    """测试本地匹配评估分数在0-100之间，并说明命中的关键词"""
+    results = index.match("Python FastAPI MySQL", [1, 2, 3, 99])
+    
+    assert set(results) == {1, 2, 3}
+    assert 0 <= results[3]["score"] < results[2]["score"] < results[1]["score"] <= 100
+    assert results[3]["score"] == 0
+    assert "3/3" in results[1]["explanation"]
+    assert "mysql" in results[2]["explanation"]
+
+def _setup_job_and_resumes(client, db):
+    """创建测试职位和简历"""
+    for name, content in (("张三", "Python FastAPI MySQL 后端开发"), ("李四", "平面设计 Photoshop")):
+        db.add(Resume(candidate_name=name, file_url=f"/uploads/{name}.pdf", file_type="application/pdf",
+                      ocr_content=content))
+    db.commit()
+    response = client.post("/api/v1/jobs", json={
+        "position_name": "Python开发工程师",
+        "department": "技术部",
+        "responsibilities": "后端开发",
+        "requirements": "Python FastAPI MySQL"
+    })
+    return response.json()["id"]
+
+def test_local_scoring_skips_llm(client, db, monkeypatch):
+    """测试local评分模式不调用大模型"""
+    job_id = _setup_job_and_resumes(client, db)
+    ai_service = get_async_ai_service()
+    
+    async def fail(*args, **kwargs):
+        raise AssertionError("不应调用大模型")
+    monkeypatch.setattr(ai_service, "match_resume_to_job", fail)
+    monkeypatch.setattr(ai_service, "match_resumes_to_job", fail)
+    
+    response = client.post("/api/v1/matches?scoring=local", json={
+        "resume_id": 1, "job_id": job_id, "match_score": 0
+    })
+    assert response.status_code == 201
+    assert "BM25" in response.json()["match_explanation"]
+    
+    response = client.post("/api/v1/matches/batch?scoring=local", json={"job_id": job_id, "resume_ids": [1, 2]})
+    assert response.status_code == 200
+    scores = {match["resume_id"]: match["match_score"] for match in response.json()}
+    assert scores[2] < scores[1]
+    
+    response = client.post("/api/v1/matches/batch?scoring=unknown", json={"job_id": job_id, "resume_ids": [1]})
+    assert response.status_code == 422
+
+def test_hybrid_scoring_escalates_borderline(client, db, monkeypatch):
+    """测试hybrid评分模式只把边界分数的简历交给大模型"""
+    job_id = _setup_job_and_resumes(client, db)
+    ai_service = get_async_ai_service()
+    escalated = []
+    
+    async def match_resumes_to_job(job_requirements, resumes):
+        escalated.extend(resumes)
+        return {resume_id: {"score": 60, "explanation": "大模型评估"} for resume_id in resumes}
+    monkeypatch.setattr(ai_service, "match_resumes_to_job", match_resumes_to_job)
+    # 不匹配的简历本地分数为0，直接采用；匹配的简历处于边界区间，交给大模型
+    monkeypatch.setattr(settings, "MATCH_HYBRID_HIGH_SCORE", 101)
+    
+    response = client.post("/api/v1/matches/batch?scoring=hybrid", json={"job_id": job_id, "resume_ids": [1, 2]})
+    
+    assert response.status_code == 200
+    explanations = {match["resume_id"]: match["match_explanation"] for match in response.json()}
+    assert escalated == [1]
+    assert explanations[1] == "大模型评估"
+    assert "BM25" in explanations[2]
+
+def test_degraded_matches_are_rescored(client, db, monkeypatch):
+    """测试降级评估结果标记后在下次匹配请求时重新评估，未获得评估结果的简历不保存"""
+    job_id = _setup_job_and_resumes(client, db)
+    ai_service = get_async_ai_service()
+    requested = []
+    
+    async def degraded(job_requirements, resumes):
+        requested.append(sorted(resumes))
+        return {1: {"score": 40, "explanation": "模型服务暂不可用，基于关键词覆盖率估算", "degraded": True}}
+    monkeypatch.setattr(ai_service, "match_resumes_to_job", degraded)
+    
+    response = client.post("/api/v1/matches/batch", json={"job_id": job_id, "resume_ids": [1, 2]})
+    assert response.status_code == 200
+    first = response.json()
+    assert [(match["resume_id"], match["is_degraded"]) for match in first] == [(1, True)]
+    
+    async def recovered(job_requirements, resumes):
+        requested.append(sorted(resumes))
+        return {resume_id: {"score": 80, "explanation": "大模型评估"} for resume_id in resumes}
+    monkeypatch.setattr(ai_service, "match_resumes_to_job", recovered)
+    
+    response = client.post("/api/v1/matches/batch", json={"job_id": job_id, "resume_ids": [1, 2]})
+    assert response.status_code == 200
+    second = response.json()
+    assert requested == [[1, 2], [1, 2]]
+    assert [(match["resume_id"], match["match_score"], match["is_degraded"]) for match in second] == [
+        (1, 80, False), (2, 80, False)
+    ]
+    assert second[0]["id"] == first[0]["id"]
+    
+    # 正常评估的记录不再重新评估
+    response = client.post("/api/v1/matches", json={"resume_id": 1, "job_id": job_id, "match_score": 0})
+    assert response.status_code == 400
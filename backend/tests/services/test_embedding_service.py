@@ -0,0 +1,185 @@
+"""
+文本向量服务测试
+"""
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from app.core.config import settings
+from app.models.embedding import Embedding
+from app.models.resume import Resume
+from app.models.job_requirement import JobRequirement
+from app.services.ai_resilience import CircuitBreaker, RetryPolicy
+from app.services.embedding_service import (
+    EmbeddingService, HashingEmbedder, OpenAIEmbedder, RESUME, JOB, top_k
+)
+from app.services.service_factory import get_embedding_service
+
+@pytest.fixture
+def service():
+    """提供使用本地哈希向量化的向量服务"""
+    return EmbeddingService(HashingEmbedder(64))
+
+def _resume(db, name, content):
+    """创建测试简历"""
+    resume = Resume(candidate_name=name, file_url=f"/uploads/{name}.pdf", file_type="application/pdf",
+                    ocr_content=content)
+    db.add(resume)
+    db.commit()
+    return resume
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    """测试哈希向量化结果确定且按行归一化"""
+    embedder = HashingEmbedder(64)
+    matrix = embedder.embed(["Python 后端开发", "Python 后端开发", ""])
+    
+    assert matrix.shape == (3, 64)
+    assert matrix.dtype == np.float32
+    assert np.allclose(matrix[0], matrix[1])
+    assert np.isclose(np.linalg.norm(matrix[0]), 1.0)
+    assert not matrix[2].any()
+
+def test_top_k_returns_positions_by_descending_score():
+    """测试top_k按分数降序返回位置，k超过长度时返回全部"""
+    scores = np.array([0.1, 0.9, 0.5, 0.7], dtype=np.float32)
+    
+    assert top_k(scores, 2).tolist() == [1, 3]
+    assert top_k(scores, 10).tolist() == [1, 3, 2, 0]
+    assert top_k(scores, 0).tolist() == []
+
+def test_upsert_skips_unchanged_text(db, service, monkeypatch):
+    """测试源文本未变化时不重新向量化"""
+    service.upsert(db, RESUME, 1, "Python 开发")
+    db.commit()
+    
+    calls = []
+    original = service.embed_text
+    monkeypatch.setattr(service, "embed_text", lambda text: calls.append(text) or original(text))
+    service.upsert(db, RESUME, 1, "Python 开发")
+    assert calls == []
+    
+    service.upsert(db, RESUME, 1, "Java 开发")
+    db.commit()
+    assert calls == ["Java 开发"]
+    assert db.query(Embedding).count() == 1
+
+def test_load_job_vectors_and_vector_are_read_only(db, service):
+    """测试加载招聘需求向量时缺失的向量只在内存中计算，读取向量均不写入数据库"""
+    job = JobRequirement(position_name="Python开发工程师", department="技术部",
+                         responsibilities="后端开发", requirements="Python FastAPI MySQL")
+    db.add(job)
+    db.commit()
+    
+    ids, matrix = service.load_job_vectors(db)
+    
+    assert ids.tolist() == [job.id]
+    assert np.isclose(np.linalg.norm(matrix[0]), 1.0)
+    assert db.query(Embedding).filter(Embedding.owner_type == JOB).count() == 0
+    
+    resume = _resume(db, "张三", "Python FastAPI 后端开发 MySQL")
+    vector = service.vector(db, RESUME, resume.id, "Python FastAPI 后端开发 MySQL")
+    assert float(matrix[0] @ vector) > 0
+    assert db.query(Embedding).filter(Embedding.owner_type == RESUME).count() == 0
+    
+    service.upsert(db, RESUME, resume.id, "Python FastAPI 后端开发 MySQL")
+    db.commit()
+    assert np.allclose(service.vector(db, RESUME, resume.id, "Python FastAPI 后端开发 MySQL"), vector)
+
+class FakeEmbeddings:
+    """模拟OpenAI的embeddings接口：第一次返回503，之后按请求的维度返回向量"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if len(self.calls) == 1:
+            raise type("APIStatusError", (Exception,), {"status_code": 503})("服务暂不可用")
+        dim = kwargs.get("dimensions", 1536)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[1.0] * dim) for _ in kwargs["input"]])
+
+def test_openai_embedder_dimensions_and_retry(monkeypatch):
+    """测试OpenAI向量化：text-embedding-3按维度请求并经重试策略重试，固定维度模型拒绝截断"""
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    with pytest.raises(ValueError):
+        OpenAIEmbedder("text-embedding-ada-002", 256)
+    
+    embedder = OpenAIEmbedder("text-embedding-3-small", 8)
+    embedder.client = SimpleNamespace(embeddings=FakeEmbeddings())
+    embedder.retry_policy = RetryPolicy(max_retries=2, base_delay=0.0, max_delay=0.0)
+    embedder.breaker = CircuitBreaker()
+    
+    matrix = embedder.embed(["Python", ""])
+    
+    calls = embedder.client.embeddings.calls
+    assert len(calls) == 2
+    assert calls[-1]["dimensions"] == 8 and calls[-1]["input"] == ["Python"]
+    assert matrix.shape == (2, 8)
+    assert np.isclose(np.linalg.norm(matrix[0]), 1.0) and not matrix[1].any()
+    
+    ada = OpenAIEmbedder("text-embedding-ada-002", 1536)
+    ada.client = SimpleNamespace(embeddings=FakeEmbeddings())
+    ada.retry_policy = embedder.retry_policy
+    ada.breaker = CircuitBreaker()
+    assert ada.embed(["Python"]).shape == (1, 1536)
+    assert "dimensions" not in ada.client.embeddings.calls[-1]
+
+def test_vectors_computed_before_write_transaction(client, db, monkeypatch):
+    """测试简历和职位的向量在写入数据库之前计算，不在持有写锁的事务中调用向量化后端"""
+    embedder = get_embedding_service().embedder
+    original = embedder.embed
+    pending = []
+    
+    def embed(texts):
+        pending.append(db.query(Resume).count() + db.query(JobRequirement).count() + len(db.new) + len(db.dirty))
+        return original(texts)
+    monkeypatch.setattr(embedder, "embed", embed)
+    
+    response = client.post("/api/v1/resumes", json={
+        "candidate_name": "张三", "file_url": "/uploads/resumes/test.pdf",
+        "file_type": "application/pdf", "ocr_content": "Python 后端开发"
+    })
+    assert response.status_code == 201
+    db.query(Resume).delete()
+    db.commit()
+    response = client.post("/api/v1/jobs", json={
+        "position_name": "Python开发工程师", "department": "技术部",
+        "responsibilities": "后端开发", "requirements": "Python FastAPI"
+    })
+    assert response.status_code == 201
+    
+    assert pending == [0, 0]
+    assert db.query(Embedding).count() == 2
+
+def test_resume_api_keeps_vectors_in_sync(client, db):
+    """测试通过API创建和删除简历时同步写入和删除向量"""
+    response = client.post("/api/v1/resumes", json={
+        "candidate_name": "张三",
+        "file_url": "/uploads/resumes/test.pdf",
+        "file_type": "application/pdf",
+        "ocr_content": "Python 后端开发"
+    })
+    assert response.status_code == 201
+    resume_id = response.json()["id"]
+    assert db.query(Embedding).filter(Embedding.owner_type == RESUME, Embedding.owner_id == resume_id).count() == 1
+    
+    response = client.delete(f"/api/v1/resumes/{resume_id}")
+    assert response.status_code in (200, 204)
+    assert db.query(Embedding).filter(Embedding.owner_type == RESUME, Embedding.owner_id == resume_id).count() == 0
+
+def test_batch_matches_retrieve_top_k(client, db):
+    """测试批量匹配未指定简历时先按向量召回top_k份再评分"""
+    python_resume = _resume(db, "张三", "Python FastAPI 后端开发")
+    _resume(db, "李四", "平面设计 Photoshop")
+    response = client.post("/api/v1/jobs", json={
+        "position_name": "Python开发工程师",
+        "department": "技术部",
+        "responsibilities": "后端开发",
+        "requirements": "Python FastAPI"
+    })
+    job_id = response.json()["id"]
+    
+    response = client.post("/api/v1/matches/batch", json={"job_id": job_id, "top_k": 1})
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert [match["resume_id"] for match in data] == [python_resume.id]
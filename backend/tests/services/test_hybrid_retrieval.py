@@ -0,0 +1,55 @@
+"""
+混合召回测试
+"""
+from app.models.resume import Resume
+from app.services.hybrid_retrieval import reciprocal_rank_fusion
+from app.services.service_factory import get_async_ai_service
+
+def test_reciprocal_rank_fusion():
+    """测试倒数排名融合：两路都靠前的简历排第一，只被一路召回的简历另一路排名为空"""
+    results = reciprocal_rank_fusion({
+        "lexical": [(1, 9.0), (2, 5.0), (3, 1.0)],
+        "vector": [(2, 0.9), (4, 0.8), (1, 0.1)],
+    }, k=3, constant=60)
+    
+    assert [item["resume_id"] for item in results] == [2, 1, 4]
+    assert results[0]["score"] == 1 / 62 + 1 / 61
+    assert results[0]["lexical_rank"] == 2 and results[0]["vector_score"] == 0.9
+    assert results[2]["lexical_rank"] is None and results[2]["lexical_score"] is None
+    assert results[2]["vector_rank"] == 2
+
+def test_job_candidates_endpoint(client, db, monkeypatch):
+    """测试职位候选简历接口返回融合排名，且不调用大模型"""
+    contents = {
+        "张三": "Python FastAPI MySQL 后端开发 五年经验",
+        "李四": "Java Spring MySQL 后端开发",
+        "王五": "平面设计 Photoshop Illustrator",
+    }
+    for name, content in contents.items():
+        db.add(Resume(candidate_name=name, file_url=f"/uploads/{name}.pdf", file_type="application/pdf",
+                      ocr_content=content))
+    db.commit()
+    ai_service = get_async_ai_service()
+    
+    async def fail(*args, **kwargs):
+        raise AssertionError("不应调用大模型")
+    for method in ("parse_job_requirement", "match_resume_to_job", "match_resumes_to_job"):
+        monkeypatch.setattr(ai_service, method, fail)
+    job = client.post("/api/v1/jobs", json={
+        "position_name": "Python后端开发工程师",
+        "department": "技术部",
+        "responsibilities": "后端开发",
+        "requirements": "Python FastAPI MySQL",
+        "tags": ["Python"]
+    }).json()
+    
+    response = client.get(f"/api/v1/jobs/{job['id']}/candidates?k=2")
+    
+    assert response.status_code == 200
+    candidates = response.json()
+    assert [candidate["resume_id"] for candidate in candidates] == [1, 2]
+    assert candidates[0]["lexical_rank"] == 1 and candidates[0]["vector_rank"] == 1
+    assert candidates[0]["score"] > candidates[1]["score"]
+    
+    assert client.get("/api/v1/jobs/999/candidates").status_code == 404
+    assert client.get(f"/api/v1/jobs/{job['id']}/candidates?k=0").status_code == 422
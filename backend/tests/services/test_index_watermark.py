@@ -0,0 +1,73 @@
+"""
+索引数据水位测试（模拟多worker部署时其他进程的写入）
+"""
+from app.models.resume import Resume
+from app.models.job_requirement import JobRequirement
+from app.services.bm25_index import ResumeBM25Index
+from app.services.embedding_service import EmbeddingService, HashingEmbedder
+from app.services.index_watermark import TableWatermark
+from app.services.job_index import JobIndex
+
+def _resume(db, name, content):
+    """直接写入数据库的简历（不经过本进程的索引）"""
+    resume = Resume(candidate_name=name, file_url=f"/uploads/{name}.pdf", file_type="application/pdf",
+                    ocr_content=content)
+    db.add(resume)
+    db.commit()
+    return resume
+
+def test_watermark_reports_changed_rows(db):
+    """测试水位未变化时不返回，变化时返回上次水位以来更新过的行和当前行数，并按间隔节流"""
+    first = _resume(db, "张三", "Python")
+    watermark = TableWatermark(Resume, interval=0)
+    watermark.reset(db)
+    assert watermark.poll(db) is None
+    
+    second = _resume(db, "李四", "Java")
+    changed, count = watermark.poll(db)
+    assert second.id in changed and count == 2
+    assert watermark.poll(db) is None
+    
+    # 检查间隔内不查询数据库
+    throttled = TableWatermark(Resume, interval=3600)
+    throttled.reset(db)
+    first.ocr_content = "Golang"
+    db.commit()
+    assert throttled.poll(db) is None
+
+def test_resume_bm25_index_syncs_writes_from_other_processes(db):
+    """测试简历BM25索引发现其他进程的新增、更新和删除"""
+    kept = _resume(db, "张三", "Python 后端开发")
+    removed = _resume(db, "李四", "Java 后端开发")
+    bm25 = ResumeBM25Index(sync_interval=0)
+    bm25.ensure_built(db)
+    
+    added = _resume(db, "王五", "Golang 微服务")
+    kept.ocr_content = "Rust 系统编程"
+    db.delete(removed)
+    db.commit()
+    
+    bm25.ensure_built(db)
+    assert added.id in bm25 and removed.id not in bm25
+    assert bm25.search("rust", 1)[0][0] == kept.id
+    assert bm25.search("python", 1) == []
+
+def test_job_index_syncs_writes_from_other_processes(db):
+    """测试招聘需求索引发现其他进程的新增和删除"""
+    job = JobRequirement(position_name="Python工程师", responsibilities="后端开发", requirements="Python")
+    db.add(job)
+    db.commit()
+    job_index = JobIndex(EmbeddingService(HashingEmbedder(64)), sync_interval=0)
+    job_index.ensure_built(db)
+    assert len(job_index) == 1
+    
+    other = JobRequirement(position_name="Java工程师", responsibilities="后端开发", requirements="Java")
+    db.add(other)
+    db.commit()
+    job_index.ensure_built(db)
+    assert set(job_index._vectors) == {job.id, other.id}
+    
+    db.delete(job)
+    db.commit()
+    job_index.ensure_built(db)
+    assert set(job_index._vectors) == {other.id}
@@ -0,0 +1,106 @@
+"""
+招聘需求索引和职位推荐测试
+"""
+from types import SimpleNamespace
+from app.models.embedding import Embedding
+from app.models.resume import Resume
+from app.models.tag import Tag
+from app.services.embedding_service import JOB, RESUME
+from app.services.service_factory import get_async_ai_service, get_job_index
+
+def _setup(client, db, monkeypatch):
+    """创建带标签的简历和三个职位（职位标签由请求指定）"""
+    ai_service = get_async_ai_service()
+    job_tags = {}
+    
+    async def extract_job_tags(job_description):
+        return job_tags.get(job_description.split("\n")[0], [])
+    monkeypatch.setattr(ai_service, "extract_job_tags", extract_job_tags)
+    
+    resume = Resume(candidate_name="张三", file_url="/uploads/张三.pdf", file_type="application/pdf",
+                    ocr_content="五年Python后端开发经验，熟悉FastAPI和MySQL")
+    resume.tags = [Tag(name="Python", category="技能"), Tag(name="MySQL", category="技能")]
+    db.add(resume)
+    db.commit()
+    
+    job_ids = {}
+    for name, requirements, tags in (
+        ("Python后端工程师", "熟悉Python FastAPI MySQL", ["python", "mysql"]),
+        ("Java工程师", "熟悉Java Spring MySQL", ["java", "mysql"]),
+        ("平面设计师", "精通Photoshop", ["photoshop"]),
+    ):
+        job_tags[name] = tags
+        response = client.post("/api/v1/jobs", json={
+            "position_name": name, "department": "技术部", "responsibilities": name, "requirements": requirements
+        })
+        job_ids[name] = response.json()["id"]
+    return resume.id, job_ids
+
+def test_recommended_jobs_without_llm(client, db, monkeypatch):
+    """测试职位推荐融合向量、标签、词法三路排名，且默认不调用大模型"""
+    resume_id, job_ids = _setup(client, db, monkeypatch)
+    
+    async def fail(*args, **kwargs):
+        raise AssertionError("不应调用大模型")
+    monkeypatch.setattr(get_async_ai_service(), "match_resume_to_job", fail)
+    
+    response = client.get(f"/api/v1/resumes/{resume_id}/recommended-jobs?k=3")
+    
+    assert response.status_code == 200
+    jobs = response.json()
+    assert jobs[0]["job_id"] == job_ids["Python后端工程师"]
+    assert jobs[0]["position_name"] == "Python后端工程师"
+    assert jobs[0]["tag_score"] == 1.0 and jobs[0]["vector_rank"] == 1 and jobs[0]["lexical_rank"] == 1
+    assert jobs[1]["job_id"] == job_ids["Java工程师"]
+    assert jobs[1]["tag_score"] == 0.5
+    assert jobs[0]["match_score"] is None
+    assert client.get("/api/v1/resumes/999/recommended-jobs").status_code == 404
+    # 推荐为只读请求：不补写简历向量
+    assert db.query(Embedding).filter(Embedding.owner_type == RESUME).count() == 0
+
+def test_recommended_jobs_follow_job_writes_and_rescore(client, db, monkeypatch):
+    """测试职位增删改后推荐结果同步更新，以及只对前几个职位调用大模型重新评分"""
+    resume_id, job_ids = _setup(client, db, monkeypatch)
+    client.get(f"/api/v1/resumes/{resume_id}/recommended-jobs")
+    
+    client.put(f"/api/v1/jobs/{job_ids['平面设计师']}", json={
+        "position_name": "Python数据工程师", "requirements": "Python FastAPI MySQL 数据分析", "tags": ["python", "mysql"]
+    })
+    client.delete(f"/api/v1/jobs/{job_ids['Java工程师']}")
+    scored = []
+    
+    async def match_resume_to_job(resume_content, job_requirements):
+        scored.append(job_requirements.split("\n")[0])
+        return {"score": 90 if job_requirements.startswith("Python数据") else 70, "explanation": "大模型评估"}
+    monkeypatch.setattr(get_async_ai_service(), "match_resume_to_job", match_resume_to_job)
+    
+    response = client.get(f"/api/v1/resumes/{resume_id}/recommended-jobs?k=5&rescore=2")
+    
+    jobs = response.json()
+    assert {job["job_id"] for job in jobs} == {job_ids["Python后端工程师"], job_ids["平面设计师"]}
+    assert sorted(scored) == ["Python后端工程师", "Python数据工程师"]
+    assert [job["match_score"] for job in jobs] == [90, 70]
+    assert jobs[0]["position_name"] == "Python数据工程师"
+
+def test_recommended_jobs_do_not_write_job_vectors(client, db, monkeypatch):
+    """测试职位向量缺失时推荐请求只在内存中计算，不写入数据库；构建期间写入的职位构建后仍为过期"""
+    resume_id, job_ids = _setup(client, db, monkeypatch)
+    db.query(Embedding).filter(Embedding.owner_type == JOB).delete()
+    db.commit()
+    
+    job_index = get_job_index()
+    fetch = job_index._fetch
+    
+    def fetch_with_concurrent_write(db, ids=None):
+        result = fetch(db, ids)
+        if ids is None:
+            job_index.upsert_job(SimpleNamespace(id=job_ids["Java工程师"]))
+        return result
+    monkeypatch.setattr(job_index, "_fetch", fetch_with_concurrent_write)
+    
+    response = client.get(f"/api/v1/resumes/{resume_id}/recommended-jobs?k=3")
+    
+    assert response.status_code == 200
+    assert response.json()[0]["job_id"] == job_ids["Python后端工程师"]
+    assert db.query(Embedding).filter(Embedding.owner_type == JOB).count() == 0
+    assert job_index._stale == {job_ids["Java工程师"]}
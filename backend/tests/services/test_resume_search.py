@@ -0,0 +1,102 @@
+"""
+简历全文检索测试
+"""
+from app.models.resume import Resume
+from app.services.resume_search import search_resumes
+
+RESUMES = [
+    ("张三", "五年Python后端开发经验，熟悉FastAPI和MySQL", "资深后端工程师"),
+    ("李四", "Java开发工程师，熟悉Spring Boot和MySQL", None),
+    ("王五", "平面设计师，精通Photoshop", "设计"),
+    ("赵六", "Python数据分析，熟悉Pandas", None),
+    ("钱七", "Python Python Python 爬虫开发，熟悉MySQL", None),
+]
+
+def _add_resumes(db):
+    """创建测试简历"""
+    for name, content, portrait in RESUMES:
+        db.add(Resume(candidate_name=name, file_url=f"/uploads/{name}.pdf", file_type="application/pdf",
+                      ocr_content=content, talent_portrait=portrait))
+    db.commit()
+
+def test_search_ranks_and_highlights(db):
+    """测试全文检索的相关度排序、命中片段和多词AND语义"""
+    _add_resumes(db)
+    
+    result = search_resumes(db, "Python", 10)
+    items = result["items"]
+    assert {item["id"] for item in items} == {1, 4, 5}
+    assert items[0]["id"] == 5
+    assert items[0]["score"] >= items[1]["score"] >= items[2]["score"]
+    assert "<mark>Python</mark>" in items[0]["snippet"]
+    assert result["next_cursor"] is None
+    
+    assert [item["id"] for item in search_resumes(db, "python mysql", 10)["items"]] in ([5, 1], [1, 5])
+    assert [item["id"] for item in search_resumes(db, "后端工程师", 10)["items"]] == [1]
+    assert search_resumes(db, "Golang", 10)["items"] == []
+
+def test_short_terms_fall_back_to_like(db):
+    """测试不足3个字符的检索词（trigram无法索引）按LIKE过滤"""
+    _add_resumes(db)
+    
+    assert [item["id"] for item in search_resumes(db, "设计", 10)["items"]] == [3]
+    assert [item["id"] for item in search_resumes(db, "Python 数据", 10)["items"]] == [4]
+    assert "<mark>设计</mark>" in search_resumes(db, "设计", 10)["items"][0]["snippet"]
+    assert search_resumes(db, "100%", 10)["items"] == []
+
+def test_snippets_escape_resume_text(db):
+    """测试片段中的简历原文经过HTML转义，只有高亮标记是HTML（FTS片段和应用层片段）"""
+    db.add(Resume(candidate_name="攻击者", file_url="/uploads/x.pdf", file_type="application/pdf",
+                  ocr_content='<script>alert(1)</script> Python开发 <img src=x onerror="alert(2)">'))
+    db.commit()
+    
+    for q in ("Python", "开发"):
+        snippet = search_resumes(db, q, 10)["items"][0]["snippet"]
+        assert "<script>" not in snippet and "<img" not in snippet
+        assert "&lt;/script&gt;" in snippet
+        assert f"<mark>{q}</mark>" in snippet
+
+def test_keyset_pagination(db):
+    """测试游标分页：逐页取完与一次取完的结果一致且不重复"""
+    _add_resumes(db)
+    expected = [item["id"] for item in search_resumes(db, "熟悉", 10)["items"]]
+    
+    pages, cursor = [], None
+    while True:
+        result = search_resumes(db, "熟悉", 1, cursor)
+        pages.extend(item["id"] for item in result["items"])
+        cursor = result["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == expected
+    assert len(expected) == 4
+    
+    pages, cursor = [], None
+    while True:
+        result = search_resumes(db, "MySQL", 2, cursor)
+        pages.extend(item["id"] for item in result["items"])
+        cursor = result["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(pages) == [1, 2, 5]
+    assert pages == [item["id"] for item in search_resumes(db, "MySQL", 10)["items"]]
+
+def test_search_endpoint_syncs_with_updates(client, db):
+    """测试检索接口（不被/{resume_id}路由截获）、全文索引随更新删除同步、无效游标报错"""
+    _add_resumes(db)
+    
+    response = client.get("/api/v1/resumes/search", params={"q": "Photoshop"})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [3]
+    
+    client.put("/api/v1/resumes/3", json={"ocr_content": "UI设计师，精通Figma"})
+    assert client.get("/api/v1/resumes/search", params={"q": "Photoshop"}).json()["items"] == []
+    assert [item["id"] for item in client.get("/api/v1/resumes/search", params={"q": "Figma"}).json()["items"]] == [3]
+    
+    client.delete("/api/v1/resumes/3")
+    assert client.get("/api/v1/resumes/search", params={"q": "Figma"}).json()["items"] == []
+    
+    response = client.get("/api/v1/resumes/search", params={"q": "Python", "limit": 1})
+    assert response.json()["next_cursor"]
+    assert client.get("/api/v1/resumes/search", params={"q": "Python", "cursor": "!!"}).status_code == 400
+    assert client.get("/api/v1/resumes/search").status_code == 422
@@ -0,0 +1,47 @@
+"""
+服务工厂测试模块
+"""
+import asyncio
+import httpx
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services import service_factory
+from app.services.ai_service import AsyncAIService
+
+def test_services_are_process_wide_singletons():
+    """测试多次获取返回同一服务实例"""
+    assert service_factory.get_async_ai_service() is service_factory.get_async_ai_service()
+    assert service_factory.get_ai_service() is service_factory.get_ai_service()
+    assert service_factory.get_file_service() is service_factory.get_file_service()
+
+def test_close_services_releases_instances():
+    """测试关闭后共享实例被释放，再次获取时重新创建"""
+    closed = []
+    
+    class ClosableService:
+        async def close(self):
+            closed.append(True)
+    
+    service_factory._services["closable"] = ClosableService()
+    ai_service = service_factory.get_async_ai_service()
+    
+    asyncio.run(service_factory.close_services())
+    
+    assert closed == [True]
+    assert "closable" not in service_factory._services
+    assert service_factory.get_async_ai_service() is not ai_service
+
+def test_lifespan_creates_and_closes_services():
+    """测试应用启动时创建共享服务，关闭时释放"""
+    with TestClient(app) as client:
+        assert {"ai_service", "async_ai_service", "file_service"} <= set(service_factory._services)
+        assert client.get("/api/health").status_code == 200
+    
+    assert service_factory._services == {}
+
+def test_async_ai_service_uses_pooled_http_client():
+    """测试异步AI服务使用可配置连接池的长连接HTTP客户端"""
+    service = AsyncAIService()
+    
+    assert isinstance(service.client._client, httpx.AsyncClient)
+    asyncio.run(service.close())
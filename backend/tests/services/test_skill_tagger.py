@@ -0,0 +1,72 @@
+"""
+本地技能标签提取测试
+"""
+import asyncio
+import json
+from app.core.config import settings
+from app.utils.skill_tagger import AhoCorasick, SkillTagger, get_skill_tagger
+from tests.conftest import make_async_service
+
+def test_automaton_finds_overlapping_patterns():
+    """测试自动机通过失败指针找到全部重叠命中"""
+    automaton = AhoCorasick([("he", 0), ("she", 1), ("his", 2), ("hers", 3)])
+    
+    matches = sorted(automaton.iter_matches("ushers"))
+    
+    assert matches == [(1, 4, 1), (2, 4, 0), (2, 6, 3)]
+    assert list(automaton.iter_matches("xyz")) == []
+
+def test_tagger_synonyms_case_and_boundaries():
+    """测试同义词归一、大小写与全角忽略、英文词边界和最左最长匹配"""
+    tagger = SkillTagger([
+        ("Java", []), ("JavaScript", ["JS"]), ("Kubernetes", ["k8s"]),
+        ("Spring", []), ("Spring Boot", ["SpringBoot"]), ("C++", []), ("机器学习", ["ML"]),
+    ])
+    
+    text = "精通ＪＡＶＡ和js，熟悉K8S、Spring Boot与C++，了解机器学习；javascript，Javadoc，MLOps"
+    
+    assert tagger.tag(text) == ["JavaScript", "Java", "Kubernetes", "Spring Boot", "C++", "机器学习"]
+    assert tagger.tag("Spring和springboot") == ["Spring", "Spring Boot"]
+    assert tagger.tag("") == []
+    assert tagger.tag(text, limit=2) == ["JavaScript", "Java"]
+    assert tagger.canonical(" K8s ") == "Kubernetes"
+    assert tagger.canonical("Golang") is None
+
+def test_builtin_skills():
+    """测试内置词库"""
+    tags = get_skill_tagger().tag("五年Golang后端开发，熟悉MySQL、Redis，C端产品经验，英语六级，统招本科")
+    
+    assert tags[:3] == ["Go", "MySQL", "Redis"]
+    assert {"英语", "本科"} <= set(tags)
+    assert "C语言" not in tags
+
+def test_builtin_skills_context_rules():
+    """测试内置词库不把域名、邮箱和普通英文误识别为技能，带技术上下文的写法仍能命中"""
+    tagger = get_skill_tagger()
+    
+    for text in ("博客：cnblogs.net/zhangsan", "邮箱 foo@bar.net", "负责项目go-live", "go to market策略",
+                 "spring 2023 实习", "任职于Shell公司", "let's go"):
+        assert tagger.tag(text) == [], text
+    
+    assert tagger.tag("熟悉C#、ASP.NET和.NET Core") == [".NET", "C#"]
+    assert tagger.tag("Go语言开发，熟悉Spring框架和Shell脚本") == ["Go", "Spring", "Shell"]
+    assert tagger.canonical("go") == "Go"
+    assert tagger.canonical("Spring") == "Spring"
+
+def test_tag_modes(monkeypatch):
+    """测试local模式不调用大模型，hybrid模式本地命中过少时调用并合并，llm模式使用归一后的大模型结果"""
+    service = make_async_service(json.dumps({"tags": ["k8s", "团队协作", "Python"]}))
+    completions = service.client.chat.completions
+    
+    assert asyncio.run(service.extract_job_tags("Python开发工程师，熟悉FastAPI")) == ["Python", "FastAPI"]
+    assert completions.calls == []
+    
+    monkeypatch.setattr(settings, "TAGGER_MODE", "hybrid")
+    assert asyncio.run(service.extract_job_tags("Python开发工程师，熟悉FastAPI")) == ["Python", "FastAPI", "Kubernetes", "团队协作"]
+    assert len(completions.calls) == 1
+    assert asyncio.run(service.extract_job_tags("Python FastAPI MySQL Redis")) == ["Python", "FastAPI", "MySQL", "Redis"]
+    assert len(completions.calls) == 1
+    
+    monkeypatch.setattr(settings, "TAGGER_MODE", "llm")
+    assert asyncio.run(service.generate_resume_tags("熟悉Python")) == ["Kubernetes", "团队协作", "Python"]
+    assert len(completions.calls) == 2
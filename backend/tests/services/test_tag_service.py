@@ -0,0 +1,86 @@
+"""
+标签批量写入测试
+"""
+from sqlalchemy.dialects import mysql
+from app.models.resume import Resume
+from app.models.tag import Tag
+from app.services import tag_service
+from app.services.tag_service import add_resume_tags, resolve_tags
+from tests.conftest import count_queries
+
+def _add_resume(db):
+    """创建测试简历"""
+    resume = Resume(candidate_name="张三", file_url="/uploads/张三.pdf", file_type="application/pdf",
+                    ocr_content="Python FastAPI MySQL")
+    db.add(resume)
+    db.flush()
+    return resume
+
+def test_resolve_tags_uses_set_based_queries(db):
+    """测试已有标签一次IN查询、缺失标签一次多行插入，不随标签数逐个查询"""
+    db.add(Tag(name="Python", category="skill"))
+    db.commit()
+    python_id = db.query(Tag.id).filter(Tag.name == "Python").scalar()
+    
+    with count_queries() as statements:
+        tag_ids = resolve_tags(db, ["Python", " FastAPI ", "MySQL", "FastAPI", "", "Docker"])
+    
+    assert list(tag_ids) == ["Python", "FastAPI", "MySQL", "Docker"]
+    assert tag_ids["Python"] == python_id
+    assert len(statements) == 3
+    assert db.query(Tag).count() == 4
+    assert resolve_tags(db, []) == {}
+
+def test_add_resume_tags_in_one_transaction(db):
+    """测试简历、标签和关联在同一事务中写入，重复添加关联被忽略"""
+    resume = _add_resume(db)
+    
+    with count_queries() as statements:
+        tag_ids = add_resume_tags(db, resume.id, ["Python", "FastAPI"])
+    assert len(statements) == 4
+    add_resume_tags(db, resume.id, ["FastAPI", "MySQL"])
+    db.commit()
+    
+    db.refresh(resume)
+    assert len(tag_ids) == 2
+    assert sorted(tag.name for tag in resume.tags) == ["FastAPI", "MySQL", "Python"]
+
+def test_concurrently_created_tag_is_reused(db, monkeypatch):
+    """测试查询后被并发请求抢先创建的标签：插入冲突被忽略并复用已有标签"""
+    db.add(Tag(name="Python", category="skill"))
+    db.commit()
+    find_tags = tag_service._find_tags
+    calls = []
+    
+    def stale_find_tags(session, names, locking=False):
+        # 第一次查询模拟并发请求尚未提交时读到的结果
+        calls.append(locking)
+        return {} if len(calls) == 1 else find_tags(session, names, locking)
+    monkeypatch.setattr(tag_service, "_find_tags", stale_find_tags)
+    
+    resume = _add_resume(db)
+    add_resume_tags(db, resume.id, ["Python"])
+    db.commit()
+    
+    assert db.query(Tag).filter(Tag.name == "Python").count() == 1
+    assert [tag.name for tag in resume.tags] == ["Python"]
+    assert calls == [False, True]
+
+def test_mysql_statements_lock_and_only_ignore_duplicates():
+    """测试MySQL下重新查询为共享锁读，插入只忽略重复键而不是INSERT IGNORE"""
+    dialect = mysql.dialect()
+    
+    assert "LOCK IN SHARE MODE" in str(tag_service._tags_query(["Python"], locking=True).compile(dialect=dialect))
+    assert "LOCK IN SHARE MODE" not in str(tag_service._tags_query(["Python"]).compile(dialect=dialect))
+    statement = str(tag_service._insert_ignore_statement("mysql", Tag.__table__, ["name"]).compile(dialect=dialect))
+    assert "ON DUPLICATE KEY UPDATE name = tags.name" in statement
+    assert "IGNORE" not in statement
+
+def test_unresolved_tags_are_logged(db, monkeypatch):
+    """测试插入后仍查询不到的标签记录警告日志"""
+    warnings = []
+    monkeypatch.setattr(tag_service, "_find_tags", lambda session, names, locking=False: {})
+    monkeypatch.setattr(tag_service.logger, "warning", warnings.append)
+    
+    assert resolve_tags(db, ["Python"]) == {}
+    assert len(warnings) == 1 and "Python" in warnings[0]
@@ -0,0 +1,56 @@
+"""
+分词工具测试
+"""
+import pytest
+from app.core.config import settings
+from app.utils.tokenizer import Lexicon, get_lexicon, iter_term_ids, term_id, term_ids, tokenize
+
+TEXT = "五年Python后端开发经验，熟悉C++、C#和Vue.js。电话+86，好 MySQL数据库 node.js."
+
+def test_bigram_tokenize():
+    """测试英文词小写、技能写法保留、中文双字切分和单字保留"""
+    tokens = tokenize(TEXT, "bigram")
+    
+    assert tokens[:5] == ["五年", "python", "后端", "端开", "开发"]
+    assert {"c++", "c#", "vue.js", "node.js", "mysql", "86", "好"} <= set(tokens)
+    assert "js." not in tokens and "+86" not in tokens
+    assert tokenize("", "bigram") == []
+
+def test_dictionary_tokenize_falls_back_to_bigrams():
+    """测试词典最大匹配，未登录部分回退为双字词"""
+    lexicon = Lexicon(["后端开发", "开发", "数据库", "Python"])
+    
+    assert lexicon.segment("五年后端开发经验") == ["五年", "后端开发", "经验"]
+    assert lexicon.segment("数据库") == ["数据库"]
+    assert lexicon.segment("好") == ["好"]
+    assert "python" in lexicon
+    
+    tokens = tokenize(TEXT, "dictionary")
+    assert "后端开发" in get_lexicon()
+    assert {"后端开发", "数据库", "python", "c++"} <= set(tokens)
+    assert "端开" not in tokens
+
+@pytest.mark.parametrize("mode", ["bigram", "dictionary"])
+def test_term_ids_match_term_id(mode):
+    """测试向量化词ID与逐词计算的词ID一致"""
+    for text in (TEXT, "", "a", "好", "c+++ .net x. 1.5", "数据" * 100):
+        assert sorted(term_ids(text, mode).tolist()) == sorted(term_id(token) for token in tokenize(text, mode))
+
+def test_iter_term_ids_splits_batches(monkeypatch):
+    """测试批量分词拼接、分块后拆回的结果与逐份分词一致"""
+    monkeypatch.setattr("app.utils.tokenizer._BATCH_CHARS", 64)
+    texts = [TEXT, "", "好", "Python", TEXT * 3, "数据库"]
+    
+    results = list(iter_term_ids(texts, "bigram"))
+    
+    assert len(results) == len(texts)
+    for text, ids in zip(texts, results):
+        assert sorted(ids.tolist()) == sorted(term_ids(text, "bigram").tolist())
+
+def test_default_mode_from_settings(monkeypatch):
+    """测试未指定分词模式时使用配置"""
+    monkeypatch.setattr(settings, "TOKENIZER_MODE", "dictionary")
+    assert "后端开发" in tokenize(TEXT)
+    
+    monkeypatch.setattr(settings, "TOKENIZER_MODE", "bigram")
+    assert "后端开发" not in tokenize(TEXT)
@@ -0,0 +1,227 @@
+"""
+简历向量索引测试
+"""
+import numpy as np
+import pytest
+from app.models.resume import Resume
+from app.models.job_requirement import JobRequirement
+from app.services.embedding_service import (
+    Embedder, EmbeddingService, HashingEmbedder, RESUME, normalize_rows, resume_text
+)
+from app.services.vector_index import (
+    VectorIndex, IVFIndex, ResumeIndex, EmbeddingResumeIndex, create_resume_index, kmeans
+)
+from app.services.service_factory import get_resume_index
+
+def _unit(*values):
+    """构造归一化向量"""
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def test_add_update_and_search():
+    """测试新增、原地更新和top-K检索"""
+    index = VectorIndex(dim=2, initial_capacity=1)
+    index.add(1, _unit(1, 0))
+    index.add(2, _unit(0, 1))
+    index.add(3, _unit(1, 1))
+    
+    assert len(index) == 3
+    assert index.capacity == 4
+    assert [item_id for item_id, _ in index.search(_unit(1, 0), 2)] == [1, 3]
+    
+    # 更新覆盖原有行，不新增
+    index.add(1, _unit(0, 1))
+    assert len(index) == 3
+    assert [item_id for item_id, _ in index.search(_unit(1, 0), 1)] == [3]
+
+def test_remove_tombstones_and_compacts():
+    """测试删除打墓碑、复用墓碑行，并在墓碑过多时压缩"""
+    index = VectorIndex(dim=2, initial_capacity=8, compact_ratio=0.5)
+    for item_id in range(1, 5):
+        index.add(item_id, _unit(1, item_id))
+    
+    assert index.remove(4)
+    assert not index.remove(4)
+    assert 4 not in index
+    assert len(index._tombstones) == 1
+    # 检索结果不包含已删除的向量，即使k超过有效数量
+    assert sorted(item_id for item_id, _ in index.search(_unit(1, 4), 10)) == [1, 2, 3]
+    
+    # 新增复用墓碑行
+    index.add(5, _unit(1, 5))
+    assert not index._tombstones
+    assert index._size == 4
+    
+    # 墓碑比例超过阈值时压缩
+    index.remove(1)
+    index.remove(2)
+    index.remove(3)
+    assert not index._tombstones
+    assert index._size == 1
+    assert index.search(_unit(1, 5), 3)[0][0] == 5
+
+def test_search_within_candidates_and_float16():
+    """测试限定候选范围检索，以及float16存储"""
+    index = VectorIndex(dim=2, dtype="float16")
+    index.add(1, _unit(1, 0))
+    index.add(2, _unit(0, 1))
+    index.add(3, _unit(1, 1))
+    
+    results = index.search(_unit(1, 0), 5, candidate_ids=[2, 3, 3, 99])
+    
+    assert index._matrix.dtype == np.float16
+    assert [item_id for item_id, _ in results] == [3, 2]
+    assert results[0][1] == pytest.approx(np.sqrt(0.5), abs=1e-3)
+
+def _clustered(size, dim=8, clusters=4, seed=0):
+    """生成带聚类结构的归一化向量"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim))
+    data = centers[rng.integers(0, clusters, size)] + 0.3 * rng.standard_normal((size, dim))
+    return normalize_rows(data).astype(np.float32)
+
+def test_kmeans_returns_normalized_centroids():
+    """测试k-means返回指定数量的归一化聚类中心"""
+    centroids = kmeans(_clustered(200), 4)
+    
+    assert centroids.shape == (4, 8)
+    assert np.allclose(np.linalg.norm(centroids, axis=1), 1.0)
+
+def test_ivf_index_matches_exact_search():
+    """测试IVF索引的精确模式与暴力检索一致，近似检索召回率随nprobe提高"""
+    data = _clustered(512)
+    flat = VectorIndex(dim=8)
+    flat.load(range(512), data)
+    ivf = IVFIndex(dim=8, nlist=8, nprobe=1)
+    ivf.load(range(512), data)
+    query = data[0]
+    
+    exact = [item_id for item_id, _ in flat.search(query, 20)]
+    assert ivf.n_lists == 8
+    assert [item_id for item_id, _ in ivf.search(query, 20, exact=True)] == exact
+    assert [item_id for item_id, _ in ivf.search(query, 20, nprobe=8)] == exact
+    approximate = [item_id for item_id, _ in ivf.search(query, 20)]
+    assert approximate[0] == 0
+    assert len(set(approximate) & set(exact)) >= 10
+
+def test_ivf_index_incremental_updates():
+    """测试IVF索引增删改，以及向量数不足时退化为单列表"""
+    small = IVFIndex(dim=2, nlist=4)
+    small.load([1, 2], np.stack([_unit(1, 0), _unit(0, 1)]))
+    assert small.n_lists == 1
+    
+    data = _clustered(256)
+    ivf = IVFIndex(dim=8, nlist=4)
+    ivf.load(range(256), data)
+    
+    # 更新为另一聚类的向量时迁移到对应列表
+    far = next(item_id for item_id in range(256) if ivf._assign(data[item_id]) != ivf._assignments[0])
+    ivf.add(0, data[far])
+    assert ivf._assignments[0] == ivf._assignments[far]
+    assert len(ivf) == 256
+    assert ivf.search(data[far], 2, exact=True)[0][1] == pytest.approx(1.0, abs=1e-5)
+    
+    ivf.add(1000, data[5])
+    assert 1000 in ivf
+    assert ivf.remove(1000)
+    assert ivf.get(1000) is None
+    assert 1000 not in [item_id for item_id, _ in ivf.search(data[5], 10, exact=True)]
+    
+    # 候选范围检索
+    assert [item_id for item_id, _ in ivf.search(data[3], 5, candidate_ids=[3, 4])][0] == 3
+
+def test_resume_index_tracks_document_frequency(db):
+    """测试简历索引从数据库构建，并随增删改增量维护文档频率"""
+    for name, content in (("张三", "Python FastAPI"), ("李四", "Java Spring")):
+        db.add(Resume(candidate_name=name, file_url=f"/uploads/{name}.pdf", file_type="application/pdf",
+                      ocr_content=content))
+    db.commit()
+    
+    resume_index = ResumeIndex(dim=64)
+    resume_index.build(db)
+    df = resume_index._df.copy()
+    assert len(resume_index) == 2
+    assert resume_index.search("Python", 1)[0][0] == 1
+    
+    # 更新后文档频率按新旧词项调整，删除后恢复
+    resume = db.get(Resume, 2)
+    resume.ocr_content = "Python Django"
+    resume_index.upsert_resume(resume)
+    assert resume_index._df.sum() == df.sum()
+    assert [resume_id for resume_id, _ in resume_index.search("Django", 2)][0] == 2
+    
+    resume_index.remove_resume(2)
+    resume_index.remove_resume(1)
+    assert len(resume_index) == 0
+    assert not resume_index._df.any()
+
+def test_resume_api_keeps_index_in_sync(client, db):
+    """测试简历增删改接口同步更新内存索引"""
+    resume_index = get_resume_index()
+    resume_index.ensure_built(db)
+    
+    response = client.post("/api/v1/resumes", json={
+        "candidate_name": "张三",
+        "file_url": "/uploads/resumes/test.pdf",
+        "file_type": "application/pdf",
+        "ocr_content": "Python 后端开发"
+    })
+    resume_id = response.json()["id"]
+    assert resume_id in resume_index.index
+    
+    client.put(f"/api/v1/resumes/{resume_id}", json={"ocr_content": "Golang 微服务"})
+    assert resume_index.search("Golang", 1)[0][0] == resume_id
+    
+    client.delete(f"/api/v1/resumes/{resume_id}")
+    assert resume_id not in resume_index.index
+
+class CountingEmbedder(Embedder):
+    """记录向量化文本数的测试后端（模拟非哈希的向量模型）"""
+    
+    name = "counting"
+    dim = 64
+    
+    def __init__(self):
+        self.hasher = HashingEmbedder(self.dim)
+        self.texts = []
+    
+    def embed(self, texts):
+        self.texts.extend(texts)
+        return self.hasher.embed(texts)
+
+def test_resume_index_follows_embedding_backend(db):
+    """测试非哈希向量化后端时简历检索使用持久化的简历向量，增删改只标记过期"""
+    embedder = CountingEmbedder()
+    embedding_service = EmbeddingService(embedder)
+    assert isinstance(create_resume_index(EmbeddingService(HashingEmbedder(64))), ResumeIndex)
+    resume_index = create_resume_index(embedding_service)
+    assert isinstance(resume_index, EmbeddingResumeIndex)
+    
+    resumes = []
+    for name, content in (("张三", "Python FastAPI"), ("李四", "Java Spring")):
+        resume = Resume(candidate_name=name, file_url=f"/uploads/{name}.pdf", file_type="application/pdf",
+                        ocr_content=content)
+        db.add(resume)
+        db.flush()
+        embedding_service.upsert(db, RESUME, resume.id, resume_text(resume))
+        resumes.append(resume)
+    job = JobRequirement(position_name="Java工程师", responsibilities="Java Spring", requirements="Spring")
+    db.add(job)
+    db.commit()
+    
+    # 构建读取已保存的简历向量，只有职位向量在内存中计算
+    embedder.texts.clear()
+    assert resume_index.search_job(db, job, 1)[0][0] == resumes[1].id
+    assert len(resume_index) == 2
+    assert len(embedder.texts) == 1
+    
+    # 更新只标记过期，下次检索前重新读取；删除立即生效
+    removed_id = resumes[1].id
+    resumes[0].ocr_content = "Java Spring Boot"
+    embedding_service.upsert(db, RESUME, resumes[0].id, resume_text(resumes[0]))
+    db.delete(resumes[1])
+    db.commit()
+    resume_index.upsert_resume(resumes[0])
+    resume_index.remove_resume(removed_id)
+    assert [resume_id for resume_id, _ in resume_index.search_job(db, job, 2)] == [resumes[0].id]
+
@@ -0,0 +1,102 @@
+"""
+内存映射向量存储测试
+"""
+import os
+import numpy as np
+import pytest
+from app.models.resume import Resume
+from app.services.vector_index import ResumeIndex
+from app.services.vector_store import MmapVectorStore
+
+@pytest.fixture
+def store_path(tmp_path):
+    """提供存储文件路径"""
+    return str(tmp_path / "resume_vectors.bin")
+
+def _unit(*values):
+    """构造归一化向量"""
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def test_append_update_remove_and_search(store_path):
+    """测试追加、更新（追加新行并打墓碑）、删除和检索"""
+    store = MmapVectorStore(store_path, dim=2, initial_capacity=8)
+    store.add(1, _unit(1, 0))
+    store.add(2, _unit(0, 1))
+    store.add(3, _unit(1, 1))
+    
+    assert len(store) == 3
+    assert [item_id for item_id, _ in store.search(_unit(1, 0), 2)] == [1, 3]
+    
+    store.add(1, _unit(0, 1))
+    assert len(store) == 3
+    assert store._count == 4
+    assert np.allclose(store.get(1), _unit(0, 1), atol=1e-3)
+    assert [item_id for item_id, _ in store.search(_unit(1, 0), 1)] == [3]
+    
+    assert store.remove(2)
+    assert not store.remove(2)
+    assert 2 not in store
+    assert sorted(item_id for item_id, _ in store.search(_unit(1, 0), 10)) == [1, 3]
+    assert [item_id for item_id, _ in store.search(_unit(1, 0), 5, candidate_ids=[1, 2])] == [1]
+
+def test_other_instances_see_writes_and_compaction(store_path):
+    """测试另一个实例（模拟其他worker）可见追加写入，并在压缩替换文件后重新映射"""
+    writer = MmapVectorStore(store_path, dim=2, initial_capacity=4, compact_ratio=0.5)
+    reader = MmapVectorStore(store_path, dim=2)
+    for item_id in range(1, 5):
+        writer.add(item_id, _unit(1, item_id))
+    assert len(reader) == 4
+    
+    # 容量用尽时压缩扩容
+    inode = os.stat(store_path).st_ino
+    writer.add(5, _unit(1, 5))
+    assert os.stat(store_path).st_ino != inode
+    assert writer.capacity >= 10
+    assert len(reader) == 5
+    
+    # 墓碑超过阈值时压缩
+    for item_id in (1, 2, 3):
+        writer.remove(item_id)
+    assert writer._count == 2
+    assert sorted(reader.ids().tolist()) == [4, 5]
+    assert reader.search(_unit(1, 5), 1)[0][0] == 5
+
+def test_int8_quantization_and_format_checks(store_path):
+    """测试int8量化存储的精度，以及文件参数不一致时报错"""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((20, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    store = MmapVectorStore(store_path, dim=16, dtype="int8")
+    store.load(range(20), vectors)
+    
+    assert np.allclose(store.get(7), vectors[7], atol=0.01)
+    assert store.search(vectors[7], 1)[0][0] == 7
+    
+    with pytest.raises(ValueError):
+        MmapVectorStore(store_path, dim=16, dtype="float16")
+    with pytest.raises(ValueError):
+        MmapVectorStore(store_path, dim=8, dtype="int8")
+
+def test_resume_index_syncs_persistent_store(db, store_path):
+    """测试持久化存储已有数据时，重启后只同步与数据库的差异"""
+    for name, content in (("张三", "Python FastAPI"), ("李四", "Java Spring"), ("王五", "Golang")):
+        db.add(Resume(candidate_name=name, file_url=f"/uploads/{name}.pdf", file_type="application/pdf",
+                      ocr_content=content))
+    db.commit()
+    
+    first = ResumeIndex(dim=32, index=MmapVectorStore(store_path, dim=32))
+    first.build(db)
+    assert len(first) == 3
+    
+    # 停机期间删除一份简历、新增一份简历
+    db.delete(db.get(Resume, 3))
+    db.add(Resume(candidate_name="赵六", file_url="/uploads/4.pdf", file_type="application/pdf",
+                  ocr_content="Rust"))
+    db.commit()
+    
+    second = ResumeIndex(dim=32, index=MmapVectorStore(store_path, dim=32))
+    second.build(db)
+    assert sorted(second.index.ids().tolist()) == [1, 2, 4]
+    assert (second._df == second.index.nonzero_counts()).all()
+    assert second.search("Rust", 1)[0][0] == 4